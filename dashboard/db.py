@@ -7,24 +7,50 @@ from pathlib import Path
 from typing import List, Optional, Dict, Any
 from loguru import logger
 
+from utils.db_pool import SQLitePool, acquire_pool, release_pool
+from utils.migrations import Migration, add_column, migrate
+from utils.compression import compress_text, decompress_text
 from .models import DashboardRun, DashboardStep, HistoryItem, QueryGroup
 
+# user_version 中本组件使用的分段 (DatabaseManager 使用 0)
+SCHEMA_SLOT = 1
+
 
 class DashboardDB:
-    """Dashboard 数据库管理"""
+    """Dashboard 数据库管理 (与 DatabaseManager 共享同一数据库文件的连接池)"""
     
     def __init__(self, db_path: str = "data/signal_flux.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.pool: Optional[SQLitePool] = acquire_pool(str(self.db_path))
         self._init_tables()
-        logger.info(f"📊 Dashboard DB initialized at {self.db_path}")
+        logger.debug(f"📊 Dashboard DB initialized at {self.db_path}")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """兼容旧代码：返回共享写连接"""
+        return self.pool.writer
+
+    def close(self):
+        if self.pool:
+            release_pool(self.pool)
+            self.pool = None
+
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """等待已入队的步骤日志等写入全部落盘"""
+        return self.pool.flush(timeout)
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        """写入队列指标（与 DatabaseManager 共享同一个池时数据相同）"""
+        return self.pool.write_queue_stats()
     
     def _init_tables(self):
-        """初始化表结构"""
-        cursor = self.conn.cursor()
-        
+        """按版本迁移表结构 (已是最新版本时不执行任何 DDL)"""
+        migrate(self.pool, "dashboard", SCHEMA_SLOT, [
+            Migration(1, "dashboard runs / steps", self._create_tables),
+        ])
+
+    def _create_tables(self, cursor: sqlite3.Cursor):
         # 运行记录表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS dashboard_runs (
@@ -41,26 +67,14 @@ class DashboardDB:
             )
         """)
         
-        # 自动迁移：检查并添加 parent_run_id 列
-        try:
-            cursor.execute("ALTER TABLE dashboard_runs ADD COLUMN parent_run_id TEXT")
-            logger.info("Migrated database: added parent_run_id column")
-        except sqlite3.OperationalError:
-            pass  # 列已存在
+        # 旧库兼容：补齐 parent_run_id 列
+        add_column(cursor, "dashboard_runs", "parent_run_id", "TEXT")
         
-        # 自动迁移：添加 run_data_json 列 (存储结构化数据)
-        try:
-            cursor.execute("ALTER TABLE dashboard_runs ADD COLUMN run_data_json TEXT")
-            logger.info("Migrated database: added run_data_json column")
-        except sqlite3.OperationalError:
-            pass  # 列已存在
+        # 旧库兼容：补齐 run_data_json 列 (存储结构化数据)
+        add_column(cursor, "dashboard_runs", "run_data_json", "TEXT")
 
-        # 自动迁移：添加 user_id 列
-        try:
-            cursor.execute("ALTER TABLE dashboard_runs ADD COLUMN user_id TEXT")
-            logger.info("Migrated database: added user_id column")
-        except sqlite3.OperationalError:
-            pass  # 列已存在
+        # 旧库兼容：补齐 user_id 列
+        add_column(cursor, "dashboard_runs", "user_id", "TEXT")
         
         # 步骤日志表
         cursor.execute("""
@@ -80,26 +94,22 @@ class DashboardDB:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_query ON dashboard_runs(query)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_status ON dashboard_runs(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_user_id ON dashboard_runs(user_id)")
-        
-        self.conn.commit()
     
     # ========== 运行记录 CRUD ==========
     
     def create_run(self, run: DashboardRun) -> DashboardRun:
         """创建新运行记录"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO dashboard_runs (run_id, query, sources, status, started_at, parent_run_id, user_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (run.run_id, run.query, run.sources, run.status, run.started_at, run.parent_run_id, run.user_id))
-        self.conn.commit()
+        with self.pool.write() as conn:
+            conn.execute("""
+                INSERT INTO dashboard_runs (run_id, query, sources, status, started_at, parent_run_id, user_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (run.run_id, run.query, run.sources, run.status, run.started_at, run.parent_run_id, run.user_id))
         return run
     
     def get_run(self, run_id: str) -> Optional[DashboardRun]:
         """获取运行记录"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM dashboard_runs WHERE run_id = ?", (run_id,))
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT * FROM dashboard_runs WHERE run_id = ?", (run_id,)).fetchone()
         if row:
             return DashboardRun(**dict(row))
         return None
@@ -112,17 +122,15 @@ class DashboardDB:
         set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
         values = list(kwargs.values()) + [run_id]
         
-        cursor = self.conn.cursor()
-        cursor.execute(f"UPDATE dashboard_runs SET {set_clause} WHERE run_id = ?", values)
-        self.conn.commit()
+        with self.pool.write() as conn:
+            cursor = conn.execute(f"UPDATE dashboard_runs SET {set_clause} WHERE run_id = ?", values)
         return cursor.rowcount > 0
     
     def delete_run(self, run_id: str) -> bool:
         """删除运行记录及其步骤"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM dashboard_steps WHERE run_id = ?", (run_id,))
-        cursor.execute("DELETE FROM dashboard_runs WHERE run_id = ?", (run_id,))
-        self.conn.commit()
+        with self.pool.write() as conn:
+            conn.execute("DELETE FROM dashboard_steps WHERE run_id = ?", (run_id,))
+            cursor = conn.execute("DELETE FROM dashboard_runs WHERE run_id = ?", (run_id,))
         return cursor.rowcount > 0
     
     def save_run_data(self, run_id: str, data: Dict[str, Any]) -> bool:
@@ -130,13 +138,12 @@ class DashboardDB:
         import json
         # Log what we're saving
         logger.info(f"💾 Saving run_data for {run_id}: signals={len(data.get('signals', []))}, charts={len(data.get('charts', {}))}")
-        cursor = self.conn.cursor()
         json_str = json.dumps(data, ensure_ascii=False, default=str)
-        cursor.execute(
-            "UPDATE dashboard_runs SET run_data_json = ? WHERE run_id = ?",
-            (json_str, run_id)
-        )
-        self.conn.commit()
+        with self.pool.write() as conn:
+            cursor = conn.execute(
+                "UPDATE dashboard_runs SET run_data_json = ? WHERE run_id = ?",
+                (compress_text(json_str), run_id)
+            )
         result = cursor.rowcount > 0
         logger.info(f"💾 Save result: {result}, JSON length: {len(json_str)}")
         return result
@@ -144,41 +151,36 @@ class DashboardDB:
     def get_run_data(self, run_id: str) -> Optional[Dict[str, Any]]:
         """获取运行的结构化数据"""
         import json
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT run_data_json FROM dashboard_runs WHERE run_id = ?", (run_id,))
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT run_data_json FROM dashboard_runs WHERE run_id = ?", (run_id,)).fetchone()
         if row and row['run_data_json']:
-            return json.loads(row['run_data_json'])
+            # 新数据为压缩 BLOB，旧数据为 JSON 文本
+            return json.loads(decompress_text(row['run_data_json']))
         return None
     
     # ========== 步骤日志 ==========
     
-    def add_step(self, step: DashboardStep) -> int:
-        """添加步骤日志"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+    def add_step(self, step: DashboardStep) -> None:
+        """添加步骤日志（经写入队列异步批量提交，不阻塞调用线程）"""
+        row = (step.run_id, step.step_type, step.agent, step.content, step.timestamp)
+        self.pool.submit(lambda conn: conn.execute("""
             INSERT INTO dashboard_steps (run_id, step_type, agent, content, timestamp)
             VALUES (?, ?, ?, ?, ?)
-        """, (step.run_id, step.step_type, step.agent, step.content, step.timestamp))
-        self.conn.commit()
-        return cursor.lastrowid
+        """, row), tag="dashboard_steps")
     
     def get_steps(self, run_id: str, limit: int = 500) -> List[DashboardStep]:
         """获取运行的步骤日志"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT * FROM dashboard_steps WHERE run_id = ? ORDER BY id DESC LIMIT ?",
-            (run_id, limit)
-        )
-        rows = cursor.fetchall()
+        with self.pool.read("dashboard_steps") as conn:
+            rows = conn.execute(
+                "SELECT * FROM dashboard_steps WHERE run_id = ? ORDER BY id DESC LIMIT ?",
+                (run_id, limit)
+            ).fetchall()
         return [DashboardStep(**dict(row)) for row in reversed(rows)]
     
     # ========== 历史记录 ==========
     
     def get_history(self, limit: int = 50, user_id: Optional[str] = None) -> List[HistoryItem]:
         """获取历史运行列表"""
-        cursor = self.conn.cursor()
-        
         query_sql = """
             SELECT run_id, query, status, started_at, finished_at, signal_count, parent_run_id, report_path
             FROM dashboard_runs
@@ -192,12 +194,13 @@ class DashboardDB:
         query_sql += " ORDER BY started_at DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query_sql, tuple(params))
+        with self.pool.read() as conn:
+            rows = conn.execute(query_sql, tuple(params)).fetchall()
         
         items = []
         now = datetime.now()
         
-        for row in cursor.fetchall():
+        for row in rows:
             item = HistoryItem(**dict(row))
             
             # 计算持续时间
@@ -224,7 +227,10 @@ class DashboardDB:
     
     def get_query_groups(self, limit: int = 20, user_id: Optional[str] = None) -> List[QueryGroup]:
         """按 Query 分组获取历史记录"""
-        cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            return self._query_groups(conn.cursor(), limit, user_id)
+
+    def _query_groups(self, cursor: sqlite3.Cursor, limit: int, user_id: Optional[str]) -> List[QueryGroup]:
         
         # 获取有 query 的运行，按 query 分组
         where_clause = "WHERE query IS NOT NULL AND query != ''"
@@ -279,11 +285,10 @@ class DashboardDB:
     
     def get_running_task(self) -> Optional[DashboardRun]:
         """获取当前正在运行的任务"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT * FROM dashboard_runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
-        )
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute(
+                "SELECT * FROM dashboard_runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
         if row:
             return DashboardRun(**dict(row))
         return None
@@ -292,7 +297,6 @@ class DashboardDB:
         """获取指定 query 的最新运行记录"""
         if not query:
             return None
-        cursor = self.conn.cursor()
         
         sql = "SELECT * FROM dashboard_runs WHERE query = ?"
         params = [query]
@@ -303,8 +307,8 @@ class DashboardDB:
             
         sql += " ORDER BY started_at DESC LIMIT 1"
         
-        cursor.execute(sql, tuple(params))
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute(sql, tuple(params)).fetchone()
         if row:
             return DashboardRun(**dict(row))
         return None
@@ -574,6 +574,7 @@ class WorkflowRunner:
             
             try:
                 check_cancelled()  # 报告生成前检查点
+                workflow.db.flush_writes()  # 等待新闻/信号写入落盘后再生成报告
                 result = workflow.report_agent.generate_report(analyzed_signals, user_query=query)
                 md_content = result.content if hasattr(result, "content") else str(result)
                 if run_state and hasattr(result, "structured"):
@@ -712,7 +713,7 @@ class WorkflowRunner:
             from utils.kronos_predictor import KronosPredictorUtility
             predictor = KronosPredictorUtility()
             # Pass news_text to the predictor
-            forecast_points = predictor.get_base_forecast(df, lookback=20, pred_len=5, news_text=news_text)
+            forecast_points = predictor.get_base_forecast(df, lookback=20, pred_len=5, news_text=news_text, ticker=ticker)
             if forecast_points and len(forecast_points) > 0:
                 # 计算预测涨跌幅
                 last_close = price_list[-1]["close"] if price_list else 0
@@ -759,7 +760,7 @@ class WorkflowRunner:
         # Try to get base forecast (without news) if news_text is provided
         if news_text:
             try:
-                base_points = predictor.get_base_forecast(df, lookback=20, pred_len=5, news_text=None)
+                base_points = predictor.get_base_forecast(df, lookback=20, pred_len=5, news_text=None, ticker=ticker)
                 if base_points:
                     base_list = []
                     for p in base_points:
@@ -26,6 +26,8 @@ load_dotenv()
 from .models import RunRequest, RunResponse, DashboardRun, DashboardStep, HistoryItem, QueryGroup, UserRegister, UserLogin, Token, User
 from .db import get_db
 from utils.database_manager import DatabaseManager
+from utils.circuit_breaker import breakers
+from utils.http_client import async_http, http
 from utils.news_tools import NewsNowTools
 
 from fastapi.security import OAuth2PasswordBearer
@@ -190,11 +192,14 @@ async def lifespan(app: FastAPI):
     ║  📚 API Docs:  http://localhost:8765/docs                 ║
     ╚═══════════════════════════════════════════════════════════╝
     """)
-    # Ensure DB tables exist on startup
-    db = DatabaseManager() 
-    db.close()
+    # Ensure DB tables exist on startup; 该实例在服务期间保持打开，按 RETENTION_INTERVAL_S 开启后台清理 (默认关闭)
+    db = DatabaseManager()
+    db.start_retention()
     
     yield
+    # 关闭前写完队列中的步骤日志 / 新闻 / 信号
+    get_db().flush_writes(timeout=30)
+    db.close()
     print("👋 Dashboard shutting down")
 
 
@@ -511,7 +516,11 @@ async def get_status(run_id: Optional[str] = None, current_user: dict = Depends(
                 "signal_count": len(ctx.signals),
                 "chart_count": len(ctx.charts),
                 "is_running": workflow_runner.is_running(target_run_id),
-                "is_cancelled": workflow_runner.is_cancelled(target_run_id)
+                "is_cancelled": workflow_runner.is_cancelled(target_run_id),
+                "write_queue": get_db().write_queue_stats(),
+                "http": http.stats(),
+                "async_http": async_http.stats(),
+                "breakers": breakers.snapshot()
             }
     
     return {
@@ -522,7 +531,11 @@ async def get_status(run_id: Optional[str] = None, current_user: dict = Depends(
         "signal_count": 0,
         "chart_count": 0,
         "is_running": False,
-        "is_cancelled": False
+        "is_cancelled": False,
+        "write_queue": get_db().write_queue_stats(),
+        "http": http.stats(),
+        "async_http": async_http.stats(),
+        "breakers": breakers.snapshot()
     }
 
 
@@ -589,6 +602,70 @@ async def get_hot_news(sources: str = "cls,wallstreetcn,xueqiu", count: int = 8)
     }
 
 
+@app.get("/api/signals")
+async def query_signals(
+    ticker: Optional[str] = None,
+    industry: Optional[str] = None,
+    days: float = 30,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user),
+):
+    """按标的 / 行业 / 时间窗检索当前用户的历史信号 (走 signal_tickers / signal_industries 索引)"""
+    db = get_news_tools().db
+    user_id = str(current_user['id'])
+    limit = max(1, min(limit, 500))
+    if ticker:
+        signals = db.get_signals_by_ticker(ticker, days=days, user_id=user_id, limit=limit)
+        if industry:
+            signals = [s for s in signals if industry in (s.get("industry_tags") or [])]
+    elif industry:
+        signals = db.get_signals_by_industry(industry, days=days, user_id=user_id, limit=limit)
+    else:
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        signals = db.get_signals_in_window(since, user_id=user_id, limit=limit)
+    return {"count": len(signals), "signals": signals}
+
+
+_price_sync_task: Optional[asyncio.Task] = None
+
+
+@app.post("/api/prices/sync")
+async def start_price_sync(request: Optional[dict] = None, current_user: dict = Depends(get_current_user)):
+    """后台启动全市场日线同步 (同一时间只运行一个)；request 可含 start_date / end_date / resume / workers"""
+    from utils.price_sync import PriceSyncJob, SYNC_WORKERS
+
+    global _price_sync_task
+    if _price_sync_task and not _price_sync_task.done():
+        raise HTTPException(status_code=409, detail="A price sync job is already running")
+
+    request = request or {}
+    db = get_news_tools().db
+    job_id = f"sync_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    job = PriceSyncJob(db, workers=int(request.get("workers") or SYNC_WORKERS))
+    _price_sync_task = asyncio.create_task(asyncio.to_thread(
+        job.run, start_date=request.get("start_date"), end_date=request.get("end_date"),
+        resume=bool(request.get("resume")), job_id=job_id,
+    ))
+    return {"status": "started", "job_id": None if request.get("resume") else job_id}
+
+
+@app.get("/api/prices/sync")
+async def get_price_sync(job_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """同步任务进度 (默认最近一次)，含吞吐 tickers/min"""
+    job = get_news_tools().db.get_price_sync_job(job_id)
+    if not job:
+        return {"status": "idle", "job": None}
+    if job.get("started_at"):
+        end = job.get("finished_at") or job.get("updated_at")
+        elapsed = (datetime.fromisoformat(end) - datetime.fromisoformat(job["started_at"])).total_seconds()
+        job["tickers_per_min"] = round((job["done"] + job["failed"]) / elapsed * 60, 1) if elapsed > 0 else 0.0
+    return {
+        "status": job["status"],
+        "is_running": bool(_price_sync_task and not _price_sync_task.done()),
+        "job": job,
+    }
+
+
 @app.post("/api/suggest-queries")
 async def suggest_queries(request: dict):
     """使用 LLM 根据新闻标题生成 10 个候选 Query 供用户选择"""
@@ -0,0 +1,160 @@
+"""
+asyncio 行情客户端基准 (本地桩服务器)
+
+本地启动一个模拟东方财富列表接口 (clist) 与 K 线接口的 HTTP 服务，对比:
+
+    1. 股票列表: 旧的逐页顺序请求 vs StockAPIDirect.fetch_stock_list_em (拿到 total 后并发拉取其余页)
+    2. 多只股票 K 线: 线程池 + 同步 HttpClient (旧路径) vs asyncio.gather(afetch_kline_eastmoney)
+       (每主机并发 --concurrency)，以及线程池调用同步包装 fetch_kline_eastmoney (现有调用方)
+
+--page-cap 模拟服务端把 pz 截断为更小的页；--latency-ms 为每个请求注入的服务端延迟。
+
+用法:
+    python scripts/bench_async_market_data.py
+    python scripts/bench_async_market_data.py --stocks 5800 --page-cap 100 --tickers 200 --latency-ms 50
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+import utils.stock_tools as stock_tools  # noqa: E402
+from utils.http_client import AsyncHttpClient, HttpClient, httpx  # noqa: E402
+
+
+def kline_payload(n_bars: int = 250) -> bytes:
+    klines = []
+    day = dt.date(2024, 1, 1)
+    for i in range(n_bars):
+        close = 10 + i * 0.01
+        klines.append(f"{day.isoformat()},{close},{close},{close + 0.1},{close - 0.1},100000,1000000,1.0,0.1,0.01,0.5")
+        day += dt.timedelta(days=1)
+    return json.dumps({"data": {"code": "600519", "klines": klines}}).encode()
+
+
+def make_handler(n_stocks: int, page_cap: int, latency_s: float):
+    klines = kline_payload()
+    stocks = [{"f12": f"{i:06d}", "f14": f"股票{i}"} for i in range(n_stocks)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency_s)
+            url = urlparse(self.path)
+            if url.path.endswith("/clist/get"):
+                query = parse_qs(url.query)
+                page, size = int(query["pn"][0]), min(int(query["pz"][0]), page_cap)
+                diff = stocks[(page - 1) * size: page * size]
+                body = json.dumps({"data": {"total": n_stocks, "diff": diff}}).encode()
+            else:
+                body = klines
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def sequential_stock_list(client: HttpClient) -> int:
+    """旧实现：逐页顺序请求直到凑够 total"""
+    api = stock_tools.StockAPIDirect
+    items, page = [], 1
+    while True:
+        params = {'pn': str(page), 'pz': str(api.EM_PAGE_SIZE), 'po': '1', 'np': '1', 'fltt': '2', 'invt': '2',
+                  'fid': 'f12', 'fs': 'm:0+t:6', 'fields': 'f12,f14', 'ut': api.EM_UT}
+        data = client.get(api.EM_LIST_URL, params=params, headers=api.DEFAULT_HEADERS, timeout=15).json().get('data', {})
+        diff = data.get('diff', [])
+        if not diff:
+            break
+        items.extend(diff)
+        if len(items) >= data.get('total', 0):
+            break
+        page += 1
+    return len(items)
+
+
+def timed(label: str, fn, unit: str):
+    t0 = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<52} {count:>6} {unit} {elapsed:>7.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio market data client benchmark against a local stub")
+    parser.add_argument("--stocks", type=int, default=5800, help="Rows served by the list endpoint")
+    parser.add_argument("--page-cap", type=int, default=100, help="Max rows the stub returns per page")
+    parser.add_argument("--tickers", type=int, default=200, help="K-line fetches in the multi-ticker run")
+    parser.add_argument("--concurrency", type=int, default=8, help="Per-host concurrency (threads / async)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Injected delay per request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.stocks, args.page_cap, args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    api = stock_tools.StockAPIDirect
+    api.EM_LIST_URL = f"{base}/api/qt/clist/get"
+    api.EM_KLINE_URL = f"{base}/api/qt/stock/kline/get"
+    stock_tools.async_http = AsyncHttpClient(host_concurrency=args.concurrency, pool_maxsize=args.concurrency)
+    print(f"stub: {base} ({args.stocks} stocks, {args.page_cap}/page, latency {args.latency_ms}ms, "
+          f"concurrency {args.concurrency}, httpx={'yes' if httpx else 'no (thread fallback)'})")
+
+    sync_client = HttpClient(pool_maxsize=args.concurrency)
+    baseline = timed("stock list: sequential pages (old)", lambda: sequential_stock_list(sync_client), "rows")
+    concurrent = timed("stock list: fetch_stock_list_em (concurrent pages)",
+                       lambda: len(api.fetch_stock_list_em('a')), "rows")
+    print(f"speedup: {baseline / concurrent:.2f}x")
+
+    tickers = [f"{600000 + i}" for i in range(args.tickers)]
+    params = {'klt': '101', 'fqt': '1', 'beg': "20240101", 'end': "20241231", 'lmt': '1000', 'ut': api.EM_UT}
+
+    def threaded_requests():
+        def fetch(t):
+            resp = sync_client.get(api.EM_KLINE_URL, params={**params, 'secid': api._get_em_secid(t)},
+                                   headers=api.DEFAULT_HEADERS, timeout=12)
+            return api._parse_em_klines(resp.json())
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            return sum(1 for df in executor.map(fetch, tickers) if not df.empty)
+
+    def threaded_sync_wrapper():
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            frames = executor.map(lambda t: api.fetch_kline_eastmoney(t, "20240101", "20241231"), tickers)
+            return sum(1 for df in frames if not df.empty)
+
+    async def gathered():
+        frames = await asyncio.gather(*(api.afetch_kline_eastmoney(t, "20240101", "20241231") for t in tickers))
+        await stock_tools.async_http.aclose()
+        return sum(1 for df in frames if not df.empty)
+
+    baseline = timed(f"klines: {args.concurrency} threads + HttpClient (old)", threaded_requests, "ok")
+    timed(f"klines: {args.concurrency} threads + sync wrapper", threaded_sync_wrapper, "ok")
+    gathered_s = timed("klines: asyncio.gather(afetch_kline_eastmoney)", lambda: asyncio.run(gathered()), "ok")
+    print(f"speedup: {baseline / gathered_s:.2f}x")
+    print(json.dumps(stock_tools.async_http.stats(), indent=2))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
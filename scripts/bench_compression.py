@@ -0,0 +1,177 @@
+"""
+大文本列压缩基准: 数据库体积与 get_run_data / get_search_cache 读取延迟
+
+每种压缩模式在独立子进程中运行 (压缩参数在导入时读取环境变量)，写入相同的合成数据:
+    none       不压缩 (旧行为)
+    zlib       DB_COMPRESSION=zlib
+    zstd       DB_COMPRESSION=zstd (需安装 zstandard)
+    zstd+dict  zstd + 用同分布样本训练的共享字典
+
+用法:
+    python scripts/bench_compression.py --runs 200 --queries 500
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root()))
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+_WORDS = ("半导体 光伏 储能 新能源 汽车 算力 芯片 出口 政策 利好 订单 业绩 预告 增长 下滑 "
+          "产能 扩张 价格 上涨 回落 资金 流入 北向 机构 调研 龙头 估值 修复 风险 提示").split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    paras = []
+    while words > 0:
+        n = min(words, rng.randint(30, 80))
+        paras.append("".join(rng.choice(_WORDS) for _ in range(n)) + "。")
+        words -= n
+    return "\n\n".join(paras)
+
+
+def make_run_data(rng: random.Random) -> dict:
+    signals = [{
+        "signal_id": f"sig_{rng.getrandbits(32):08x}",
+        "title": _text(rng, 6),
+        "summary": _text(rng, 60),
+        "transmission_chain": [{"node_name": _text(rng, 2), "impact_type": rng.choice(["利好", "利空"]),
+                                "logic": _text(rng, 15)} for _ in range(4)],
+        "impact_tickers": [{"ticker": f"{rng.randint(1, 688999):06d}", "name": _text(rng, 2),
+                            "weight": round(rng.random(), 2)} for _ in range(3)],
+        "sentiment_score": round(rng.uniform(-1, 1), 2),
+        "confidence": round(rng.random(), 2),
+    } for _ in range(rng.randint(5, 12))]
+    charts = {s["signal_id"]: {"dates": [f"2025-01-{d:02d}" for d in range(1, 29)],
+                               "close": [round(rng.uniform(5, 50), 2) for _ in range(28)]} for s in signals}
+    graph = {"nodes": [{"id": i, "label": _text(rng, 2)} for i in range(30)],
+             "edges": [{"source": rng.randrange(30), "target": rng.randrange(30)} for _ in range(60)]}
+    return {"signals": signals, "charts": charts, "graph": graph}
+
+
+def make_results(rng: random.Random) -> list:
+    return [{
+        "id": f"item_{rng.getrandbits(32):08x}",
+        "rank": i,
+        "title": _text(rng, 8),
+        "url": f"https://news.example.com/{rng.getrandbits(40):x}",
+        "content": _text(rng, rng.randint(200, 1500)),
+        "source": "Search (ddg)",
+        "publish_time": "2025-01-01T00:00:00",
+        "sentiment_score": round(rng.uniform(-1, 1), 2),
+    } for i in range(1, 6)]
+
+
+def percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+    return {"p50_us": round(statistics.median(samples), 1),
+            "p95_us": round(samples[int(len(samples) * 0.95) - 1], 1)}
+
+
+def worker(db_path: str, runs: int, queries: int, seed: int) -> dict:
+    from utils.database_manager import DatabaseManager
+    from dashboard.db import DashboardDB
+    from dashboard.models import DashboardRun
+
+    rng = random.Random(seed)
+    db = DatabaseManager(db_path)
+    dash = DashboardDB(db_path)
+    try:
+        run_ids = [f"run_{i}" for i in range(runs)]
+        for run_id in run_ids:
+            dash.create_run(DashboardRun(run_id=run_id, query="bench"))
+            dash.save_run_data(run_id, make_run_data(rng))
+        hashes = [f"q_{i}" for i in range(queries)]
+        for h in hashes:
+            db.save_search_cache(h, f"bench {h}", "ddg", make_results(rng))
+        db.flush_writes()
+        with db.pool.read() as conn:
+            db_bytes = conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+        def timed(fn, keys):
+            samples = []
+            for key in keys:
+                t0 = time.perf_counter()
+                assert fn(key)
+                samples.append((time.perf_counter() - t0) * 1e6)
+            return percentiles(samples)
+
+        return {
+            "db_mb": round(db_bytes / 1e6, 2),
+            "get_run_data": timed(dash.get_run_data, run_ids * 3),
+            "get_search_cache": timed(db.get_search_cache, hashes * 3),
+        }
+    finally:
+        dash.close()
+        db.close()
+
+
+def train_dict(path: Path, seed: int):
+    from utils.compression import train_dictionary
+
+    rng = random.Random(seed)
+    samples = [json.dumps(make_run_data(rng), ensure_ascii=False) for _ in range(100)]
+    samples += [item["content"] for _ in range(200) for item in make_results(rng)]
+    path.write_bytes(train_dictionary(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compression size / read latency benchmark")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--modes", type=str, default="none,zlib,zstd,zstd+dict")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--train-dict", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    if args.train_dict:
+        train_dict(Path(args.train_dict), args.seed + 1)
+        return
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.runs, args.queries, args.seed)))
+        return
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="alphaear_compress_"))
+    try:
+        dict_path = tmp_dir / "bench.zdict"
+        print(f"{'mode':<10} {'db(MB)':>8} {'run_data p50/p95(us)':>22} {'search p50/p95(us)':>20}")
+        for mode in args.modes.split(","):
+            env = dict(os.environ, DB_COMPRESSION=mode.split("+")[0], DB_COMPRESSION_DICT="", RETENTION_INTERVAL_S="0")
+            if mode.endswith("+dict"):
+                subprocess.run([sys.executable, __file__, "--train-dict", str(dict_path), "--seed", str(args.seed)],
+                               env=env, check=True)
+                env["DB_COMPRESSION_DICT"] = str(dict_path)
+            db_path = tmp_dir / f"{mode.replace('+', '_')}.db"
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", str(db_path), "--runs", str(args.runs),
+                 "--queries", str(args.queries), "--seed", str(args.seed)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            rd, sc = r["get_run_data"], r["get_search_cache"]
+            print(f"{mode:<10} {r['db_mb']:>8.2f} {rd['p50_us']:>10.1f}/{rd['p95_us']:<11.1f} {sc['p50_us']:>9.1f}/{sc['p95_us']:<10.1f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+DatabaseManager / DashboardDB 并发读写基准
+
+模拟 N 个并发分析 worker（对应 SignalFluxWorkflow.run 的 ThreadPoolExecutor），
+每个 worker 交替执行读操作（get_daily_news / get_stock_prices / get_search_cache / get_steps）
+与写操作（save_signal / update_news_content / add_step），统计读写吞吐与 "database is locked" 次数。
+
+用法:
+    python scripts/bench_db_concurrency.py --workers 1,2,4,8 --ops 500
+"""
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root()))
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.database_manager import DatabaseManager  # noqa: E402
+from dashboard.db import DashboardDB  # noqa: E402
+from dashboard.models import DashboardRun, DashboardStep  # noqa: E402
+
+
+def seed(db: DatabaseManager, dash: DashboardDB, n_news: int = 2000, n_days: int = 250):
+    news = [
+        {"id": f"seed_{i}", "source": "cls", "rank": i, "title": f"新闻标题 {i}", "url": f"https://example.com/{i}", "content": "正文" * 50}
+        for i in range(n_news)
+    ]
+    db.save_daily_news(news)
+
+    start = datetime(2024, 1, 1)
+    df = pd.DataFrame({
+        "date": [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(n_days)],
+        "open": 10.0, "close": 10.5, "high": 11.0, "low": 9.5, "volume": 1e6, "change_pct": 0.5,
+    })
+    for ticker in ("600519", "000001", "300750"):
+        db.save_stock_prices(ticker, df)
+
+    db.save_search_cache("bench_hash", "bench query", "ddg", [
+        {"id": f"r{i}", "rank": i, "title": f"结果 {i}", "url": f"https://example.com/r{i}", "content": "内容" * 100}
+        for i in range(5)
+    ])
+    dash.create_run(DashboardRun(run_id="bench_run", query="bench", status="running", started_at=datetime.now().isoformat()))
+
+
+def worker(db: DatabaseManager, dash: DashboardDB, wid: int, ops: int, write_ratio: float, stats: dict, lock: threading.Lock):
+    reads = writes = locked = 0
+    read_time = write_time = 0.0
+    write_every = max(1, int(round(1 / write_ratio))) if write_ratio > 0 else 0
+    for i in range(ops):
+        is_write = bool(write_every) and i % write_every == 0
+        t0 = time.perf_counter()
+        try:
+            if is_write:
+                k = i % 3
+                if k == 0:
+                    db.save_signal({"signal_id": f"sig_{wid}_{i}", "title": "bench", "impact_tickers": [{"ticker": "600519"}]})
+                elif k == 1:
+                    db.update_news_content(f"seed_{i % 2000}", analysis=f"analysis {wid}-{i}")
+                else:
+                    dash.add_step(DashboardStep(run_id="bench_run", step_type="thought", agent="Bench", content=f"step {wid}-{i}", timestamp=datetime.now().isoformat()))
+                writes += 1
+                write_time += time.perf_counter() - t0
+            else:
+                k = i % 4
+                if k == 0:
+                    db.get_daily_news(limit=50, days=3650)
+                elif k == 1:
+                    db.get_stock_prices("600519", "2024-01-01", "2024-12-31")
+                elif k == 2:
+                    db.get_search_cache("bench_hash")
+                else:
+                    dash.get_steps("bench_run", limit=100)
+                reads += 1
+                read_time += time.perf_counter() - t0
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e):
+                locked += 1
+            else:
+                raise
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["locked"] += locked
+        stats["read_time"] += read_time
+        stats["write_time"] += write_time
+
+
+def run_once(db_path: str, n_workers: int, ops: int, write_ratio: float) -> dict:
+    db = DatabaseManager(db_path)
+    dash = DashboardDB(db_path)
+    stats = {"reads": 0, "writes": 0, "locked": 0, "read_time": 0.0, "write_time": 0.0}
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        for wid in range(n_workers):
+            executor.submit(worker, db, dash, wid, ops, write_ratio, stats, lock)
+    elapsed = time.perf_counter() - t0
+    dash.close()
+    db.close()
+    return {
+        "workers": n_workers,
+        "elapsed_s": elapsed,
+        "reads_per_s": stats["reads"] / elapsed,
+        "writes_per_s": stats["writes"] / elapsed,
+        "read_p_avg_ms": 1000 * stats["read_time"] / max(stats["reads"], 1),
+        "write_p_avg_ms": 1000 * stats["write_time"] / max(stats["writes"], 1),
+        "locked_errors": stats["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite pool concurrency benchmark")
+    parser.add_argument("--workers", type=str, default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--ops", type=int, default=500, help="Operations per worker")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that are writes")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="alphaear_bench_")
+    db_path = str(Path(tmp_dir) / "bench.db")
+    try:
+        db = DatabaseManager(db_path)
+        dash = DashboardDB(db_path)
+        seed(db, dash)
+        dash.close()
+        db.close()
+
+        print(f"{'workers':>8} {'elapsed(s)':>10} {'reads/s':>10} {'writes/s':>10} {'read avg(ms)':>13} {'write avg(ms)':>14} {'locked':>7}")
+        for n in [int(x) for x in args.workers.split(",") if x.strip()]:
+            r = run_once(db_path, n, args.ops, args.write_ratio)
+            print(f"{r['workers']:>8} {r['elapsed_s']:>10.2f} {r['reads_per_s']:>10.0f} {r['writes_per_s']:>10.0f} "
+                  f"{r['read_p_avg_ms']:>13.3f} {r['write_p_avg_ms']:>14.3f} {r['locked_errors']:>7}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+DatabaseManager / DashboardDB 构造延迟基准
+
+场景:
+    legacy  每次构造都执行全部 CREATE TABLE / INDEX / 触发器 (版本化迁移之前的行为)
+    cold    进程内没有其他持有者，每次构造都新建连接池 (读取 user_version 后跳过迁移)
+    warm    连接池已被长期持有 (例如服务进程)，每个请求构造一个 DatabaseManager
+
+用法:
+    python scripts/bench_db_construction.py --iterations 500
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root()))
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.database_manager import DatabaseManager  # noqa: E402
+from dashboard.db import DashboardDB  # noqa: E402
+
+
+def legacy_construct(db_path: str):
+    """旧行为: 构造时无条件执行全部 DDL"""
+    db = DatabaseManager(db_path)
+    dash = DashboardDB(db_path)
+    with db.pool.write() as conn:
+        cursor = conn.cursor()
+        db._create_tables(cursor)
+        db._create_fts_indexes(cursor)
+        dash._create_tables(cursor)
+    dash.close()
+    db.close()
+
+
+def construct(db_path: str):
+    db = DatabaseManager(db_path)
+    dash = DashboardDB(db_path)
+    dash.close()
+    db.close()
+
+
+def measure(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<8} {statistics.mean(samples):>10.1f} {statistics.median(samples):>10.1f} {p95:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseManager construction latency benchmark")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    # 日志输出本身的开销会掩盖构造耗时
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    tmp_dir = tempfile.mkdtemp(prefix="alphaear_construct_")
+    db_path = str(Path(tmp_dir) / "bench.db")
+    try:
+        construct(db_path)  # 建库 + 迁移到最新版本
+
+        print(f"{'scenario':<8} {'mean(us)':>10} {'p50(us)':>10} {'p95(us)':>10}")
+        report("legacy", measure(lambda: legacy_construct(db_path), args.iterations))
+        report("cold", measure(lambda: construct(db_path), args.iterations))
+
+        holder = DatabaseManager(db_path)
+        try:
+            report("warm", measure(lambda: construct(db_path), args.iterations))
+        finally:
+            holder.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
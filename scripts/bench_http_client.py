@@ -0,0 +1,152 @@
+"""
+共享 HTTP 客户端基准 (本地桩服务器)
+
+本地启动一个模拟东方财富 K 线接口的 HTTP 服务，按 StockAPIDirect 的请求参数
+顺序请求 N 次，对比:
+
+    1. requests.get: 每次新建连接 (旧实现)
+    2. utils.http_client.http: 按主机复用 keep-alive 连接
+
+--handshake-ms 在服务端为每个新连接注入延迟，模拟公网 TCP+TLS 建连的往返时间；
+--tls 使用自签名证书走真实 TLS 握手 (需要 cryptography)。
+
+用法:
+    python scripts/bench_http_client.py
+    python scripts/bench_http_client.py --requests 100 --handshake-ms 40 --latency-ms 10 --tls
+"""
+import argparse
+import datetime as dt
+import functools
+import json
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+import requests  # noqa: E402
+
+import utils.stock_tools as stock_tools  # noqa: E402
+from utils.http_client import HttpClient  # noqa: E402
+
+
+def kline_payload(n_bars: int = 250) -> bytes:
+    klines = []
+    day = dt.date(2024, 1, 1)
+    for i in range(n_bars):
+        close = 10 + i * 0.01
+        klines.append(f"{day.isoformat()},{close},{close},{close + 0.1},{close - 0.1},100000,1000000,1.0,0.1,0.01,0.5")
+        day += dt.timedelta(days=1)
+    return json.dumps({"data": {"code": "600519", "klines": klines}}).encode()
+
+
+def make_handler(payload: bytes, handshake_s: float, latency_s: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # 头部与正文分两次写出，避免 Nagle + 延迟 ACK 的 40ms 停顿
+
+        def setup(self):
+            # 每个新连接只执行一次：模拟建连往返
+            time.sleep(handshake_s)
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def self_signed_context(tmp_dir: str) -> ssl.SSLContext:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + dt.timedelta(days=1)).sign(key, hashes.SHA256()))
+    cert_path, key_path = Path(tmp_dir) / "cert.pem", Path(tmp_dir) / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(cert_path, key_path)
+    return ctx
+
+
+def run(label: str, client, n: int) -> float:
+    api = stock_tools.StockAPIDirect
+    params = {'secid': api._get_em_secid("600519"), 'klt': '101', 'fqt': '1',
+              'beg': "20240101", 'end': "20241231", 'lmt': '1000', 'ut': api.EM_UT}
+    latencies = []
+    t0 = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        resp = client.get(api.EM_KLINE_URL, params=params, headers=api.DEFAULT_HEADERS, timeout=12)
+        latencies.append((time.perf_counter() - t) * 1000)
+        assert resp.json()['data']['klines']
+    total = time.perf_counter() - t0
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<36} {n:>5} fetches {total:>7.2f}s  mean {statistics.mean(latencies):>7.2f}ms  "
+          f"p50 {latencies[len(latencies) // 2]:>7.2f}ms  p95 {p95:>7.2f}ms")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled HTTP client benchmark against a local K-line stub")
+    parser.add_argument("--requests", type=int, default=100, help="Sequential K-line fetches per client")
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="Injected delay per new connection")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Injected delay per request")
+    parser.add_argument("--tls", action="store_true", help="Serve over TLS with a self-signed certificate")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 make_handler(kline_payload(), args.handshake_ms / 1000, args.latency_ms / 1000))
+    scheme = "http"
+    with tempfile.TemporaryDirectory(prefix="alphaear_http_") as tmp_dir:
+        if args.tls:
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            server.socket = self_signed_context(tmp_dir).wrap_socket(server.socket, server_side=True)
+            scheme = "https"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stock_tools.StockAPIDirect.EM_KLINE_URL = f"{scheme}://127.0.0.1:{server.server_address[1]}/api/qt/stock/kline/get"
+        print(f"stub: {stock_tools.StockAPIDirect.EM_KLINE_URL} "
+              f"(handshake {args.handshake_ms}ms, latency {args.latency_ms}ms, tls={args.tls})")
+
+        verify = not args.tls
+        baseline = run("requests.get (new connection)",
+                       types.SimpleNamespace(get=functools.partial(requests.get, verify=verify)), args.requests)
+        pooled_client = HttpClient()
+        pooled_client.session.verify = verify
+        pooled = run("HttpClient (keep-alive pool)", pooled_client, args.requests)
+        print(f"speedup: {baseline / pooled:.2f}x")
+        print(json.dumps(pooled_client.stats(), indent=2))
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
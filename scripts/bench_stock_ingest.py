@@ -0,0 +1,115 @@
+"""
+stock_prices 写入吞吐基准
+
+对比旧的逐行 iterrows + INSERT 路径与新的列式 executemany 路径 (save_stock_prices /
+save_stock_prices_many)，输出 rows/sec。
+
+场景:
+    1. 1 只股票 × 1000 个交易日
+    2. 5000 只股票 × 250 个交易日 (全市场同步)
+
+用法:
+    python scripts/bench_stock_ingest.py
+    python scripts/bench_stock_ingest.py --tickers 500 --skip-legacy
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.database_manager import DatabaseManager  # noqa: E402
+
+
+def make_frame(n_days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.2, n_days))
+    return pd.DataFrame({
+        "date": pd.bdate_range("2020-01-01", periods=n_days).strftime("%Y-%m-%d"),
+        "open": close + rng.normal(0, 0.05, n_days),
+        "close": close,
+        "high": close + 0.3,
+        "low": close - 0.3,
+        "volume": rng.integers(1e5, 1e7, n_days),
+        "change_pct": rng.normal(0, 1.5, n_days),
+    })
+
+
+def legacy_save(db: DatabaseManager, ticker: str, df: pd.DataFrame):
+    """旧实现: 逐行 INSERT OR REPLACE"""
+    with db.pool.write() as conn:
+        cursor = conn.cursor()
+        for _, row in df.iterrows():
+            cursor.execute("""
+                INSERT OR REPLACE INTO stock_prices
+                (ticker, date, open, close, high, low, volume, change_pct)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (ticker, row['date'], row['open'], row['close'], row['high'],
+                  row['low'], float(row['volume']), row['change_pct']))
+
+
+def timed(label: str, n_rows: int, fn):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<48} {n_rows:>10,} rows {elapsed:>8.2f}s {n_rows / elapsed:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stock_prices ingestion benchmark")
+    parser.add_argument("--days", type=int, default=1000, help="Days for the single-ticker case")
+    parser.add_argument("--tickers", type=int, default=5000, help="Tickers for the full-market case")
+    parser.add_argument("--market-days", type=int, default=250, help="Days per ticker for the full-market case")
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the slow iterrows baseline")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="alphaear_ingest_")
+    try:
+        # --- 1 ticker × N days ---
+        single = make_frame(args.days)
+        if not args.skip_legacy:
+            db = DatabaseManager(str(Path(tmp_dir) / "legacy_single.db"))
+            timed(f"legacy iterrows   1 × {args.days}", len(single), lambda: legacy_save(db, "600519", single))
+            db.close()
+        db = DatabaseManager(str(Path(tmp_dir) / "bulk_single.db"))
+        timed(f"save_stock_prices 1 × {args.days}", len(single), lambda: db.save_stock_prices("600519", single))
+        db.close()
+
+        # --- M tickers × K days ---
+        base = make_frame(args.market_days, seed=1)
+        tickers = [f"{600000 + i:06d}" for i in range(args.tickers)]
+        long_df = pd.concat([base.assign(ticker=t) for t in tickers], ignore_index=True)
+        n_rows = len(long_df)
+
+        if not args.skip_legacy:
+            db = DatabaseManager(str(Path(tmp_dir) / "legacy_market.db"))
+            timed(f"legacy iterrows   {args.tickers} × {args.market_days}", n_rows,
+                  lambda: [legacy_save(db, t, base) for t in tickers])
+            db.close()
+
+        db = DatabaseManager(str(Path(tmp_dir) / "bulk_per_ticker.db"))
+        timed(f"save_stock_prices {args.tickers} × {args.market_days}", n_rows,
+              lambda: [db.save_stock_prices(t, base) for t in tickers])
+        db.close()
+
+        db = DatabaseManager(str(Path(tmp_dir) / "bulk_many.db"))
+        timed(f"save_stock_prices_many {args.tickers} × {args.market_days}", n_rows,
+              lambda: db.save_stock_prices_many(long_df))
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
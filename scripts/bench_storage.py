@@ -0,0 +1,373 @@
+"""
+存储层基准套件: 合成数据生成 + 热点读方法计时，输出可跨版本 diff 的 JSON 报告
+
+按 --rows (每张大表的行数量级，10k ~ 10M) 生成:
+    daily_news       rows 条 (正文按内容寻址共享 documents，标题/正文带 FTS 索引)
+    search_detail    rows 条 (rows / 5 个缓存查询，每个 5 条结果)
+    stock_prices     rows 条 (rows / 250 支股票 × 250 个交易日)
+    signals          rows / 10 条 (含 signal_tickers / signal_industries 索引)
+    dashboard_steps  rows 条 (rows / 100 次运行)
+
+批量装载直接写表 (绕过写入队列)，FTS 分词按标题/正文模板缓存，千万级也能在可接受时间内完成。
+生成的库可用 --db 保留并在不同版本间复用 (--reuse)，保证对比的是同一份数据。
+
+用法:
+    python scripts/bench_storage.py --rows 100000 --out bench_100k.json
+    python scripts/bench_storage.py --rows 100000 --db /tmp/bench.db --reuse --baseline bench_100k.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+# 后台清理会删除合成的历史数据，基准期间关闭
+os.environ.setdefault("RETENTION_INTERVAL_S", "0")
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root()))
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.compression import compress_text  # noqa: E402
+from utils.database_manager import DatabaseManager  # noqa: E402
+from utils.documents import content_hash  # noqa: E402
+from utils.fts import fts_tokens  # noqa: E402
+from dashboard.db import DashboardDB  # noqa: E402
+
+_CHUNK = 50_000
+_SOURCES = ["cls", "wallstreetcn", "xueqiu", "weibo", "zhihu", "36kr", "ithome", "thepaper"]
+_WORDS = ("半导体 光伏 储能 新能源 汽车 算力 芯片 出口 政策 利好 订单 业绩 预告 增长 下滑 产能 扩张 "
+          "价格 上涨 回落 资金 流入 机构 调研 龙头 估值 修复 风险 白酒 医药 银行 地产 军工 稀土").split()
+_INDUSTRIES = ["半导体", "新能源", "白酒", "医药", "银行", "地产", "军工", "有色金属", "汽车", "传媒"]
+_STEP_TYPES = ["system", "tool_call", "result", "thought", "signal", "warning"]
+
+
+# --- 合成数据 ---
+
+class Generator:
+    def __init__(self, rows: int, seed: int, days: int = 90):
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.now = datetime.now()
+        self.days = days
+        rng = self.rng
+        self.titles = ["".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 6))) for _ in range(2000)]
+        self.bodies = [
+            "\n\n".join("".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120))) + "。" for _ in range(4))
+            for _ in range(min(5000, max(50, rows // 20)))
+        ]
+        self.body_hashes = [content_hash(b) for b in self.bodies]
+        self._title_tokens = {}
+        self._body_tokens = {}
+        self.news_urls = max(1, rows // 2)
+        self.queries = max(1, rows // 5)
+        self.tickers = [f"{600000 + i:06d}" for i in range(max(10, rows // 250))]
+        self.runs = max(10, rows // 100)
+        self.users = [str(u) for u in range(1, 11)]
+
+    def ts(self, i: int, n: int) -> str:
+        """第 i / n 条记录的时间 (从 days 天前均匀递增到现在)"""
+        return (self.now - timedelta(seconds=self.days * 86400 * (1 - (i + 1) / n))).isoformat()
+
+    def title_tokens(self, t: int) -> str:
+        if t not in self._title_tokens:
+            self._title_tokens[t] = fts_tokens(self.titles[t])
+        return self._title_tokens[t]
+
+    def body_tokens(self, b: int) -> str:
+        if b not in self._body_tokens:
+            self._body_tokens[b] = fts_tokens(self.bodies[b])
+        return self._body_tokens[b]
+
+
+def _chunks(n: int):
+    for start in range(0, n, _CHUNK):
+        yield start, min(n, start + _CHUNK)
+
+
+def load(db: DatabaseManager, dash: DashboardDB, g: Generator):
+    rng, n = g.rng, g.rows
+    with db.pool.write() as conn:
+        # 装载期间移除逐行分词的 FTS 触发器，改为按模板缓存的分词结果直接写入
+        for trig in ("daily_news_fts_bi", "daily_news_fts_ai", "search_cache_fts_bi", "search_cache_fts_ai"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trig}")
+        now = g.now.isoformat()
+        conn.executemany(
+            "INSERT OR IGNORE INTO documents (doc_hash, content, size, created_at) VALUES (?, ?, ?, ?)",
+            [(h, compress_text(b), len(b.encode("utf-8")), now) for h, b in zip(g.body_hashes, g.bodies)],
+        )
+
+    # daily_news + FTS
+    for start, end in _chunks(n):
+        news, fts = [], []
+        for i in range(start, end):
+            t, b = rng.randrange(len(g.titles)), rng.randrange(len(g.bodies))
+            ts = g.ts(i, n)
+            news.append((f"n{i}", rng.choice(_SOURCES), i % 50 + 1, f"{g.titles[t]} {i}",
+                         f"https://news.example.com/{i % g.news_urls}", g.body_hashes[b], ts, ts,
+                         round(rng.uniform(-1, 1), 3), "{}"))
+            fts.append((i + 1, f"{g.title_tokens(t)} {i} {g.body_tokens(b)}"))
+        with db.pool.write() as conn:
+            conn.executemany("""
+                INSERT INTO daily_news (rowid, id, source, rank, title, url, content_hash, publish_time,
+                                        crawl_time, sentiment_score, meta_data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(k + 1,) + row for k, row in zip(range(start, end), news)])
+            conn.executemany("INSERT INTO daily_news_fts (rowid, tokens) VALUES (?, ?)", fts)
+
+    # search_cache / search_detail (每个查询 5 条结果)
+    q_total = g.queries
+    for start, end in _chunks(q_total):
+        caches, details, fts = [], [], []
+        for q in range(start, end):
+            t = rng.randrange(len(g.titles))
+            ts = g.ts(q, q_total)
+            items = []
+            for r in range(1, 6):
+                b = rng.randrange(len(g.bodies))
+                url = f"https://search.example.com/{rng.randrange(n)}"
+                items.append({"id": f"s{q}_{r}", "rank": r, "title": g.titles[rng.randrange(len(g.titles))],
+                              "url": url, "content_hash": g.body_hashes[b], "source": "Search (ddg)"})
+                details.append((f"s{q}_{r}", f"q{q}", r, items[-1]["title"], url, g.body_hashes[b], ts, ts,
+                                round(rng.uniform(-1, 1), 3), "Search (ddg)", "{}"))
+            caches.append((q + 1, f"q{q}", f"{g.titles[t]} {q}", "ddg", compress_text(json.dumps(items)), ts))
+            fts.append((q + 1, f"{g.title_tokens(t)} {q}"))
+        with db.pool.write() as conn:
+            conn.executemany("""
+                INSERT INTO search_cache (rowid, query_hash, query, engine, results, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, caches)
+            conn.executemany("""
+                INSERT INTO search_detail (id, query_hash, rank, title, url, content_hash, publish_time,
+                                           crawl_time, sentiment_score, source, meta_data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, details)
+            conn.executemany("INSERT INTO search_cache_fts (rowid, tokens) VALUES (?, ?)", fts)
+
+    # stock_prices: 每支股票 250 个交易日
+    dates = []
+    d = g.now.date()
+    while len(dates) < 250:
+        if d.weekday() < 5:
+            dates.append(d.isoformat())
+        d -= timedelta(days=1)
+    dates.reverse()
+    rows = []
+    for ticker in g.tickers:
+        price = rng.uniform(5, 200)
+        for day in dates:
+            change = rng.gauss(0, 0.02)
+            close = price * (1 + change)
+            rows.append((ticker, day, price, close, max(price, close) * 1.01, min(price, close) * 0.99,
+                         rng.randint(10_000, 10_000_000), change * 100))
+            price = close
+        if len(rows) >= _CHUNK:
+            db._upsert_price_rows(rows)
+            rows = []
+    if rows:
+        db._upsert_price_rows(rows)
+
+    # signals + 标的/行业索引
+    s_total = max(1, n // 10)
+    for start, end in _chunks(s_total):
+        signals, tickers, industries = [], [], []
+        for i in range(start, end):
+            ts, user = g.ts(i, s_total), rng.choice(g.users)
+            picked = rng.sample(g.tickers, k=min(len(g.tickers), rng.randint(1, 3)))
+            tags = rng.sample(_INDUSTRIES, k=rng.randint(1, 2))
+            impact = [{"ticker": t, "name": t, "weight": round(rng.random(), 2)} for t in picked]
+            signals.append((f"sig{i}", g.titles[rng.randrange(len(g.titles))], "synthetic", "[]",
+                            round(rng.uniform(-1, 1), 2), round(rng.random(), 2), rng.randint(1, 5), "T+3",
+                            "未定价", json.dumps(impact), json.dumps(tags, ensure_ascii=False), "[]", user, ts))
+            tickers += [(f"sig{i}", it["ticker"], it["name"], it["weight"], user, ts) for it in impact]
+            industries += [(f"sig{i}", tag, user, ts) for tag in tags]
+        with db.pool.write() as conn:
+            conn.executemany("""
+                INSERT INTO signals (signal_id, title, summary, transmission_chain, sentiment_score, confidence,
+                                     intensity, expected_horizon, price_in_status, impact_tickers, industry_tags,
+                                     sources, user_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, signals)
+            conn.executemany("INSERT INTO signal_tickers VALUES (?, ?, ?, ?, ?, ?)", tickers)
+            conn.executemany("INSERT INTO signal_industries VALUES (?, ?, ?, ?)", industries)
+
+    # dashboard_runs / dashboard_steps
+    with dash.pool.write() as conn:
+        conn.executemany("""
+            INSERT INTO dashboard_runs (run_id, query, status, started_at, finished_at, signal_count, user_id)
+            VALUES (?, ?, 'completed', ?, ?, ?, ?)
+        """, [(f"run{r}", g.titles[r % len(g.titles)], g.ts(r, g.runs), g.ts(r, g.runs), rng.randint(0, 20),
+               rng.choice(g.users)) for r in range(g.runs)])
+    for start, end in _chunks(n):
+        with dash.pool.write() as conn:
+            conn.executemany("""
+                INSERT INTO dashboard_steps (run_id, step_type, agent, content, timestamp) VALUES (?, ?, ?, ?, ?)
+            """, [(f"run{i % g.runs}", rng.choice(_STEP_TYPES), "Bench", g.titles[i % len(g.titles)], g.ts(i, n))
+                  for i in range(start, end)])
+
+    with db.pool.write() as conn:
+        cursor = conn.cursor()
+        db._create_document_views(cursor)
+        db._create_fts(cursor, "search_cache", "query_hash", "new.query", ("query",))
+        conn.execute("ANALYZE")
+
+
+# --- 计时 ---
+
+def timed(fn, iterations: int, warmup: int = 5) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+
+    def pct(p: float) -> float:
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))], 1)
+
+    return {
+        "iterations": iterations,
+        "mean_us": round(statistics.mean(samples), 1),
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(samples[-1], 1),
+    }
+
+
+def run_suite(db: DatabaseManager, dash: DashboardDB, g: Generator, iterations: int) -> dict:
+    rng = random.Random(1)
+    start = (g.now - timedelta(days=60)).strftime("%Y-%m-%d")
+    end = g.now.strftime("%Y-%m-%d")
+    cases = {
+        "get_daily_news": lambda: db.get_daily_news(limit=100, days=1),
+        "get_daily_news[source]": lambda: db.get_daily_news(source=rng.choice(_SOURCES), limit=50, days=7),
+        "get_search_cache": lambda: db.get_search_cache(f"q{rng.randrange(g.queries)}"),
+        "get_stock_prices": lambda: db.get_stock_prices(rng.choice(g.tickers), start, end),
+        "get_history": lambda: dash.get_history(limit=50, user_id=rng.choice(g.users)),
+        "get_steps": lambda: dash.get_steps(f"run{rng.randrange(g.runs)}"),
+        "search_local_news": lambda: db.search_local_news(rng.choice(_WORDS), limit=10),
+        "lookup_references_by_urls[100]": lambda: db.lookup_references_by_urls(
+            [f"https://news.example.com/{rng.randrange(g.news_urls)}" for _ in range(100)]
+        ),
+        "get_signals_by_ticker": lambda: db.get_signals_by_ticker(rng.choice(g.tickers), days=30),
+    }
+    results = {}
+    for name, fn in cases.items():
+        results[name] = timed(fn, iterations)
+        logger.warning(f"{name:<32} p50 {results[name]['p50_us']:>10.1f} us  p95 {results[name]['p95_us']:>10.1f} us")
+    return results
+
+
+def table_counts(db: DatabaseManager) -> dict:
+    with db.pool.read() as conn:
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in (
+            "daily_news", "documents", "search_cache", "search_detail", "stock_prices", "signals",
+            "signal_tickers", "dashboard_runs", "dashboard_steps")}
+        counts["db_bytes"] = conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+    return counts
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=resolve_project_root(),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(report: dict, baseline_path: str):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\n{'method':<32} {'base p50':>10} {'p50':>10} {'ratio':>7}   (baseline {baseline['meta'].get('git_revision')})")
+    for name, r in report["results"].items():
+        b = baseline.get("results", {}).get(name)
+        if not b:
+            print(f"{name:<32} {'-':>10} {r['p50_us']:>10.1f} {'new':>7}")
+            continue
+        print(f"{name:<32} {b['p50_us']:>10.1f} {r['p50_us']:>10.1f} {r['p50_us'] / max(b['p50_us'], 0.1):>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage-layer benchmark suite")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows per large table (10k ~ 10M)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", type=str, default=None, help="database path (default: temp file, deleted afterwards)")
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing --db instead of regenerating")
+    parser.add_argument("--out", type=str, default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", type=str, default=None, help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING", format="{message}")
+
+    tmp_dir = None
+    if args.db:
+        db_path = Path(args.db)
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="alphaear_storage_")
+        db_path = Path(tmp_dir) / "bench.db"
+    if db_path.exists() and not args.reuse:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    g = Generator(args.rows, args.seed)
+    db = DatabaseManager(str(db_path), price_store_dir="")
+    dash = DashboardDB(str(db_path))
+    try:
+        load_s = None
+        if not (args.reuse and table_counts(db)["daily_news"]):
+            t0 = time.perf_counter()
+            load(db, dash, g)
+            load_s = round(time.perf_counter() - t0, 1)
+            logger.warning(f"Generated {args.rows} rows/table in {load_s}s")
+
+        report = {
+            "meta": {
+                "git_revision": git_revision(),
+                "generated_at": datetime.now().isoformat(),
+                "rows": args.rows,
+                "seed": args.seed,
+                "load_seconds": load_s,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "tables": table_counts(db),
+            },
+            "results": run_suite(db, dash, g, args.iterations),
+        }
+    finally:
+        dash.close()
+        db.close()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+        print(f"Report written to {args.out}")
+    else:
+        print(text)
+    if args.baseline:
+        print_comparison(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
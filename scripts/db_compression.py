@@ -0,0 +1,120 @@
+"""
+大文本列压缩维护工具
+
+- --train-dict OUT: 从现有数据 (documents.content / search_cache.results / dashboard_runs.run_data_json)
+  采样训练 zstd 共享字典，之后设置 DB_COMPRESSION_DICT=OUT 启用
+- --recompress: 按当前 DB_COMPRESSION 设置重写仍为明文 (TEXT) 的旧数据，随后增量回收空闲页
+
+用法:
+    python scripts/db_compression.py --train-dict data/alphaear.zdict
+    DB_COMPRESSION_DICT=data/alphaear.zdict python scripts/db_compression.py --recompress
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root()))
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.compression import compress_text, decompress_text, train_dictionary  # noqa: E402
+from utils.database_manager import DatabaseManager  # noqa: E402
+from utils.retention import RetentionManager  # noqa: E402
+from dashboard.db import DashboardDB  # noqa: E402
+
+# (表, 主键, 列)
+COLUMNS = [
+    ("documents", "doc_hash", "content"),
+    ("search_cache", "query_hash", "results"),
+    ("dashboard_runs", "run_id", "run_data_json"),
+]
+_CHUNK = 200
+
+
+def db_bytes(pool) -> int:
+    with pool.read() as conn:
+        return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def collect_samples(pool, limit: int) -> list:
+    samples = []
+    with pool.read() as conn:
+        for table, _, column in COLUMNS:
+            samples += [decompress_text(r[0]) for r in conn.execute(
+                f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY random() LIMIT ?", (limit,)
+            ).fetchall()]
+    return samples
+
+
+def recompress(pool) -> dict:
+    stats = {}
+    for table, key, column in COLUMNS:
+        rewritten = saved = 0
+        last = ""
+        while True:
+            with pool.read() as conn:
+                rows = conn.execute(f"""
+                    SELECT {key}, {column} FROM {table}
+                    WHERE {key} > ? AND typeof({column}) = 'text'
+                    ORDER BY {key} LIMIT ?
+                """, (last, _CHUNK)).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            updates = []
+            for k, text in rows:
+                packed = compress_text(text)
+                if isinstance(packed, bytes):
+                    updates.append((packed, k))
+                    saved += len(text.encode("utf-8")) - len(packed)
+            if updates:
+                with pool.write() as conn:
+                    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE {key} = ?", updates)
+            rewritten += len(updates)
+        stats[f"{table}.{column}"] = {"rows_compressed": rewritten, "bytes_saved": saved}
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a compression dictionary / recompress legacy rows")
+    parser.add_argument("--db", type=str, default=str(resolve_project_root() / "data" / "signal_flux.db"))
+    parser.add_argument("--train-dict", type=str, default=None, help="write a zstd dictionary trained on the DB")
+    parser.add_argument("--dict-size-kb", type=int, default=112)
+    parser.add_argument("--samples", type=int, default=2000, help="max samples per column")
+    parser.add_argument("--recompress", action="store_true", help="compress rows still stored as plain text")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+    if not args.train_dict and not args.recompress:
+        parser.error("nothing to do: pass --train-dict and/or --recompress")
+
+    db = DatabaseManager(args.db)
+    dash = DashboardDB(args.db)
+    try:
+        report = {"db_bytes_before": db_bytes(db.pool)}
+        if args.train_dict:
+            samples = collect_samples(db.pool, args.samples)
+            dictionary = train_dictionary(samples, dict_size=args.dict_size_kb * 1024)
+            Path(args.train_dict).write_bytes(dictionary)
+            report["dictionary"] = {"path": args.train_dict, "samples": len(samples), "bytes": len(dictionary)}
+        if args.recompress:
+            db.flush_writes()
+            report["recompressed"] = recompress(db.pool)
+            report["vacuum"] = RetentionManager(db.pool)._incremental_vacuum()
+        report["db_bytes_after"] = db_bytes(db.pool)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        dash.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
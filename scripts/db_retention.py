@@ -0,0 +1,70 @@
+"""
+手动执行数据保留策略
+
+按 TTL / LRU / 容量预算清理 search_cache、search_detail 与 daily_news.content，
+再用增量 VACUUM 归还空闲页，输出 JSON 清理报告。策略参数默认读取环境变量
+(SEARCH_CACHE_RETENTION_DAYS / SEARCH_CACHE_MAX_ENTRIES / SEARCH_CACHE_MAX_MB /
+NEWS_CONTENT_RETENTION_DAYS / NEWS_CONTENT_MAX_MB)，可用命令行覆盖。
+
+用法:
+    python scripts/db_retention.py
+    python scripts/db_retention.py --search-ttl-days 3 --news-max-mb 100
+    python scripts/db_retention.py --convert-vacuum   # 旧数据库首次切换到 auto_vacuum=INCREMENTAL
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.database_manager import DatabaseManager  # noqa: E402
+from utils.retention import RetentionManager, RetentionPolicy, convert_to_incremental_vacuum  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the database retention policy once")
+    parser.add_argument("--db", type=str, default=str(resolve_project_root() / "data" / "signal_flux.db"))
+    parser.add_argument("--search-ttl-days", type=float, default=None)
+    parser.add_argument("--search-max-entries", type=int, default=None)
+    parser.add_argument("--search-max-mb", type=float, default=None)
+    parser.add_argument("--news-ttl-days", type=float, default=None)
+    parser.add_argument("--news-max-mb", type=float, default=None)
+    parser.add_argument("--convert-vacuum", action="store_true",
+                        help="VACUUM once to switch an existing database to auto_vacuum=INCREMENTAL")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+
+    policy = RetentionPolicy()
+    overrides = {
+        "search_ttl_days": args.search_ttl_days,
+        "search_max_entries": args.search_max_entries,
+        "search_max_mb": args.search_max_mb,
+        "news_content_ttl_days": args.news_ttl_days,
+        "news_content_max_mb": args.news_max_mb,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(policy, key, value)
+
+    db = DatabaseManager(args.db)
+    try:
+        if args.convert_vacuum:
+            convert_to_incremental_vacuum(db.pool)
+        report = RetentionManager(db.pool, policy).run_once()
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
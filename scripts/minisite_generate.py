@@ -49,6 +49,7 @@ def load_signals(limit: int):
 def load_latest_run_data(max_runs: int = 10):
     project_root = resolve_project_root()
     sys.path.insert(0, str(project_root))
+    sys.path.insert(0, str(project_root / "src"))
     from dashboard.db import DashboardDB  # pylint: disable=import-error
 
     db = DashboardDB()
@@ -59,7 +60,7 @@ def load_latest_run_data(max_runs: int = 10):
             if data and data.get("signals"):
                 return run.run_id, data
     finally:
-        db.conn.close()
+        db.close()
 
     return None, None
 
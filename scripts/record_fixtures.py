@@ -0,0 +1,90 @@
+"""
+录制 HTTP 夹具
+
+以 HTTP_RECORD_DIR=<out> 运行一遍有代表性的数据拉取 (东方财富 / 腾讯 K 线、股票列表与行情快照、
+NewsNow 热榜、Polymarket、Jina Search / Reader)，把真实响应写成夹具文件，
+供 scripts/replay_server.py 在离线环境回放。也可以直接给任意命令设置 HTTP_RECORD_DIR 录制。
+
+用法:
+    python scripts/record_fixtures.py
+    python scripts/record_fixtures.py --out data/http_fixtures --tickers 600519,000001,00700 --sources cls,weibo
+    python scripts/record_fixtures.py --queries "英伟达 财报,黄金 价格" --with-content
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record real data-source responses as replay fixtures")
+    parser.add_argument("--out", type=str, default=str(resolve_project_root() / "data" / "http_fixtures"))
+    parser.add_argument("--tickers", type=str, default="600519,000001,300750,00700",
+                        help="comma-separated codes for K-line fixtures")
+    parser.add_argument("--days", type=int, default=365, help="K-line history length")
+    parser.add_argument("--sources", type=str, default="cls,wallstreetcn,xueqiu,weibo",
+                        help="comma-separated NewsNow source ids")
+    parser.add_argument("--queries", type=str, default="", help="comma-separated Jina Search queries")
+    parser.add_argument("--with-content", action="store_true",
+                        help="also extract article bodies via Jina Reader (slow without JINA_API_KEY)")
+    parser.add_argument("--no-lists", action="store_true", help="skip the stock list / quote snapshot pages")
+    args = parser.parse_args()
+
+    # 录制器在导入 utils.http_client 时读取 HTTP_RECORD_DIR
+    os.environ["HTTP_RECORD_DIR"] = args.out
+    from utils.database_manager import DatabaseManager
+    from utils.http_fixtures import recorder
+    from utils.news_tools import NewsNowTools, PolymarketTools
+    from utils.search_tools import JinaSearchEngine
+    from utils.stock_tools import StockAPIDirect
+
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+
+    def step(label, fn):
+        try:
+            result = fn()
+            logger.info(f"✅ {label}: {len(result) if hasattr(result, '__len__') else 'ok'}")
+        except Exception as e:
+            logger.warning(f"⚠️ {label} failed: {e}")
+
+    for ticker in [t.strip() for t in args.tickers.split(",") if t.strip()]:
+        for adjust in ("", "qfq"):
+            step(f"EastMoney kline {ticker} adjust={adjust or 'none'}", lambda: StockAPIDirect.fetch_kline_eastmoney(
+                ticker, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), adjust=adjust))
+        step(f"Tencent kline {ticker}", lambda: StockAPIDirect.fetch_kline_tencent(
+            ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), adjust=""))
+
+    if not args.no_lists:
+        for market in ("a", "hk"):
+            step(f"EastMoney stock list ({market})", lambda: StockAPIDirect.fetch_stock_list_em(market))
+            step(f"EastMoney quotes ({market})", lambda: StockAPIDirect.fetch_quotes_em(market))
+
+    with tempfile.TemporaryDirectory(prefix="alphaear_record_") as tmp_dir:
+        db = DatabaseManager(str(Path(tmp_dir) / "record.db"))
+        news = NewsNowTools(db)
+        for source in [s.strip() for s in args.sources.split(",") if s.strip()]:
+            step(f"NewsNow {source}", lambda: news.fetch_hot_news(source, count=10, fetch_content=args.with_content))
+        step("Polymarket markets", lambda: PolymarketTools(db).get_active_markets(limit=20))
+        engine = JinaSearchEngine()
+        for query in [q.strip() for q in args.queries.split(",") if q.strip()]:
+            step(f"Jina search '{query}'", lambda: engine.search(query, max_results=5))
+        db.close()
+
+    print(f"{recorder.recorded} responses recorded to {args.out}")
+    print(f"serve them with: python scripts/replay_server.py --fixtures {args.out}")
+
+
+if __name__ == "__main__":
+    main()
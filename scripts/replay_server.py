@@ -0,0 +1,196 @@
+"""
+本地 HTTP 回放服务器 (离线压测)
+
+读取 scripts/record_fixtures.py (或 HTTP_RECORD_DIR) 录制的夹具，以 /<原主机>/<原路径>?<原查询>
+的形式提供，可注入延迟与错误。数据源地址经环境变量指向本服务器后，StockTools / NewsNowTools /
+SearchTools 的完整拉取链路可以在离线机器上压测 (akshare 自带请求，无法回放，离线时由熔断器跳过)。
+
+    --print-env            输出需要设置的环境变量 (EM_KLINE_URL / NEWSNOW_BASE_URL / JINA_BASE_URL ...)
+    --latency-ms / --jitter-ms / --host-latency HOST=MS   固定延迟 + 均匀抖动，可按主机覆盖
+    --recorded-latency X   按录制时的耗时 x X 回放 (优先于 --latency-ms)
+    --error-rate / --error-status   按比例返回错误状态码 (默认 503，共享客户端会重试)
+    --drop-rate            按比例直接断开连接 (客户端表现为连接错误)
+    --strict               只回放完全匹配的请求，否则按同路径 / 最长路径前缀兜底
+
+GET /__replay/stats 返回各主机的命中与注入统计。
+
+用法:
+    python scripts/replay_server.py --fixtures data/http_fixtures --port 8765
+    eval "$(python scripts/replay_server.py --port 8765 --print-env)"
+    python scripts/replay_server.py --latency-ms 80 --jitter-ms 40 --error-rate 0.05 --drop-rate 0.01
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.http_fixtures import FixtureStore, split_url  # noqa: E402
+
+# 数据源地址的环境变量及默认值 (与 StockAPIDirect / NewsNowTools / PolymarketTools /
+# ContentExtractor / JinaSearchEngine 中的类属性一致)：回放时改写为 http://<server>/<原主机>/<原路径>
+ENDPOINTS = {
+    "EM_KLINE_URL": "https://push2his.eastmoney.com/api/qt/stock/kline/get",
+    "EM_LIST_URL": "https://push2.eastmoney.com/api/qt/clist/get",
+    "TENCENT_KLINE_URL": "http://web.ifzq.gtimg.cn/appstock/app/fqkline/get",
+    "NEWSNOW_BASE_URL": "https://newsnow.busiyi.world",
+    "POLYMARKET_BASE_URL": "https://gamma-api.polymarket.com",
+    "JINA_BASE_URL": "https://r.jina.ai/",
+    "JINA_SEARCH_URL": "https://s.jina.ai/",
+}
+
+
+def replay_env(base: str):
+    """各数据源指向回放服务器的环境变量 (当前环境中已设置的地址按其原主机改写，已指向 base 的保持不变)"""
+    env = {}
+    for var, default in ENDPOINTS.items():
+        url = os.getenv(var, default)
+        if not url.startswith(base):
+            parts = urlsplit(url)
+            url = f"{base}/{parts.netloc}{parts.path}"
+        env[var] = url
+    return env
+
+
+class ReplayStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def add(self, host: str, outcome: str):
+        with self._lock:
+            self.counts[host][outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(c) for host, c in sorted(self.counts.items())}
+
+
+def make_handler(store: FixtureStore, args, stats: ReplayStats):
+    host_latency = {}
+    for item in args.host_latency:
+        host, _, ms = item.partition("=")
+        host_latency[host] = float(ms) / 1000
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+
+    def roll() -> float:
+        with rng_lock:
+            return rng.random()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive，与共享客户端的连接池行为一致
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type or "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _replay(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            if self.path.startswith("/__replay/stats"):
+                self._send(200, json.dumps(stats.snapshot(), ensure_ascii=False).encode("utf-8"))
+                return
+
+            path, _, query = self.path.lstrip("/").partition("?")
+            upstream, _, rest = path.partition("/")
+            host, path, query = split_url(f"http://{upstream}/{rest}" + (f"?{query}" if query else ""))
+            fixture, how = store.match(self.command, host, path, query)
+            if fixture is None or (args.strict and how != "exact"):
+                stats.add(host, "miss")
+                self._send(404, json.dumps({"error": "no fixture", "host": host, "path": path}).encode("utf-8"))
+                return
+
+            if args.recorded_latency is not None:
+                delay = fixture.get("elapsed_ms", 0) / 1000 * args.recorded_latency
+            else:
+                delay = host_latency.get(host, args.latency_ms / 1000)
+            delay += roll() * args.jitter_ms / 1000
+            if delay > 0:
+                time.sleep(delay)
+
+            if roll() < args.drop_rate:
+                stats.add(host, "dropped")
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            if roll() < args.error_rate:
+                stats.add(host, f"error_{args.error_status}")
+                self._send(args.error_status, b'{"error": "injected"}')
+                return
+            stats.add(host, how)
+            self._send(fixture["status"], FixtureStore.body(fixture), fixture.get("content_type"))
+
+        do_GET = _replay
+        do_POST = _replay
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded data-source fixtures with latency/error injection")
+    parser.add_argument("--fixtures", type=str, default=str(resolve_project_root() / "data" / "http_fixtures"))
+    parser.add_argument("--bind", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--print-env", action="store_true", help="print export lines for the data-source URLs and exit")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random delay per response")
+    parser.add_argument("--host-latency", action="append", default=[], metavar="HOST=MS",
+                        help="Per-upstream-host delay, e.g. push2his.eastmoney.com=120 (repeatable)")
+    parser.add_argument("--recorded-latency", type=float, default=None, metavar="SCALE",
+                        help="Replay the recorded upstream latency times SCALE")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses replaced by an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of requests answered by closing the socket")
+    parser.add_argument("--strict", action="store_true", help="404 unless the request matches a fixture exactly")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the injection RNG")
+    args = parser.parse_args()
+
+    base = f"http://{args.bind}:{args.port}"
+    if args.print_env:
+        for var, url in replay_env(base).items():
+            print(f"export {var}='{url}'")
+        return
+
+    store = FixtureStore(args.fixtures)
+    if not len(store):
+        parser.error(f"no fixtures in {args.fixtures} (record some with scripts/record_fixtures.py)")
+    stats = ReplayStats()
+    server = ThreadingHTTPServer((args.bind, args.port), make_handler(store, args, stats))
+    server.daemon_threads = True
+    print(f"replaying {len(store)} fixtures on {base}: {json.dumps(store.hosts())}")
+    print(f"latency {args.latency_ms}ms +{args.jitter_ms}ms jitter, error rate {args.error_rate} "
+          f"({args.error_status}), drop rate {args.drop_rate}, strict={args.strict}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(stats.snapshot(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+全市场日线同步
+
+把 stock_list 中全部 A 股 / 港股的 stock_prices 增量补齐到最新 (有界并发 + 按主机限速 +
+批量写入)。进度记录在 price_sync_jobs，中断后用 --resume 续跑，已同步的股票自动跳过。
+
+用法:
+    python scripts/sync_prices.py
+    python scripts/sync_prices.py --workers 16 --host-rate 8
+    python scripts/sync_prices.py --tickers 600519,000001,00700 --no-snapshot
+    python scripts/sync_prices.py --resume
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+
+def resolve_project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+
+sys.path.insert(0, str(resolve_project_root() / "src"))
+
+from utils.database_manager import DatabaseManager  # noqa: E402
+from utils.price_sync import SYNC_BATCH_SIZE, SYNC_HOST_RATE, SYNC_WORKERS, PriceSyncJob  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring stock_prices up to date for the whole stock list")
+    parser.add_argument("--db", type=str, default=str(resolve_project_root() / "data" / "signal_flux.db"))
+    parser.add_argument("--start", type=str, default=None, help="YYYY-MM-DD (default: PRICE_SYNC_LOOKBACK_DAYS ago)")
+    parser.add_argument("--end", type=str, default=None, help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--tickers", type=str, default=None, help="comma-separated codes (default: stock_list)")
+    parser.add_argument("--limit", type=int, default=None, help="only sync the first N tickers")
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    parser.add_argument("--host-rate", type=float, default=SYNC_HOST_RATE, help="requests per second per host")
+    parser.add_argument("--batch-size", type=int, default=SYNC_BATCH_SIZE, help="tickers per write transaction")
+    parser.add_argument("--no-snapshot", action="store_true", help="do not use the EastMoney quote snapshot")
+    parser.add_argument("--resume", action="store_true", help="resume the last unfinished job")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings")
+    args = parser.parse_args()
+
+    if args.quiet:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    db = DatabaseManager(args.db)
+    try:
+        job = PriceSyncJob(db, workers=args.workers, host_rate=args.host_rate,
+                           batch_size=args.batch_size, use_snapshot=not args.no_snapshot)
+        tickers = args.tickers.split(",") if args.tickers else None
+        if args.limit:
+            tickers = (tickers or db.list_stock_codes())[:args.limit]
+        report = job.run(tickers=tickers, start_date=args.start, end_date=args.end, resume=args.resume)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,9 +37,12 @@ class ForecastAgent:
         lookback: int = 20,
         pred_len: int = 5,
         extra_context: str = "",
+        history: Optional["pd.DataFrame"] = None,
     ) -> Optional[ForecastResult]:
         """
         生成完整的预测流程：模型预测 -> LLM 调整
+
+        history: 调用方已批量取好的历史行情 (可选)，为空时自行查询
         """
         logger.info(f"🔮 Generating forecast for {ticker}...")
         
@@ -52,7 +55,10 @@ class ForecastAgent:
         end_date = datetime.now().strftime("%Y-%m-%d")
         # 宽放一点时间以确保有足够的交易日
         start_date = (datetime.now() - pd.Timedelta(days=max(lookback * 4, 90))).strftime("%Y-%m-%d")
-        df = stock_tools.get_stock_price(ticker, start_date=start_date, end_date=end_date)
+        if history is not None and not history.empty:
+            df = history
+        else:
+            df = stock_tools.get_stock_price(ticker, start_date=start_date, end_date=end_date)
 
         # Retry strategy:
         # 1) If not enough history, force-sync from network once.
@@ -101,12 +107,12 @@ class ForecastAgent:
         
         # 3. 模型预测 (Two-Pass: Technical & News-Adjusted)
         # Pass 1: Pure Technical
-        tech_points = self.predictor_util.get_base_forecast(df, lookback=effective_lookback, pred_len=pred_len, news_text=None)
+        tech_points = self.predictor_util.get_base_forecast(df, lookback=effective_lookback, pred_len=pred_len, news_text=None, ticker=ticker)
         
         # Pass 2: News-Adjusted (Only if we have signals context)
         news_points = []
         if signals_context:
-            news_points = self.predictor_util.get_base_forecast(df, lookback=effective_lookback, pred_len=pred_len, news_text=signals_context)
+            news_points = self.predictor_util.get_base_forecast(df, lookback=effective_lookback, pred_len=pred_len, news_text=signals_context, ticker=ticker)
         
         if not tech_points:
             logger.warning(f"⚠️ Failed to get base forecast for {ticker}")
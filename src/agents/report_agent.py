@@ -151,17 +151,27 @@ class ReportAgent:
 
                 if key in bib_by_key:
                     continue
-
-                # Prefer canonical metadata from DB when possible
-                enriched = self.db.lookup_reference_by_url(url) if url else None
                 bib_by_key[key] = {
                     "key": key,
-                    "url": url or (enriched.get("url") if enriched else ""),
-                    "title": (enriched.get("title") if enriched else None) or title or "（无标题）",
-                    "source": (enriched.get("source") if enriched else None) or source_name or "（未知来源）",
-                    "publish_time": (enriched.get("publish_time") if enriched else None) or publish_time or "",
+                    "url": url,
+                    "title": title,
+                    "source": source_name,
+                    "publish_time": publish_time,
                 }
 
+        # Prefer canonical metadata from DB when possible (one batched lookup for all URLs)
+        try:
+            references = self.db.lookup_references_by_urls([e["url"] for e in bib_by_key.values() if e["url"]])
+        except Exception as e:
+            logger.warning(f"Bibliography lookup failed: {e}")
+            references = {}
+
+        for entry in bib_by_key.values():
+            enriched = references.get(entry["url"]) if entry["url"] else None
+            entry["title"] = (enriched.get("title") if enriched else None) or entry["title"] or "（无标题）"
+            entry["source"] = (enriched.get("source") if enriched else None) or entry["source"] or "（未知来源）"
+            entry["publish_time"] = (enriched.get("publish_time") if enriched else None) or entry["publish_time"] or ""
+
         return list(bib_by_key.values()), signal_to_keys
 
     @staticmethod
@@ -283,6 +293,36 @@ class ReportAgent:
         except Exception:
             return False
 
+    @staticmethod
+    def _normalize_chart_json(json_str: str) -> str:
+        """Normalize smart quotes that frequently break JSON parsing."""
+        return (
+            json_str.strip()
+            .replace("\u201c", '"')
+            .replace("\u201d", '"')
+            .replace("\u2018", "'")
+            .replace("\u2019", "'")
+        )
+
+    def _extract_chart_tickers(self, text: str) -> List[str]:
+        """Collect the 5/6-digit tickers referenced by stock / forecast json-chart blocks (for batch prefetch).
+
+        Names and short codes that need fuzzy matching are resolved at render time and not included.
+        """
+        tickers: List[str] = []
+        for match in re.finditer(r'```json-chart\s*(\{.*?\})\s*```', text or "", re.DOTALL):
+            cfg = extract_json(self._normalize_chart_json(match.group(1)))
+            if not cfg:
+                continue
+            if cfg.get('type') == 'stock':
+                candidates = [t.split('.')[0] for t in re.split(r'[,\s]+', str(cfg.get('ticker', '')).strip())]
+            elif cfg.get('type') == 'forecast':
+                candidates = [self._clean_ticker(str(cfg.get('ticker', '')))]
+            else:
+                continue
+            tickers.extend(t for t in candidates if t.isdigit() and len(t) in (5, 6))
+        return list(dict.fromkeys(tickers))
+
     def _extract_forecast_requests(self, text: str, context_window_chars: int = 1200) -> List[Dict[str, Any]]:
         """Extract forecast requests from markdown content.
 
@@ -295,18 +335,7 @@ class ReportAgent:
         requests: List[Dict[str, Any]] = []
 
         for match in pattern.finditer(text):
-            json_str = match.group(1).strip()
-            json_str = (
-                json_str.replace("\u201c", '"')
-                .replace("\u201d", '"')
-                .replace("\u2018", "'")
-                .replace("\u2019", "'")
-                .replace("“", '"')
-                .replace("”", '"')
-                .replace("‘", "'")
-                .replace("’", "'")
-            )
-            cfg = extract_json(json_str)
+            cfg = extract_json(self._normalize_chart_json(match.group(1)))
             if not cfg:
                 continue
             if cfg.get('type') != 'forecast':
@@ -427,6 +456,22 @@ class ReportAgent:
 
         logger.info(f"🔮 Forecast requests: total={len(reqs)}, unique={len(grouped)}")
 
+        # 批量预取预测所需的历史行情 (窗口与 ForecastAgent 默认 lookback 一致)
+        histories: Dict[str, pd.DataFrame] = {}
+        forecast_tickers = [
+            str(t) for (t, _) in grouped
+            if allowed_tickers is None or str(t) in allowed_tickers
+        ]
+        if forecast_tickers:
+            try:
+                histories = StockTools(self.db, auto_update=False).get_stock_prices_many(
+                    forecast_tickers,
+                    start_date=(datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d"),
+                    end_date=datetime.now().strftime("%Y-%m-%d"),
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to prefetch forecast history: {e}")
+
         forecasts: Dict[tuple, ForecastResult] = {}
         for key, g in grouped.items():
             ticker, pred_len = key
@@ -463,7 +508,8 @@ class ReportAgent:
                     str(ticker),
                     related_signals,
                     pred_len=int(pred_len),
-                    extra_context=extra_context
+                    extra_context=extra_context,
+                    history=histories.get(str(ticker))
                 )
                 if fc:
                     forecasts[key] = fc
@@ -769,6 +815,22 @@ class ReportAgent:
         bib_entries, signal_to_keys = self._build_bibliography(signals)
         key_to_num = {e.get("key"): i for i, e in enumerate(bib_entries, 1) if e.get("key")}
 
+        # 预取所有簇引用到的行情 (一次批量查询，过期的并发补齐)
+        end_date = datetime.now().strftime("%Y-%m-%d")
+        start_date = (datetime.now() - timedelta(days=15)).strftime("%Y-%m-%d")
+        context_tickers = []
+        for cluster in clusters:
+            for sig_idx in cluster.get("signal_ids", []):
+                if 1 <= sig_idx <= len(signals):
+                    signal = signals[sig_idx-1]
+                    analysis_text = getattr(signal, 'analysis', '') if not isinstance(signal, dict) else signal.get('analysis', '')
+                    context_tickers.extend(re.findall(r'\b(\d{6})\b', analysis_text))
+        try:
+            price_context_frames = stock_tools.get_stock_prices_many(context_tickers, start_date=start_date, end_date=end_date)
+        except Exception as e:
+            logger.debug(f"Failed to prefetch price context: {e}")
+            price_context_frames = {}
+
         # --- Phase 2: Writing Drafts based on Clusters ---
         sections = []
         sources_list_lines = []
@@ -810,9 +872,7 @@ class ReportAgent:
                         cluster_tickers_seen.add(t)
                         # 获取行情
                         try:
-                            end_date = datetime.now().strftime("%Y-%m-%d")
-                            start_date = (datetime.now() - timedelta(days=15)).strftime("%Y-%m-%d")
-                            df_ctx = stock_tools.get_stock_price(t, start_date=start_date, end_date=end_date)
+                            df_ctx = price_context_frames.get(t, pd.DataFrame())
                             if not df_ctx.empty:
                                 last_5 = df_ctx.tail(5)
                                 prices_str = ", ".join([f"{row['date']}:{row['close']}" for _, row in last_5.iterrows()])
@@ -1137,19 +1197,31 @@ class ReportAgent:
         # Cache rendered forecast HTML per (ticker, pred_len) to guarantee identical output across duplicates
         rendered_forecast_html: Dict[tuple, str] = {}
 
+        # 预取全部 stock / forecast 图表引用的行情 (一次批量查询，过期的并发补齐)，渲染时按各自窗口切片
+        chart_end = datetime.now().strftime("%Y-%m-%d")
+        chart_tickers = self._extract_chart_tickers(content)
+        try:
+            chart_frames = stock_tools.get_stock_prices_many(
+                chart_tickers,
+                start_date=(datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d"),
+                end_date=chart_end,
+            ) if chart_tickers else {}
+        except Exception as e:
+            logger.debug(f"Failed to prefetch chart prices: {e}")
+            chart_frames = {}
+
+        def price_history(ticker: str, days: int) -> pd.DataFrame:
+            start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+            df = chart_frames.get(ticker)
+            if df is None:
+                # 模糊匹配得到的代码未在预取范围内
+                return stock_tools.get_stock_price(ticker, start_date=start, end_date=chart_end)
+            if df.empty:
+                return df
+            return df[df['date'].astype(str) >= start].reset_index(drop=True)
+
         def replace_match(match):
-            json_str = match.group(1).strip()
-            # Normalize smart quotes that frequently break JSON parsing.
-            json_str = (
-                json_str.replace("\u201c", '"')
-                .replace("\u201d", '"')
-                .replace("\u2018", "'")
-                .replace("\u2019", "'")
-                .replace("“", '"')
-                .replace("”", '"')
-                .replace("‘", "'")
-                .replace("’", "'")
-            )
+            json_str = self._normalize_chart_json(match.group(1))
             try:
                 config = extract_json(json_str)
                 if not config:
@@ -1239,8 +1311,6 @@ class ReportAgent:
                     
                     # 为每个 ticker 生成图表
                     all_charts_html: List[str] = []
-                    end_date = datetime.now().strftime("%Y-%m-%d")
-                    start_date = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
                     
                     for idx, ticker in enumerate(tickers):
                         # 如果有多个 ticker，为每个生成独立的标题
@@ -1249,7 +1319,7 @@ class ReportAgent:
                         else:
                             chart_title = base_title
                         
-                        df = stock_tools.get_stock_price(ticker, start_date=start_date, end_date=end_date)
+                        df = price_history(ticker, 90)
                         
                         if not df.empty:
                             # Optional: attach Kronos forecast if explicitly requested
@@ -1336,10 +1406,8 @@ class ReportAgent:
                         # Backward-compatible fallback (may be inconsistent across duplicates)
                         forecast_obj = self._get_forecast_agent().generate_forecast(ticker, related_signals, pred_len=pred_len)
                     
-                    # Fetch history for rendering
-                    end_date = datetime.now().strftime("%Y-%m-%d")
-                    start_date = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d")
-                    df = stock_tools.get_stock_price(ticker, start_date=start_date, end_date=end_date)
+                    # History for rendering (sliced from the prefetched batch)
+                    df = price_history(ticker, 60)
                     
                     if df.empty:
                         html = f"<!-- 无法获取股票数据: {ticker} -->"
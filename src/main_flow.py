@@ -284,10 +284,18 @@ class SignalFluxWorkflow:
             # 如果是特定事件，或者用户明确提问，我们应该主动搜索
             if is_specific or len(search_queries) > 0:
                 logger.info(f"🔍 Executing active search for queries: {search_queries}")
-                for q in search_queries[:2]: # 限制查询数，避免太慢
-                    # Consider using 'baidu' for Chinese queries if 'ddg' is unstable
-                    # enrich=True is default, so we get full content
-                    results = self.search_tools.search_list(q, max_results=5, enrich=True)  # 使用默认引擎 (jina if configured)
+                from concurrent.futures import ThreadPoolExecutor
+
+                queries = search_queries[:2] # 限制查询数，避免太慢
+                # 两个查询并发执行 (正文抓取共享 Jina 限速预算，各自受 SEARCH_ENRICH_DEADLINE_S 期限约束)
+                # Consider using 'baidu' for Chinese queries if 'ddg' is unstable
+                # enrich=True is default, so we get full content
+                with ThreadPoolExecutor(max_workers=max(1, len(queries)), thread_name_prefix="active-search") as executor:
+                    result_lists = list(executor.map(
+                        lambda q: self.search_tools.search_list(q, max_results=5, enrich=True),  # 使用默认引擎 (jina if configured)
+                        queries,
+                    ))
+                for results in result_lists:
                     for r in results:
                         # 转换为标准信号格式 (search_tools now returns standard keys including id, rank, etc)
                         search_signals.append({
@@ -522,6 +530,8 @@ class SignalFluxWorkflow:
 
         
         logger.info("--- Step 3: Report Generation ---")
+        # 报告引用查询依赖已入库的新闻/信号，先等待写入队列落盘
+        self.db.flush_writes()
 
         # Resume from report markdown checkpoint (pre-render)
         if resume and ckpt.exists("report.md"):
@@ -627,32 +637,53 @@ class SignalFluxWorkflow:
         stock_tools = StockTools(self.db, auto_update=False)
         updated_tickers = set()
         ticker_logged = 0
-        
+
+        # Extract tickers from signals, then force sync them concurrently in one batch
+        tickers = []
         for signal in analyzed_signals:
-            # Extract tickers from signal
             impact = signal.get('impact_tickers', [])
             if isinstance(impact, list):
                 for item in impact:
-                    if isinstance(item, dict):
-                        ticker = item.get('ticker')
-                        if ticker and ticker not in updated_tickers:
-                            try:
-                                # Force sync from network
-                                stock_tools.get_stock_price(str(ticker), force_sync=True)
-                                updated_tickers.add(ticker)
-                                logger.debug(f"   Refreshed: {ticker}")
-                                if callback and ticker_logged < 8:
-                                    callback.step("result", "StockTools", f"✅ 刷新: {ticker}")
-                                    ticker_logged += 1
-                            except Exception as e:
-                                logger.warning(f"   Failed to refresh {ticker}: {e}")
-                                if callback and ticker_logged < 8:
-                                    callback.step("warning", "StockTools", f"⚠️ 刷新失败: {ticker}")
-                                    ticker_logged += 1
+                    if isinstance(item, dict) and item.get('ticker'):
+                        tickers.append(str(item['ticker']))
+
+        try:
+            frames = stock_tools.get_stock_prices_many(tickers, force_sync=True)
+        except Exception as e:
+            logger.warning(f"   Failed to refresh market data: {e}")
+            frames = {}
+
+        for ticker, df in frames.items():
+            if not df.empty:
+                updated_tickers.add(ticker)
+                logger.debug(f"   Refreshed: {ticker}")
+                if callback and ticker_logged < 8:
+                    callback.step("result", "StockTools", f"✅ 刷新: {ticker}")
+                    ticker_logged += 1
+            else:
+                logger.warning(f"   Failed to refresh {ticker}")
+                if callback and ticker_logged < 8:
+                    callback.step("warning", "StockTools", f"⚠️ 刷新失败: {ticker}")
+                    ticker_logged += 1
         
         logger.info(f"✅ Market data refreshed for {len(updated_tickers)} tickers.")
         if callback:
             callback.step("result", "StockTools", f"✅ 刷新完成: {len(updated_tickers)} 支标的")
+
+        # 近期涉及相同标的的其他信号 (走 signal_tickers 索引，不加载全部信号)
+        try:
+            base_ids = {s.get('signal_id') for s in analyzed_signals}
+            related = [
+                s for s in self.db.get_signals_by_tickers(tickers, days=30, user_id=user_id, limit=50)
+                if s.get('signal_id') not in base_ids
+            ]
+            if related:
+                logger.info(f"📚 {len(related)} recent signals share tickers with run {base_run_id}")
+                if callback:
+                    titles = "；".join((s.get('title') or '')[:20] for s in related[:3])
+                    callback.step("result", "Database", f"📚 近 30 天另有 {len(related)} 条信号涉及相同标的: {titles}")
+        except Exception as e:
+            logger.debug(f"Related signal lookup failed: {e}")
         
         # 4. Active Signal Evolution (NEW)
         logger.info("🧠 Executing Logic Evolution Tracking for signals...")
@@ -714,6 +745,7 @@ class SignalFluxWorkflow:
             callback.step("thought", "ReportAgent", "生成演变对比报告")
         
         # Reuse ReportAgent with NEW signals
+        self.db.flush_writes()
         result = self.report_agent.generate_report(final_signals, user_query=update_context)
         report_md = result.content if hasattr(result, "content") else str(result)
         if hasattr(result, "structured"):
@@ -803,6 +835,8 @@ if __name__ == "__main__":
     logger.info(f"🧾 Log file: {log_path}")
 
     workflow = SignalFluxWorkflow(isq_template_id=args.template)
+    # 长时间运行的工作流按 RETENTION_INTERVAL_S 开启后台清理 (默认关闭)
+    workflow.db.start_retention()
     try:
         if args.update_from:
             logger.info(f"🔄 Executing Tracking Analysis based on Run: {args.update_from}")
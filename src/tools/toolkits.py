@@ -119,20 +119,15 @@ class NewsToolkit(Toolkit):
             return "没有需要补充内容的新闻"
         
         updated_count = 0
-        cursor = self._news_tools.db.conn.cursor()
         
         for item in items_without_content[:limit]:
             url = item.get('url')
             if url:
                 content = self._news_tools.fetch_news_content(url)
                 if content:
-                    cursor.execute(
-                        "UPDATE daily_news SET content = ? WHERE id = ?",
-                        (content[:10000], item['id'])
-                    )
+                    self._news_tools.db.update_news_content(item['id'], content=content[:10000])
                     updated_count += 1
         
-        self._news_tools.db.conn.commit()
         logger.info(f"✅ [TOOL SUCCESS] Enriched {updated_count} news items with content")
         
         return f"✅ 已为 {updated_count} 条新闻补充正文内容"
@@ -0,0 +1,175 @@
+"""
+AlphaEar 数据源熔断器 (circuit breaker)
+
+akshare / 东方财富 / NewsNow 某个数据源故障时，每次调用仍要先等它超时或报错才降级。
+熔断器按 "提供方:数据源" (如 kline:akshare、newsnow:weibo) 记录最近调用的错误率与延迟：
+
+- closed: 正常调用；最近 BREAKER_WINDOW 次调用中失败 (报错或慢于 BREAKER_SLOW_S)
+  比例达到 BREAKER_ERROR_RATE 且样本不少于 BREAKER_MIN_CALLS 时熔断
+- open: 直接跳过该数据源；BREAKER_OPEN_S 后进入 half_open
+- half_open: 注册了探测函数的数据源在后台线程探测，否则放行一次真实调用作为探测；
+  探测成功恢复 closed，失败重新熔断且冷却时间翻倍 (上限 BREAKER_MAX_OPEN_S)。
+  只有持有探测令牌的调用 (allow() 的返回值，回传给 record(token=...)) 能改变 half_open 状态，
+  熔断前发起、之后才结束的调用只计入统计
+
+状态变化写日志，breakers.snapshot() 汇总全部熔断器 (Dashboard /api/status)。
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+from loguru import logger
+
+BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_S = float(os.getenv("BREAKER_SLOW_S", "15"))
+BREAKER_OPEN_S = float(os.getenv("BREAKER_OPEN_S", "30"))
+BREAKER_MAX_OPEN_S = float(os.getenv("BREAKER_MAX_OPEN_S", "600"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """调用的数据源全部处于熔断状态"""
+
+
+class CircuitBreaker:
+    """单个数据源的熔断器 (线程安全)"""
+
+    def __init__(self, name: str, probe: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[bool, float]] = deque(maxlen=BREAKER_WINDOW)
+        self.state = CLOSED
+        self.open_s = BREAKER_OPEN_S
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe_token: Optional[object] = None  # 进行中的 half_open 探测
+
+    def allow(self) -> Union[bool, object]:
+        """是否可以调用该数据源 (open 状态冷却结束时触发探测)。
+
+        Returns:
+            放行时为真值：普通调用返回 True，作为 half_open 探测放行的真实调用返回探测令牌，
+            调用结束后须传给 record(token=...)；不放行时返回 False。
+        """
+        if not BREAKER_ENABLED:
+            return True
+        token = None
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_s:
+                self.state = HALF_OPEN
+                logger.info(f"🟡 Circuit {self.name} half-open, probing...")
+            if self.state == HALF_OPEN and self._probe_token is None:
+                token = self._probe_token = object()
+                if self.probe is None:
+                    return token  # 放行这一次真实调用作为探测
+            self.rejected += 1
+        if token is not None:
+            threading.Thread(target=self._run_probe, args=(token,), name=f"probe-{self.name}", daemon=True).start()
+        return False
+
+    def _run_probe(self, token: object):
+        t0 = time.perf_counter()
+        try:
+            ok = self.probe() is not False
+        except Exception as e:
+            logger.debug(f"Probe for {self.name} failed: {e}")
+            ok = False
+        self.record(time.perf_counter() - t0, ok, token=token)
+
+    def record(self, latency_s: float, ok: bool, token: Any = None):
+        """记录一次调用结果；token 为 allow() 的返回值，只有当前探测的令牌能结束 half_open"""
+        ok = ok and latency_s < BREAKER_SLOW_S
+        with self._lock:
+            self._calls.append((ok, latency_s))
+            if self.state == HALF_OPEN:
+                if token is None or token is not self._probe_token:
+                    return  # 熔断前发起的调用或其他放行的调用：只计入统计
+                self._probe_token = None
+                if ok:
+                    self.state = CLOSED
+                    self.open_s = BREAKER_OPEN_S
+                    self._calls.clear()
+                    logger.info(f"🟢 Circuit {self.name} closed, source recovered")
+                else:
+                    self._trip(min(self.open_s * 2, BREAKER_MAX_OPEN_S))
+                return
+            if self.state != CLOSED or len(self._calls) < BREAKER_MIN_CALLS:
+                return
+            failures = sum(1 for c_ok, _ in self._calls if not c_ok)
+            if failures / len(self._calls) >= BREAKER_ERROR_RATE:
+                self._trip(BREAKER_OPEN_S)
+
+    def _trip(self, open_s: float):
+        self.state = OPEN
+        self.open_s = open_s
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        logger.warning(f"🔴 Circuit {self.name} open for {open_s:g}s (skipping source)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self._calls)
+            state, open_s, opened_at = self.state, self.open_s, self.opened_at
+            trips, rejected = self.trips, self.rejected
+        latencies = sorted(lat for _, lat in calls)
+        return {
+            "state": state,
+            "error_rate": round(sum(1 for ok, _ in calls if not ok) / len(calls), 3) if calls else 0.0,
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1) if latencies else None,
+            "calls": len(calls),
+            "trips": trips,
+            "rejected": rejected,
+            "retry_in_s": round(max(0.0, open_s - (time.monotonic() - opened_at)), 1) if state == OPEN else None,
+        }
+
+
+class BreakerRegistry:
+    """按名称管理熔断器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, probe: Optional[Callable[[], Any]] = None) -> CircuitBreaker:
+        """获取 (不存在时创建) 熔断器；probe 为后台探测函数，返回 False 或抛异常视为失败"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, probe)
+            elif probe is not None and breaker.probe is None:
+                breaker.probe = probe
+            return breaker
+
+    def call(self, name: str, fn: Callable[[], Any], probe: Optional[Callable[[], Any]] = None) -> Any:
+        """经熔断器调用 fn：熔断中抛 CircuitOpenError，fn 抛异常记为失败"""
+        breaker = self.get(name, probe)
+        token = breaker.allow()
+        if not token:
+            raise CircuitOpenError(f"{name} circuit open")
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            breaker.record(time.perf_counter() - t0, ok=False, token=token)
+            raise
+        breaker.record(time.perf_counter() - t0, ok=True, token=token)
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {name: b.snapshot() for name, b in sorted(items)}
+
+
+# 进程内共享
+breakers = BreakerRegistry()
@@ -0,0 +1,135 @@
+"""
+AlphaEar 大文本列透明压缩
+
+documents.content / search_cache.results / dashboard_runs.run_data_json 等列写入时压缩为
+BLOB：首字节为标记 (算法)，其后为压缩数据。读取时按标记解压；旧数据是 TEXT，原样返回，
+因此无需迁移即可混存。
+
+- DB_COMPRESSION: zlib (默认，标准库，任何环境都能读) / zstd (可选，需安装 zstandard，
+  即 pip install "DeepEar[zstd]"；缺失时回退 zlib) / none。
+  写入 zstd 后，读取该数据库的每台机器都必须安装 zstandard
+- DB_COMPRESSION_LEVEL: 压缩级别 (默认 zstd 3 / zlib 6)
+- DB_COMPRESS_MIN_BYTES: 小于该长度的文本不压缩 (默认 512)
+- DB_COMPRESSION_DICT: 可选的 zstd 共享字典文件 (scripts/db_compression.py --train-dict 生成)，
+  对短小且结构相似的 JSON / 新闻正文效果明显；读取带字典的数据必须配置同一字典
+"""
+import os
+import threading
+import zlib
+from typing import Optional, Union
+
+from loguru import logger
+
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+# 标记字节 (TEXT 列中的旧数据读出为 str，不会与之混淆)
+MARK_ZLIB = 0x01
+MARK_ZSTD = 0x02
+MARK_ZSTD_DICT = 0x03
+
+COMPRESSION = os.getenv("DB_COMPRESSION", "zlib").lower()
+COMPRESSION_LEVEL = os.getenv("DB_COMPRESSION_LEVEL", "")
+COMPRESS_MIN_BYTES = int(os.getenv("DB_COMPRESS_MIN_BYTES", "512"))
+COMPRESSION_DICT = os.getenv("DB_COMPRESSION_DICT", "")
+
+_local = threading.local()
+_dict_lock = threading.Lock()
+_dict: Optional["_zstd.ZstdCompressionDict"] = None
+_dict_loaded = False
+
+
+def _algorithm() -> str:
+    if COMPRESSION == "zstd" and _zstd is None:
+        return "zlib"
+    return COMPRESSION
+
+
+def _level(algorithm: str) -> int:
+    if COMPRESSION_LEVEL:
+        return int(COMPRESSION_LEVEL)
+    return 3 if algorithm == "zstd" else 6
+
+
+def _shared_dict() -> Optional["_zstd.ZstdCompressionDict"]:
+    """加载 DB_COMPRESSION_DICT 指定的共享字典 (仅加载一次)"""
+    global _dict, _dict_loaded
+    if _dict_loaded:
+        return _dict
+    with _dict_lock:
+        if not _dict_loaded:
+            if COMPRESSION_DICT and _zstd is not None:
+                try:
+                    with open(COMPRESSION_DICT, "rb") as f:
+                        _dict = _zstd.ZstdCompressionDict(f.read())
+                    logger.info(f"🗜️ Loaded compression dictionary {COMPRESSION_DICT} (id={_dict.dict_id()})")
+                except OSError as e:
+                    logger.warning(f"⚠️ Cannot load compression dictionary {COMPRESSION_DICT}: {e}")
+            elif COMPRESSION_DICT:
+                logger.warning("⚠️ DB_COMPRESSION_DICT is set but zstandard is not installed; dictionary ignored")
+            _dict_loaded = True
+    return _dict
+
+
+def _codec(name: str):
+    """线程内复用的 zstd 压缩/解压器 (实例不是线程安全的)"""
+    codec = getattr(_local, name, None)
+    if codec is None:
+        d = _shared_dict() if name.endswith("_dict") else None
+        if name.startswith("c"):
+            codec = _zstd.ZstdCompressor(level=_level("zstd"), dict_data=d)
+        else:
+            codec = _zstd.ZstdDecompressor(dict_data=d)
+        setattr(_local, name, codec)
+    return codec
+
+
+def compress_text(text: Optional[str], min_bytes: int = COMPRESS_MIN_BYTES) -> Union[str, bytes, None]:
+    """压缩文本，返回 标记字节 + 压缩数据；过短、未开启压缩或压缩无收益时原样返回"""
+    if not text:
+        return text
+    algorithm = _algorithm()
+    if algorithm not in ("zstd", "zlib"):
+        return text
+    raw = text.encode("utf-8")
+    if len(raw) < min_bytes:
+        return text
+
+    if algorithm == "zstd":
+        if _shared_dict() is not None:
+            packed = bytes([MARK_ZSTD_DICT]) + _codec("c_dict").compress(raw)
+        else:
+            packed = bytes([MARK_ZSTD]) + _codec("c").compress(raw)
+    else:
+        packed = bytes([MARK_ZLIB]) + zlib.compress(raw, _level("zlib"))
+    return packed if len(packed) < len(raw) else text
+
+
+def decompress_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """读取 compress_text 写入的值 (也注册为 SQL 函数 unz 供视图/触发器使用)"""
+    if value is None or isinstance(value, str):
+        return value
+    data = bytes(value)
+    if not data:
+        return ""
+    mark, payload = data[0], data[1:]
+    if mark == MARK_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if mark in (MARK_ZSTD, MARK_ZSTD_DICT):
+        if _zstd is None:
+            raise RuntimeError("zstd-compressed data found but zstandard is not installed (pip install zstandard)")
+        if mark == MARK_ZSTD_DICT and _shared_dict() is None:
+            raise RuntimeError("dictionary-compressed data found but DB_COMPRESSION_DICT is not configured")
+        return _codec("d_dict" if mark == MARK_ZSTD_DICT else "d").decompress(payload).decode("utf-8")
+    # 未知标记：按 UTF-8 文本处理 (非本模块写入的 BLOB)
+    return data.decode("utf-8", errors="replace")
+
+
+def train_dictionary(samples, dict_size: int = 112 * 1024) -> bytes:
+    """用样本文本训练 zstd 共享字典，返回字典内容 (写入文件后配置 DB_COMPRESSION_DICT)"""
+    if _zstd is None:
+        raise RuntimeError("zstandard is required to train a compression dictionary")
+    data = [s.encode("utf-8") for s in samples if s]
+    return _zstd.train_dictionary(dict_size, data, level=_level("zstd")).as_bytes()
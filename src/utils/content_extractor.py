@@ -1,4 +1,3 @@
-import requests
 from requests.exceptions import RequestException, Timeout, ConnectionError
 import os
 import time
@@ -6,12 +5,13 @@ import json
 import threading
 from typing import Optional
 from loguru import logger
+from utils.http_client import http
 
 
 class ContentExtractor:
     """内容提取工具 - 主要接入 Jina Reader API"""
     
-    JINA_BASE_URL = "https://r.jina.ai/"
+    JINA_BASE_URL = os.getenv("JINA_BASE_URL", "https://r.jina.ai/")
     
     # 速率限制配置 (无 API Key 时：20 次/分钟)
     _rate_limit_no_key = 20  # 每分钟最大请求数
@@ -24,46 +24,80 @@ class ContentExtractor:
     _lock = threading.Lock()
 
     @classmethod
-    def _wait_for_rate_limit(cls, has_api_key: bool) -> None:
-        """等待以满足速率限制要求"""
+    def _wait_for_rate_limit(cls, has_api_key: bool, deadline: Optional[float] = None) -> bool:
+        """预约下一个可用的请求时间点并等待 (锁内只做预约，多个线程可以并发抓取，发起时间仍满足限速)
+
+        Args:
+            deadline: time.monotonic() 截止时间；预约的时间点晚于截止时间时不占用名额
+
+        Returns:
+            False 表示截止时间前排不上，调用方应放弃本次请求
+        """
         if has_api_key:
             # 有 API Key 时，只需保持最小间隔
+            if deadline is not None and time.monotonic() + 0.5 > deadline:
+                return False
             time.sleep(0.5)
-            return
+            return True
         
         with cls._lock:
-            current_time = time.time()
+            now = time.time()
             
-            # 1. 清理过期的请求记录
-            cls._request_times = [t for t in cls._request_times if current_time - t < cls._rate_window]
+            # 1. 清理过期的请求记录 (已预约但尚未发起的请求同样计入)
+            cls._request_times = [t for t in cls._request_times if now - t < cls._rate_window]
             
-            # 2. 检查是否达到速率限制
-            if len(cls._request_times) >= cls._rate_limit_no_key:
-                # 需要等待最旧的请求过期
-                oldest = cls._request_times[0]
-                wait_time = cls._rate_window - (current_time - oldest) + 1.0
-                if wait_time > 0:
-                    logger.warning(f"⏳ Jina rate limit reached, waiting {wait_time:.1f}s...")
-                    time.sleep(wait_time)
-                    current_time = time.time()
-                    cls._request_times = [t for t in cls._request_times if current_time - t < cls._rate_window]
+            # 2. 确保请求间隔不太快
+            start = max(now, cls._last_request_time + cls._min_interval)
             
-            # 3. 确保请求间隔不太快
-            time_since_last = current_time - cls._last_request_time
-            if time_since_last < cls._min_interval:
-                sleep_time = cls._min_interval - time_since_last
-                time.sleep(sleep_time)
+            # 3. 窗口已满时，等到第 N 个之前的请求过期
+            window_full = len(cls._request_times) >= cls._rate_limit_no_key
+            if window_full:
+                start = max(start, cls._request_times[-cls._rate_limit_no_key] + cls._rate_window + 1.0)
+            
+            wait_time = start - now
+            if deadline is not None and time.monotonic() + wait_time > deadline:
+                return False
             
             # 4. 记录本次请求
-            cls._request_times.append(time.time())
-            cls._last_request_time = time.time()
+            cls._request_times.append(start)
+            cls._last_request_time = start
+        
+        if wait_time > 0:
+            if window_full:
+                logger.warning(f"⏳ Jina rate limit reached, waiting {wait_time:.1f}s...")
+            time.sleep(wait_time)
+        return True
 
     @classmethod
-    def extract_with_jina(cls, url: str, timeout: int = 30) -> Optional[str]:
+    def extract_cached(cls, url: str, db=None, timeout: int = 30, deadline: Optional[float] = None) -> Optional[str]:
+        """
+        先查本地文档库 (DatabaseManager.get_document_by_url)，未命中再走 Jina 抓取，
+        抓取结果写回文档库，供其他查询与新闻源复用。db 为空时等价于 extract_with_jina。
+        """
+        if db is not None:
+            try:
+                cached = db.get_document_by_url(url)
+                if cached:
+                    logger.debug(f"📄 Reusing stored content for {url}")
+                    return cached
+            except Exception as e:
+                logger.warning(f"Document lookup failed for {url}: {e}")
+
+        content = cls.extract_with_jina(url, timeout, deadline)
+        if content and db is not None:
+            try:
+                db.save_document(content, url=url)
+            except Exception as e:
+                logger.warning(f"Failed to store extracted content for {url}: {e}")
+        return content
+
+    @classmethod
+    def extract_with_jina(cls, url: str, timeout: int = 30, deadline: Optional[float] = None) -> Optional[str]:
         """
         使用 Jina Reader 提取网页正文内容 (Markdown 格式)
         
         无 API Key 时自动限速：每分钟最多 20 次请求，每次间隔至少 3 秒
+        deadline (time.monotonic()) 给定时：截止前排不上限速名额直接返回 None，请求 (含重试) 不超过剩余时间
         """
         if not url or not url.startswith("http"):
             return None
@@ -83,12 +117,15 @@ class ContentExtractor:
             headers["Authorization"] = f"Bearer {api_key}"
         
         # 等待速率限制
-        cls._wait_for_rate_limit(has_api_key)
+        if not cls._wait_for_rate_limit(has_api_key, deadline):
+            logger.info(f"⏱️ Skipping Jina extraction for {url}: no rate-limit slot before the deadline")
+            return None
 
         try:
             # Jina Reader API
             full_url = f"{cls.JINA_BASE_URL}{url}"
-            response = requests.get(full_url, headers=headers, timeout=timeout)
+            # deadline 同时限制 http 客户端的重试
+            response = http.get(full_url, headers=headers, timeout=timeout, deadline=deadline)
             
             if response.status_code == 200:
                 try:
@@ -101,9 +138,12 @@ class ContentExtractor:
                     return response.text
             elif response.status_code == 429:
                 # 触发速率限制，等待后重试一次
+                if deadline is not None and time.monotonic() + 60 > deadline:
+                    logger.warning(f"⚠️ Jina rate limit (429) for {url}, no time left to retry")
+                    return None
                 logger.warning(f"⚠️ Jina rate limit (429), waiting 60s before retry...")
                 time.sleep(60)
-                return cls.extract_with_jina(url, timeout)
+                return cls.extract_with_jina(url, timeout, deadline)
             else:
                 logger.warning(f"Jina extraction failed (Status {response.status_code}) for {url}")
                 return None
@@ -1,29 +1,153 @@
+import os
 import sqlite3
 import json
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Union
+from typing import Callable, List, Dict, Optional, Any, Tuple, Union
+import numpy as np
 import pandas as pd
 from loguru import logger
 
+from utils.db_pool import SQLitePool, acquire_pool, release_pool
+from utils.fts import fts_tokens, fts_match_query
+from utils.price_store import ColumnarPriceStore, open_price_store
+from utils.retention import RETENTION_INTERVAL_S, RetentionManager, get_retention
+from utils.migrations import Migration, add_column, migrate
+from utils.documents import content_hash
+from utils.compression import compress_text, decompress_text
+
+# user_version 中本组件使用的分段 (DashboardDB 使用 1)
+SCHEMA_SLOT = 0
+
+# daily_news / search_detail 的正文按 content_hash 存放在 documents 中，读取时还原 content 列
+_NEWS_COLUMNS = """
+    d.id, d.source, d.rank, d.title, d.url, coalesce(unz(doc.content), d.content) AS content,
+    d.publish_time, d.crawl_time, d.sentiment_score, d.analysis, d.meta_data
+"""
+_DETAIL_COLUMNS = """
+    d.id, d.query_hash, d.rank, d.title, d.url, coalesce(unz(doc.content), d.content) AS content,
+    d.publish_time, d.crawl_time, d.sentiment_score, d.source, d.meta_data
+"""
+_NEWS_FTS_TEXT = (
+    "coalesce(new.title, '') || ' ' || "
+    "coalesce((SELECT unz(content) FROM documents WHERE doc_hash = new.content_hash), new.content, '')"
+)
+
+# 读取行情时支持的复权方式 (stock_prices 存不复权价，按 stock_adj_factors 现算)
+ADJUST_MODES = ("qfq", "hfq", "none")
+
+# 可选的列式行情存储目录 (为空则仅使用 SQLite)，可通过环境变量开启
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "")
+
+# 行情写入监听 (数据库路径 -> 回调)，同一数据库的多个 DatabaseManager 实例共享
+_price_listeners: Dict[str, List[Callable[[str, List[str]], None]]] = {}
+# stock_list / stock_aliases 的写入版本号 (数据库路径 -> 版本)，进程内的代码解析索引据此重建
+_stock_list_versions: Dict[str, int] = {}
+
+
+def _normalize_ticker(ticker: Any) -> str:
+    """信号索引中的代码写法统一为纯数字 (600519.SH -> 600519)，非 A/H 股代码转大写"""
+    t = str(ticker or "").strip()
+    digits = "".join(c for c in t.split(".")[0] if c.isdigit())
+    return digits if len(digits) >= 5 else t.upper()
+
+
+def _json_list(value: Optional[str]) -> list:
+    try:
+        data = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+    return data if isinstance(data, list) else []
+
+
 class DatabaseManager:
     """
     AlphaEar 数据库管理器 - 负责存储热点数据、搜索缓存和股价数据
-    使用 SQLite 进行持久化存储
+    使用 SQLite 进行持久化存储，连接由进程内共享的 SQLitePool 管理（WAL，单写多读）
     """
     
-    def __init__(self, db_path: str = "data/signal_flux.db"):
+    def __init__(self, db_path: str = "data/signal_flux.db", price_store_dir: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite 数据库路径
+            price_store_dir: 列式行情存储目录 (memory-mapped .npy)。默认读取环境变量 PRICE_STORE_DIR，为空则不启用。
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self._cache_key = str(self.db_path.resolve())
+        self.pool: Optional[SQLitePool] = acquire_pool(str(self.db_path))
+        # FTS 触发器依赖的预分词函数
+        self.pool.create_function("fts_tokens", 1, fts_tokens)
+        # 正文去重迁移回填使用的哈希函数
+        self.pool.create_function("doc_hash", 1, content_hash)
+        # 压缩存储的正文在视图/触发器中解压
+        self.pool.create_function("unz", 1, decompress_text)
         self._init_db()
-        logger.info(f"💾 Database initialized at {self.db_path}")
+        self.price_store: Optional[ColumnarPriceStore] = open_price_store(
+            price_store_dir if price_store_dir is not None else PRICE_STORE_DIR
+        )
+        # 保留策略 (每个连接池一个)；后台清理只由长期运行的入口调用 start_retention() 启动
+        self.retention: RetentionManager = get_retention(self.pool)
+        logger.debug(f"💾 Database initialized at {self.db_path}")
+
+    @property
+    def cache_key(self) -> str:
+        """进程内缓存区分数据库用的键"""
+        return self._cache_key
+
+    def add_price_listener(self, callback: Callable[[str, List[str]], None]):
+        """注册行情写入回调 callback(cache_key, tickers)，用于让进程内缓存失效"""
+        listeners = _price_listeners.setdefault(self.cache_key, [])
+        if callback not in listeners:
+            listeners.append(callback)
+
+    @property
+    def stock_list_version(self) -> int:
+        """本进程内 stock_list / stock_aliases 被写入的次数"""
+        return _stock_list_versions.get(self.cache_key, 0)
+
+    def _bump_stock_list_version(self):
+        key = self.cache_key
+        _stock_list_versions[key] = _stock_list_versions.get(key, 0) + 1
+
+    def _notify_prices_saved(self, tickers: List[str]):
+        for callback in _price_listeners.get(self.cache_key, ()):
+            try:
+                callback(self.cache_key, tickers)
+            except Exception as e:
+                logger.warning(f"⚠️ Price listener failed: {e}")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """兼容旧代码：返回共享写连接。新代码请使用 self.pool.read()/write()"""
+        return self.pool.writer
 
     def _init_db(self):
-        """初始化表结构"""
-        cursor = self.conn.cursor()
+        """按版本迁移表结构 (已是最新版本时不执行任何 DDL)"""
+        migrate(self.pool, "core", SCHEMA_SLOT, self._migrations())
         
+        # 初始化邀请码
+        self._ensure_invitation_code()
+
+    def _migrations(self) -> List[Migration]:
+        """schema 迁移列表，只能追加，不能修改已发布的版本"""
+        return [
+            Migration(1, "base tables", self._create_tables),
+            Migration(2, "FTS5 indexes for daily_news / search_cache", self._create_fts_indexes),
+            Migration(3, "search_cache.last_accessed for LRU retention",
+                      lambda c: add_column(c, "search_cache", "last_accessed", "TEXT")),
+            Migration(4, "content-addressed documents shared by daily_news / search_detail", self._create_documents),
+            Migration(5, "decompress documents in views and FTS triggers", self._create_document_views),
+            Migration(6, "url indexes for reference lookup", self._create_url_indexes),
+            Migration(7, "signal ticker / industry index tables", self._create_signal_index),
+            Migration(8, "stock price sync coverage for incremental updates", self._create_price_sync_state),
+            Migration(9, "full-universe price sync job progress", self._create_price_sync_jobs),
+            Migration(10, "stock name aliases for ticker resolution", self._create_stock_aliases),
+            Migration(11, "stock adjustment factors (raw bars adjusted on read)", self._create_adj_factors),
+        ]
+
+    def _create_tables(self, cursor: sqlite3.Cursor):
         # 1. 每日热点新闻表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS daily_news (
@@ -41,11 +165,8 @@ class DatabaseManager:
             )
         """)
         
-        # 尝试添加 analysis 列（如果表已存在但没有该列）
-        try:
-            cursor.execute("ALTER TABLE daily_news ADD COLUMN analysis TEXT")
-        except:
-            pass  # 列已存在
+        # 旧库可能缺少 analysis 列
+        add_column(cursor, "daily_news", "analysis", "TEXT")
 
         
         # 2. 搜索缓存表 (原有 JSON 缓存)
@@ -146,64 +267,335 @@ class DatabaseManager:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_source ON daily_news(source)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_timestamp ON search_cache(timestamp)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_prices_ticker_date ON stock_prices(ticker, date)")
-        # 尝试添加 user_id 列到 signals 表
-        try:
-            cursor.execute("ALTER TABLE signals ADD COLUMN user_id TEXT")
-        except:
-            pass
-            
+        # 旧库可能缺少 signals.user_id 列
+        add_column(cursor, "signals", "user_id", "TEXT")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_signals_user_id ON signals(user_id)")
-            
-        self.conn.commit()
-        
-        # 初始化邀请码
-        self._ensure_invitation_code()
+
+    def _create_fts_indexes(self, cursor: sqlite3.Cursor):
+        # 全文索引 (FTS5 + jieba 预分词)，由触发器与源表保持同步
+        self._create_fts(cursor, "daily_news", "id", "coalesce(new.title, '') || ' ' || coalesce(new.content, '')", ("title", "content"))
+        self._create_fts(cursor, "search_cache", "query_hash", "new.query", ("query",))
+
+    def _create_fts(self, cursor: sqlite3.Cursor, table: str, key: str, text_expr: str, columns: tuple):
+        """为 table 创建 {table}_fts 虚表 (rowid 对齐源表) 及同步触发器，首次创建时回填存量数据"""
+        fts = f"{table}_fts"
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).fetchone()
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(tokens)")
+
+        # INSERT OR REPLACE 删除旧行时不会触发 DELETE 触发器 (recursive_triggers 关闭)，
+        # 因此在 BEFORE INSERT 中先清理同主键旧行的索引
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_bi BEFORE INSERT ON {table} BEGIN
+                DELETE FROM {fts} WHERE rowid IN (SELECT rowid FROM {table} WHERE {key} = new.{key});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, tokens) VALUES (new.rowid, fts_tokens({text_expr}));
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.rowid;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN
+                UPDATE {fts} SET tokens = fts_tokens({text_expr}) WHERE rowid = new.rowid;
+            END
+        """)
+
+        if not exists:
+            backfill_expr = text_expr.replace("new.", "")
+            cursor.execute(f"INSERT INTO {fts}(rowid, tokens) SELECT rowid, fts_tokens({backfill_expr}) FROM {table}")
+            if cursor.rowcount > 0:
+                logger.info(f"🔎 Built full-text index {fts} ({cursor.rowcount} rows)")
+
+    def _create_documents(self, cursor: sqlite3.Cursor):
+        # 正文按哈希去重存放，daily_news / search_detail 只保留 content_hash
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_hash TEXT PRIMARY KEY,
+                url TEXT,
+                content TEXT,
+                size INTEGER,
+                created_at TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_url ON documents(url)")
+        for table in ("daily_news", "search_detail"):
+            add_column(cursor, table, "content_hash", "TEXT")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_content_hash ON {table}(content_hash)")
+
+        # 回填期间正文不变，先移除引用正文的 FTS 触发器，避免逐行重新分词
+        cursor.execute("DROP TRIGGER IF EXISTS daily_news_fts_ai")
+        cursor.execute("DROP TRIGGER IF EXISTS daily_news_fts_au")
+        moved = 0
+        for table in ("daily_news", "search_detail"):
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO documents (doc_hash, content, size, created_at)
+                SELECT doc_hash(content), content, length(CAST(content AS BLOB)), crawl_time
+                FROM {table} WHERE doc_hash(content) IS NOT NULL
+            """)
+            cursor.execute(f"UPDATE {table} SET content_hash = doc_hash(content), content = NULL WHERE doc_hash(content) IS NOT NULL")
+            moved += cursor.rowcount
+
+        # search_cache.results 中的正文同样改为引用
+        now = datetime.now().isoformat()
+        for row in cursor.execute("SELECT query_hash, results FROM search_cache WHERE results LIKE '[%'").fetchall():
+            try:
+                items = json.loads(row[1])
+            except (TypeError, ValueError):
+                continue
+            if isinstance(items, list):
+                cursor.execute(
+                    "UPDATE search_cache SET results = ? WHERE query_hash = ?",
+                    (self._slim_results(cursor, items, now), row[0]),
+                )
+
+        self._create_document_views(cursor)
+        if moved:
+            logger.info(f"📦 Moved {moved} article bodies into documents")
+
+    def _create_document_views(self, cursor: sqlite3.Cursor):
+        """(重新) 创建按 content_hash 还原正文的视图与 daily_news FTS 触发器"""
+        cursor.execute("DROP TRIGGER IF EXISTS daily_news_fts_ai")
+        cursor.execute("DROP TRIGGER IF EXISTS daily_news_fts_au")
+        cursor.execute("DROP VIEW IF EXISTS daily_news_v")
+        cursor.execute("DROP VIEW IF EXISTS search_detail_v")
+        self._create_fts(cursor, "daily_news", "id", _NEWS_FTS_TEXT, ("title", "content", "content_hash"))
+        cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS daily_news_v AS
+            SELECT {_NEWS_COLUMNS} FROM daily_news d LEFT JOIN documents doc ON doc.doc_hash = d.content_hash
+        """)
+        cursor.execute(f"""
+            CREATE VIEW IF NOT EXISTS search_detail_v AS
+            SELECT {_DETAIL_COLUMNS} FROM search_detail d LEFT JOIN documents doc ON doc.doc_hash = d.content_hash
+        """)
+
+    def _create_url_indexes(self, cursor: sqlite3.Cursor):
+        # (url, crawl_time) 同时覆盖按 URL 查找与 "取最新一条"
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_url ON daily_news(url, crawl_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_detail_url ON search_detail(url, crawl_time)")
+
+    def _create_signal_index(self, cursor: sqlite3.Cursor):
+        # signals.impact_tickers / industry_tags 的展开表，created_at / user_id 冗余存储以便按时间窗走索引
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS signal_tickers (
+                signal_id TEXT,
+                ticker TEXT,
+                name TEXT,
+                weight REAL,
+                user_id TEXT,
+                created_at TEXT,
+                PRIMARY KEY (signal_id, ticker)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS signal_industries (
+                signal_id TEXT,
+                industry TEXT,
+                user_id TEXT,
+                created_at TEXT,
+                PRIMARY KEY (signal_id, industry)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_signal_tickers_ticker ON signal_tickers(ticker, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_signal_industries_industry ON signal_industries(industry, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_signals_created_at ON signals(created_at)")
+        # 删除信号时同步清理
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS signals_index_ad AFTER DELETE ON signals BEGIN
+                DELETE FROM signal_tickers WHERE signal_id = old.signal_id;
+                DELETE FROM signal_industries WHERE signal_id = old.signal_id;
+            END
+        """)
+
+        rows = cursor.execute("SELECT signal_id, impact_tickers, industry_tags, user_id, created_at FROM signals").fetchall()
+        for row in rows:
+            self._index_signal(cursor, row[0], _json_list(row[1]), _json_list(row[2]), row[3], row[4])
+        if rows:
+            logger.info(f"🗂️ Indexed tickers / industries of {len(rows)} signals")
+
+    def _create_price_sync_state(self, cursor: sqlite3.Cursor):
+        # 每只股票已从网络同步过的连续日期区间 (含无交易的日期)，增量同步只拉取区间外的部分
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_sync_state (
+                ticker TEXT PRIMARY KEY,
+                covered_start TEXT,
+                covered_end TEXT,
+                synced_at TEXT
+            )
+        """)
+
+    def _create_price_sync_jobs(self, cursor: sqlite3.Cursor):
+        # 全市场行情同步任务的进度 (单只股票是否已同步由 price_sync_state 判断，中断后可续跑)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_sync_jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                total INTEGER DEFAULT 0,
+                done INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                from_snapshot INTEGER DEFAULT 0,
+                rows INTEGER DEFAULT 0,
+                started_at TEXT,
+                updated_at TEXT,
+                finished_at TEXT,
+                error TEXT
+            )
+        """)
+
+    def _create_stock_aliases(self, cursor: sqlite3.Cursor):
+        # 股票别名 (英文名 / 简称 -> 股票名称或代码)，供 TickerResolver 使用
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_aliases (
+                alias TEXT PRIMARY KEY,
+                target TEXT NOT NULL
+            )
+        """)
+
+    def _create_adj_factors(self, cursor: sqlite3.Cursor):
+        # 后复权因子的变化点 (除权除息日)：date 起 (含) 的不复权价 × factor 为后复权价。
+        # 有因子的股票 stock_prices 存不复权价；没有因子的是旧版本写入的前复权价，下次同步时整体重拉
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_adj_factors (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                factor REAL NOT NULL,
+                PRIMARY KEY (ticker, date)
+            ) WITHOUT ROWID
+        """)
+
+    # --- 正文存储 (documents) ---
+
+    @staticmethod
+    def _put_documents(conn: sqlite3.Connection, docs: Dict[str, str], created_at: str, url: Optional[str] = None):
+        """写入正文 (压缩存储；已存在则只补充来源 URL)"""
+        if not docs:
+            return
+        conn.executemany("""
+            INSERT INTO documents (doc_hash, url, content, size, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(doc_hash) DO UPDATE SET url = coalesce(documents.url, excluded.url)
+        """, [(h, url, compress_text(body), len(body.encode("utf-8")), created_at) for h, body in docs.items()])
+
+    def _slim_results(self, conn, items: List[Any], created_at: str) -> str:
+        """把搜索结果列表中的正文移入 documents，返回只含 content_hash 引用的 JSON"""
+        docs: Dict[str, str] = {}
+        slim = []
+        for item in items:
+            h = content_hash(item.get("content")) if isinstance(item, dict) else None
+            if h:
+                docs[h] = item["content"]
+                item = {k: v for k, v in item.items() if k != "content"}
+                item["content_hash"] = h
+            slim.append(item)
+        self._put_documents(conn, docs, created_at)
+        return json.dumps(slim)
+
+    def _hydrate_results(self, conn, results_str: str) -> str:
+        """按 content_hash 从 documents 还原搜索结果中的正文"""
+        try:
+            items = json.loads(results_str)
+        except (TypeError, ValueError):
+            return results_str
+        if not isinstance(items, list):
+            return results_str
+        hashes = list({it["content_hash"] for it in items if isinstance(it, dict) and it.get("content_hash")})
+        if not hashes:
+            return results_str
+        bodies = dict(conn.execute(
+            f"SELECT doc_hash, unz(content) FROM documents WHERE doc_hash IN ({','.join('?' * len(hashes))})", hashes
+        ).fetchall())
+        for it in items:
+            if isinstance(it, dict) and "content_hash" in it:
+                it["content"] = bodies.get(it.pop("content_hash"), "")
+        return json.dumps(items)
+
+    def save_document(self, content: str, url: Optional[str] = None) -> Optional[str]:
+        """保存一篇正文 (如 ContentExtractor 的抓取结果)，返回其 content_hash；空正文返回 None"""
+        h = content_hash(content)
+        if not h:
+            return None
+        now = datetime.now().isoformat()
+        self.pool.submit(lambda conn: self._put_documents(conn, {h: content}, now, url), tag="documents")
+        return h
+
+    def get_document_by_url(self, url: str) -> Optional[str]:
+        """按来源 URL 获取已抓取的正文 (跨查询、跨来源复用，避免重复抓取)"""
+        url = (url or "").strip()
+        if not url:
+            return None
+        with self.pool.read("documents") as conn:
+            row = conn.execute(
+                "SELECT content FROM documents WHERE url = ? ORDER BY created_at DESC LIMIT 1", (url,)
+            ).fetchone()
+        return decompress_text(row[0]) if row else None
 
     # --- 新闻数据操作 ---
     
     def save_daily_news(self, news_list: List[Dict]) -> int:
-        """保存热点新闻，包含发布时间与抓取时间"""
-        cursor = self.conn.cursor()
-        count = 0
+        """保存热点新闻，包含发布时间与抓取时间。
+
+        写入经由写入队列异步批量提交，返回已入队的条数。
+        """
         crawl_time = datetime.now().isoformat()
-        
+        rows = []
+        docs: Dict[str, str] = {}
         for news in news_list:
             try:
                 # 兼容不同来源的 ID 生成逻辑
                 news_id = news.get('id') or f"{news.get('source')}_{news.get('rank')}_{crawl_time[:10]}"
-                cursor.execute("""
-                    INSERT OR REPLACE INTO daily_news 
-                    (id, source, rank, title, url, content, publish_time, crawl_time, sentiment_score, meta_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                content = news.get('content', '')
+                h = content_hash(content)
+                if h:
+                    docs[h] = content
+                rows.append((
                     news_id,
                     news.get('source'),
                     news.get('rank'),
                     news.get('title'),
                     news.get('url'),
-                    news.get('content', ''),
+                    None if h else content,
+                    h,
                     news.get('publish_time'), # 新增支持发布时间
                     crawl_time,
                     news.get('sentiment_score'),
                     json.dumps(news.get('meta_data', {}))
                 ))
-                count += 1
-            except sqlite3.Error as e:
-                logger.error(f"Database error saving news item {news.get('title')}: {e}")
             except Exception as e:
                 logger.error(f"Unexpected error saving news item {news.get('title')}: {e}")
-        
-        self.conn.commit()
-        return count
+
+        if not rows:
+            return 0
+
+        def _write(conn: sqlite3.Connection):
+            self._put_documents(conn, docs, crawl_time)
+            for row in rows:
+                try:
+                    conn.execute("""
+                        INSERT OR REPLACE INTO daily_news 
+                        (id, source, rank, title, url, content, content_hash, publish_time, crawl_time, sentiment_score, meta_data)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, row)
+                except sqlite3.Error as e:
+                    logger.error(f"Database error saving news item {row[3]}: {e}")
+
+        self.pool.submit(_write, tag="daily_news")
+        return len(rows)
 
     def get_daily_news(self, source: Optional[str] = None, limit: int = 100, days: int = 1) -> List[Dict]:
         """获取最近 N 天的热点新闻"""
-        cursor = self.conn.cursor()
         # 使用 crawl_time 过滤，保证结果的新鲜度
         time_threshold = (datetime.now().timestamp() - days * 86400)
         time_threshold_str = datetime.fromtimestamp(time_threshold).isoformat()
         
-        query = "SELECT * FROM daily_news WHERE crawl_time >= ?"
+        query = "SELECT * FROM daily_news_v WHERE crawl_time >= ?"
         params = [time_threshold_str]
         
         if source:
@@ -213,8 +605,9 @@ class DatabaseManager:
         query += " ORDER BY crawl_time DESC, rank LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        with self.pool.read("daily_news") as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
 
     def lookup_reference_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """Best-effort lookup of a source item by URL.
@@ -225,61 +618,62 @@ class DatabaseManager:
         url = (url or "").strip()
         if not url:
             return None
+        return self.lookup_references_by_urls([url]).get(url)
 
-        cursor = self.conn.cursor()
+    def lookup_references_by_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Bulk version of `lookup_reference_by_url`.
 
-        try:
-            cursor.execute(
-                """
-                SELECT title, source, publish_time, crawl_time, url
-                FROM daily_news
-                WHERE url = ?
-                ORDER BY crawl_time DESC
-                LIMIT 1
-                """,
-                (url,),
-            )
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-        except Exception:
-            pass
+        Resolves all URLs with one indexed query per table (per 500 URLs);
+        `daily_news` takes precedence over `search_detail`, and the most recently
+        crawled row wins. URLs without a match are absent from the result.
+        """
+        pending = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+        found: Dict[str, Dict[str, Any]] = {}
+        if not pending:
+            return found
 
-        try:
-            cursor.execute(
-                """
-                SELECT title, source, publish_time, crawl_time, url
-                FROM search_detail
-                WHERE url = ?
-                ORDER BY crawl_time DESC
-                LIMIT 1
-                """,
-                (url,),
-            )
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-        except Exception:
-            pass
+        with self.pool.read("daily_news") as conn:
+            for table in ("daily_news", "search_detail"):
+                remaining = [u for u in pending if u not in found]
+                for i in range(0, len(remaining), 500):
+                    chunk = remaining[i:i + 500]
+                    try:
+                        # 聚合 max() 时 SQLite 的裸列取自 crawl_time 最大的那一行
+                        rows = conn.execute(f"""
+                            SELECT title, source, publish_time, max(crawl_time) AS crawl_time, url
+                            FROM {table}
+                            WHERE url IN ({','.join('?' * len(chunk))})
+                            GROUP BY url
+                        """, chunk).fetchall()
+                    except sqlite3.Error as e:
+                        logger.warning(f"Reference lookup in {table} failed: {e}")
+                        continue
+                    for row in rows:
+                        found[row["url"]] = dict(row)
 
-        return None
+        return found
 
     def delete_news(self, news_id: str) -> bool:
         """删除特定新闻"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM daily_news WHERE id = ?", (news_id,))
-        self.conn.commit()
+        with self.pool.write() as conn:
+            cursor = conn.execute("DELETE FROM daily_news WHERE id = ?", (news_id,))
         return cursor.rowcount > 0
     
     def update_news_content(self, news_id: str, content: str = None, analysis: str = None) -> bool:
-        """更新新闻的内容或分析结果"""
-        cursor = self.conn.cursor()
+        """更新新闻的内容或分析结果（经写入队列异步提交，入队即返回 True）"""
         updates = []
         params = []
+        docs: Dict[str, str] = {}
         
         if content is not None:
-            updates.append("content = ?")
-            params.append(content)
+            h = content_hash(content)
+            if h:
+                docs[h] = content
+                updates.append("content = NULL, content_hash = ?")
+                params.append(h)
+            else:
+                updates.append("content = ?, content_hash = NULL")
+                params.append(content)
         if analysis is not None:
             updates.append("analysis = ?")
             params.append(analysis)
@@ -289,165 +683,207 @@ class DatabaseManager:
             
         params.append(news_id)
         query = f"UPDATE daily_news SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, params)
-        self.conn.commit()
-        return cursor.rowcount > 0
+        now = datetime.now().isoformat()
+
+        def _write(conn: sqlite3.Connection):
+            self._put_documents(conn, docs, now)
+            conn.execute(query, params)
+
+        self.pool.submit(_write, tag="daily_news")
+        return True
+
+    def update_news_sentiment(self, items: List[Dict[str, Any]]) -> int:
+        """批量写回新闻情绪分数与原因 (items: [{id, score, reason}])"""
+        with self.pool.write() as conn:
+            conn.executemany("""
+                UPDATE daily_news 
+                SET sentiment_score = ?, meta_data = json_set(COALESCE(meta_data, '{}'), '$.sentiment_reason', ?)
+                WHERE id = ?
+            """, [(it.get('score', 0.0), it.get('reason', ''), it['id']) for it in items])
+        return len(items)
 
     # --- 搜索缓存辅助 ---
     
     def get_search_cache(self, query_hash: str, ttl_seconds: Optional[int] = None) -> Optional[Dict]:
         """获取搜索缓存 (优先查 search_detail)"""
-        cursor = self.conn.cursor()
-        
-        # 1. 尝试从 search_detail 获取展开的结构化数据
-        cursor.execute("""
-            SELECT * FROM search_detail 
-            WHERE query_hash = ? 
-            ORDER BY rank
-        """, (query_hash,))
-        details = [dict(row) for row in cursor.fetchall()]
-        
-        if details:
-            # 检查 TTL (取第一条的时间)
-            first_time = datetime.fromisoformat(details[0]['crawl_time'])
-            if ttl_seconds and (datetime.now() - first_time).total_seconds() > ttl_seconds:
-                logger.info(f"⌛ Detailed cache expired for hash {query_hash}")
-                pass # Expired, fall through or return None? If Detail expired, Cache likely expired too.
-                # But let's check basic cache just in case metadata differs? 
-                # Actually if details exist, we prefer them. If expired, we return None.
-                return None
-            
-            logger.info(f"✅ Hit detailed search cache for {query_hash} ({len(details)} items)")
-            # Reconstruct the expected 'results' list format for SearchTools
-            # SearchTools expects a list of dicts. 
-            # We return a dict wrapper to match get_search_cache signature returning Dict usually containing 'results' string.
-            # But SearchTools logic: 
-            # cache = db.get_search_cache(...)
-            # cached_data = json.loads(cache['results'])
+        with self.pool.read() as conn:
+            # 1. 尝试从 search_detail 获取展开的结构化数据
+            details = [dict(row) for row in conn.execute("""
+                SELECT * FROM search_detail_v 
+                WHERE query_hash = ? 
+                ORDER BY rank
+            """, (query_hash,)).fetchall()]
             
-            # To minimize SearchTools changes, we can return a dict mimicking the old structure
-            # OR Change SearchTools to handle list return.
-            # Let's return a special dict that SearchTools can recognize or just format it as before.
-            return {"results": json.dumps(details), "timestamp": details[0]['crawl_time']}
-
-        # 2. Fallback to old table
-        cursor.execute("SELECT * FROM search_cache WHERE query_hash = ?", (query_hash,))
-        row = cursor.fetchone()
+            if details:
+                # 检查 TTL (取第一条的时间)
+                first_time = datetime.fromisoformat(details[0]['crawl_time'])
+                if ttl_seconds and (datetime.now() - first_time).total_seconds() > ttl_seconds:
+                    logger.info(f"⌛ Detailed cache expired for hash {query_hash}")
+                    pass # Expired, fall through or return None? If Detail expired, Cache likely expired too.
+                    # But let's check basic cache just in case metadata differs? 
+                    # Actually if details exist, we prefer them. If expired, we return None.
+                    return None
+                
+                logger.info(f"✅ Hit detailed search cache for {query_hash} ({len(details)} items)")
+                self._touch_search_cache(query_hash)
+                # Reconstruct the expected 'results' list format for SearchTools
+                # SearchTools expects a list of dicts. 
+                # We return a dict wrapper to match get_search_cache signature returning Dict usually containing 'results' string.
+                # But SearchTools logic: 
+                # cache = db.get_search_cache(...)
+                # cached_data = json.loads(cache['results'])
+                
+                # To minimize SearchTools changes, we can return a dict mimicking the old structure
+                # OR Change SearchTools to handle list return.
+                # Let's return a special dict that SearchTools can recognize or just format it as before.
+                return {"results": json.dumps(details), "timestamp": details[0]['crawl_time']}
+
+            # 2. Fallback to old table
+            row = conn.execute("SELECT * FROM search_cache WHERE query_hash = ?", (query_hash,)).fetchone()
+            if row:
+                row_dict = dict(row)
+                row_dict['results'] = self._hydrate_results(conn, decompress_text(row_dict['results']))
         
         if not row:
             return None
             
-        row_dict = dict(row)
         if ttl_seconds:
             cache_time = datetime.fromisoformat(row_dict['timestamp'])
             if (datetime.now() - cache_time).total_seconds() > ttl_seconds:
                 logger.info(f"⌛ Cache expired for hash {query_hash}")
                 return None
-                
+
+        self._touch_search_cache(query_hash)
         return row_dict
 
+    def _touch_search_cache(self, query_hash: str):
+        """记录缓存命中时间 (异步写入，不阻塞读取)"""
+        now = datetime.now().isoformat()
+        self.pool.submit(
+            lambda conn: conn.execute("UPDATE search_cache SET last_accessed = ? WHERE query_hash = ?", (now, query_hash)),
+            tag="search_cache",
+        )
+
     def save_search_cache(self, query_hash: str, query: str, engine: str, results: Union[str, List[Dict]]):
         """保存搜索结果 (同时保存到 search_cache 和 search_detail)"""
-        cursor = self.conn.cursor()
         current_time = datetime.now().isoformat()
         
-        results_str = results if isinstance(results, str) else json.dumps(results)
-        
-        # 1. Save summary to search_cache
-        cursor.execute("""
-            INSERT OR REPLACE INTO search_cache (query_hash, query, engine, results, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        """, (query_hash, query, engine, results_str, current_time))
-        
-        # 2. Save details to search_detail if results is a list
-        if isinstance(results, list):
-            for item in results:
-                try:
-                    item_id = item.get('id') or f"{hash(item.get('url', ''))}"
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO search_detail
-                        (id, query_hash, rank, title, url, content, publish_time, crawl_time, sentiment_score, source, meta_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        str(item_id),
-                        query_hash,
-                        item.get('rank', 0),
-                        item.get('title'),
-                        item.get('url'),
-                        item.get('content', ''),
-                        item.get('publish_time'),
-                        item.get('crawl_time') or current_time,
-                        item.get('sentiment_score'),
-                        item.get('source'),
-                        json.dumps(item.get('meta_data', {}))
-                    ))
-                except sqlite3.Error as e:
-                    logger.error(f"Database error saving search detail {item.get('title')}: {e}")
-                except Exception as e:
-                    logger.error(f"Unexpected error saving search detail {item.get('title')}: {e}")
-                    
-        self.conn.commit()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            # 正文写入 documents，两张表都只保存引用
+            results_str = results if isinstance(results, str) else self._slim_results(cursor, results, current_time)
+            results_str = compress_text(results_str)
+            # 1. Save summary to search_cache
+            cursor.execute("""
+                INSERT OR REPLACE INTO search_cache (query_hash, query, engine, results, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, (query_hash, query, engine, results_str, current_time))
+            
+            # 2. Save details to search_detail if results is a list
+            if isinstance(results, list):
+                for item in results:
+                    try:
+                        item_id = item.get('id') or f"{hash(item.get('url', ''))}"
+                        h = content_hash(item.get('content'))
+                        cursor.execute("""
+                            INSERT OR REPLACE INTO search_detail
+                            (id, query_hash, rank, title, url, content, content_hash, publish_time, crawl_time, sentiment_score, source, meta_data)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, (
+                            str(item_id),
+                            query_hash,
+                            item.get('rank', 0),
+                            item.get('title'),
+                            item.get('url'),
+                            None if h else item.get('content', ''),
+                            h,
+                            item.get('publish_time'),
+                            item.get('crawl_time') or current_time,
+                            item.get('sentiment_score'),
+                            item.get('source'),
+                            json.dumps(item.get('meta_data', {}))
+                        ))
+                    except sqlite3.Error as e:
+                        logger.error(f"Database error saving search detail {item.get('title')}: {e}")
+                    except Exception as e:
+                        logger.error(f"Unexpected error saving search detail {item.get('title')}: {e}")
 
     def find_similar_queries(self, query: str, limit: int = 5) -> List[Dict]:
-        """模糊搜索相似的已缓存查询"""
-        cursor = self.conn.cursor()
-        
-        # Simple fuzzy match: query in cached OR cached in query
-        q_wild = f"%{query}%"
-        cursor.execute("""
-            SELECT query, query_hash, timestamp, results 
-            FROM search_cache 
-            WHERE query LIKE ? OR ? LIKE ('%' || query || '%')
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (q_wild, query, limit))
+        """检索相似的已缓存查询 (FTS5，任一词项命中，对全部命中按 bm25 排序后取前 limit 条)"""
+        match = fts_match_query(query, operator="OR")
+        if not match:
+            return []
+        with self.pool.read() as conn:
+            rows = conn.execute("""
+                SELECT c.query, c.query_hash, c.timestamp, c.results
+                FROM (
+                    SELECT rowid, rank FROM search_cache_fts
+                    WHERE search_cache_fts MATCH ?
+                    ORDER BY rank, rowid DESC LIMIT ?
+                ) f
+                JOIN search_cache c ON c.rowid = f.rowid
+                ORDER BY f.rank, c.timestamp DESC
+                LIMIT ?
+            """, (match, limit, limit)).fetchall()
         
-        return [dict(row) for row in cursor.fetchall()]
+        return [{**dict(row), "results": decompress_text(row["results"])} for row in rows]
 
     def search_local_news(self, query: str, limit: int = 5) -> List[Dict]:
-        """从本地 daily_news 搜索相关新闻"""
-        cursor = self.conn.cursor()
-        q_wild = f"%{query}%"
-        # Search title and content
-        cursor.execute("""
-            SELECT * FROM daily_news
-            WHERE title LIKE ? OR content LIKE ?
-            ORDER BY crawl_time DESC
-            LIMIT ?
-        """, (q_wild, q_wild, limit))
-        return [dict(row) for row in cursor.fetchall()]
+        """从本地 daily_news 搜索相关新闻 (FTS5 标题+正文，全部词项命中，对全部命中按 bm25 排序后取前 limit 条)"""
+        match = fts_match_query(query, operator="AND")
+        if not match:
+            return []
+        with self.pool.read("daily_news") as conn:
+            rows = conn.execute(f"""
+                SELECT {_NEWS_COLUMNS}
+                FROM (
+                    SELECT rowid, rank FROM daily_news_fts
+                    WHERE daily_news_fts MATCH ?
+                    ORDER BY rank, rowid DESC LIMIT ?
+                ) f
+                JOIN daily_news d ON d.rowid = f.rowid
+                LEFT JOIN documents doc ON doc.doc_hash = d.content_hash
+                ORDER BY f.rank, d.crawl_time DESC
+                LIMIT ?
+            """, (match, limit, limit)).fetchall()
+        return [dict(row) for row in rows]
 
     # --- 股票数据操作 ---
 
     def save_stock_list(self, df: pd.DataFrame):
         """保存股票列表到 stock_list 表"""
-        cursor = self.conn.cursor()
         try:
-            # 清空旧表
-            cursor.execute("DELETE FROM stock_list")
-            
-            # 批量插入
-            data = df[['code', 'name']].to_dict('records')
-            cursor.executemany(
-                "INSERT INTO stock_list (code, name) VALUES (:code, :name)",
-                data
-            )
-            self.conn.commit()
+            with self.pool.write() as conn:
+                # 清空旧表
+                conn.execute("DELETE FROM stock_list")
+                
+                # 批量插入
+                data = df[['code', 'name']].to_dict('records')
+                conn.executemany(
+                    "INSERT INTO stock_list (code, name) VALUES (:code, :name)",
+                    data
+                )
+            self._bump_stock_list_version()
         except sqlite3.Error as e:
             logger.error(f"Database error saving stock list: {e}")
         except Exception as e:
             logger.error(f"Unexpected error saving stock list: {e}")
 
+    def count_stock_list(self) -> int:
+        """stock_list 表中的股票数量"""
+        with self.pool.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM stock_list").fetchone()[0]
+
     def search_stock(self, query: str, limit: int = 5) -> List[Dict]:
         """模糊搜索股票代码或名称"""
-        cursor = self.conn.cursor()
         wild = f"%{query}%"
-        cursor.execute("""
-            SELECT code, name FROM stock_list 
-            WHERE code LIKE ? OR name LIKE ? 
-            LIMIT ?
-        """, (wild, wild, limit))
-        return [dict(row) for row in cursor.fetchall()]
+        with self.pool.read() as conn:
+            rows = conn.execute("""
+                SELECT code, name FROM stock_list 
+                WHERE code LIKE ? OR name LIKE ? 
+                LIMIT ?
+            """, (wild, wild, limit)).fetchall()
+        return [dict(row) for row in rows]
 
     def get_stock_by_code(self, code: str) -> Optional[Dict[str, str]]:
         """精确按代码获取股票信息。
@@ -464,73 +900,454 @@ class DatabaseManager:
         if not clean:
             return None
 
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT code, name FROM stock_list WHERE code = ? LIMIT 1", (clean,))
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT code, name FROM stock_list WHERE code = ? LIMIT 1", (clean,)).fetchone()
         return dict(row) if row else None
 
+    _PRICE_COLUMNS = ['date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
+
+    @classmethod
+    def _price_columns(cls, df: pd.DataFrame) -> List[list]:
+        """将行情 DataFrame 一次性转为列数组 (Python 原生类型，可直接绑定到 sqlite3)"""
+        dates = df['date']
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            dates = dates.dt.strftime('%Y-%m-%d')
+        columns = [dates.astype(str).tolist()]
+        for col in cls._PRICE_COLUMNS[1:]:
+            columns.append(pd.to_numeric(df[col], errors='coerce').astype('float64').tolist())
+        return columns
+
+    def _upsert_price_rows(self, rows) -> None:
+        with self.pool.write() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO stock_prices 
+                (ticker, date, open, close, high, low, volume, change_pct)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
     def save_stock_prices(self, ticker: str, df: pd.DataFrame):
-        """保存股价历史数据"""
+        """保存股价历史数据 (列式转换 + executemany，单事务写入)。
+
+        只接受不复权 (adjust="") 的原始 K 线：stock_prices 存不复权价，读取时按 stock_adj_factors
+        换算，传入前复权价会被再复权一次。本方法不写复权因子与已同步区间，从网络增量同步的行情
+        应通过 save_price_deltas 写入。
+        """
         if df.empty:
             return
-            
-        cursor = self.conn.cursor()
         
         # 确保 DataFrame 有必要的列
-        required_cols = ['date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
-        for col in required_cols:
+        for col in self._PRICE_COLUMNS:
             if col not in df.columns:
                 logger.warning(f"Missing column {col} in stock data for {ticker}")
                 return
 
         try:
-            for _, row in df.iterrows():
-                cursor.execute("""
-                    INSERT OR REPLACE INTO stock_prices 
-                    (ticker, date, open, close, high, low, volume, change_pct)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    ticker,
-                    row['date'],
-                    row['open'],
-                    row['close'],
-                    row['high'],
-                    row['low'],
-                    row['volume'],
-                    row['change_pct']
-                ))
-            self.conn.commit()
+            columns = self._price_columns(df)
+            self._upsert_price_rows(zip(repeat(ticker), *columns))
         except sqlite3.Error as e:
             logger.error(f"Database error saving stock prices for {ticker}: {e}")
+            return
         except Exception as e:
             logger.error(f"Unexpected error saving stock prices for {ticker}: {e}")
+            return
 
-    def get_stock_prices(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """获取指定日期范围的股价数据"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM stock_prices 
-            WHERE ticker = ? AND date >= ? AND date <= ?
-            ORDER BY date
-        """, (ticker, start_date, end_date))
+        self._notify_prices_saved([ticker])
+        if self.price_store:
+            self._sync_price_store(ticker, df)
+
+    def save_stock_prices_many(self, df: pd.DataFrame) -> int:
+        """批量保存多只股票的行情 (长表格式，需包含 ticker 列)，单事务写入。
+
+        与 save_stock_prices 相同，只接受不复权的原始 K 线，不写复权因子与已同步区间
+        (带因子的同步结果使用 save_price_deltas)。
+
+        Returns:
+            写入的行数，失败时返回 0。
+        """
+        if df.empty:
+            return 0
+
+        for col in ['ticker'] + self._PRICE_COLUMNS:
+            if col not in df.columns:
+                logger.warning(f"Missing column {col} in bulk stock data")
+                return 0
+
+        try:
+            tickers = df['ticker'].astype(str).tolist()
+            columns = self._price_columns(df)
+            self._upsert_price_rows(zip(tickers, *columns))
+        except sqlite3.Error as e:
+            logger.error(f"Database error saving bulk stock prices: {e}")
+            return 0
+        except Exception as e:
+            logger.error(f"Unexpected error saving bulk stock prices: {e}")
+            return 0
+
+        self._notify_prices_saved(list(dict.fromkeys(tickers)))
+        if self.price_store:
+            for ticker, group in df.groupby(df['ticker'].astype(str), sort=False):
+                self._sync_price_store(ticker, group)
+        return len(tickers)
+
+    def _query_stock_prices(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+        columns = ['ticker', 'date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
+        with self.pool.read() as conn:
+            rows = conn.execute(f"""
+                SELECT {', '.join(columns)} FROM stock_prices 
+                WHERE ticker = ? AND date >= ? AND date <= ?
+                ORDER BY date
+            """, (ticker, start_date, end_date)).fetchall()
         
-        rows = cursor.fetchall()
         if not rows:
             return pd.DataFrame()
-            
-        columns = ['ticker', 'date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
-        return pd.DataFrame([dict(row) for row in rows], columns=columns)
+        return pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+
+    def _sync_price_store(self, ticker: str, df: Optional[pd.DataFrame] = None):
+        """将行情写入列式存储。首次写入某只股票时以 SQLite 中的完整历史为准，保证两者一致"""
+        try:
+            if df is None or not self.price_store.has(ticker):
+                df = self._query_stock_prices(ticker, "0000-00-00", "9999-99-99")
+            if not df.empty:
+                self.price_store.write(ticker, df)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to sync columnar price store for {ticker}: {e}")
+
+    def rebuild_price_store(self, tickers: Optional[List[str]] = None) -> int:
+        """从 SQLite 全量重建列式行情存储 (默认全部股票)，返回写入的股票数"""
+        if not self.price_store:
+            logger.warning("Columnar price store is not enabled (set PRICE_STORE_DIR)")
+            return 0
+        if tickers is None:
+            with self.pool.read() as conn:
+                tickers = [r[0] for r in conn.execute("SELECT DISTINCT ticker FROM stock_prices").fetchall()]
+        for ticker in tickers:
+            self.price_store.delete(ticker)
+            self._sync_price_store(ticker)
+        logger.info(f"🗃️ Rebuilt columnar price store for {len(tickers)} tickers")
+        return len(tickers)
+
+    def _get_adj_factors(self, tickers: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """{ticker: (变化点日期数组, 因子数组)}，日期升序；没有因子的股票不出现在结果中"""
+        rows = []
+        with self.pool.read("stock_adj_factors") as conn:
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                rows.extend(conn.execute(f"""
+                    SELECT ticker, date, factor FROM stock_adj_factors
+                    WHERE ticker IN ({','.join('?' * len(chunk))}) ORDER BY ticker, date
+                """, chunk).fetchall())
+        grouped: Dict[str, Tuple[list, list]] = {}
+        for ticker, d, factor in rows:
+            dates, values = grouped.setdefault(ticker, ([], []))
+            dates.append(d)
+            values.append(factor)
+        return {t: (np.array(d, dtype=str), np.array(v, dtype=np.float64)) for t, (d, v) in grouped.items()}
+
+    @staticmethod
+    def _adjust_prices(df: pd.DataFrame, factors: Optional[Tuple[np.ndarray, np.ndarray]], adjust: str) -> pd.DataFrame:
+        """不复权价按复权因子换算为前复权 (相对最新因子) / 后复权价，整列向量化计算"""
+        if df.empty or factors is None or adjust == "none":
+            return df
+        dates, values = factors
+        # 每根 K 线适用的因子：日期不晚于它的最后一个变化点 (早于首个变化点的沿用首个因子)
+        idx = np.maximum(np.searchsorted(dates, df['date'].to_numpy(dtype=str), side='right') - 1, 0)
+        factor = values[idx] / values[-1] if adjust == "qfq" else values[idx]
+        if np.all(factor == 1.0):
+            return df
+        for col in ('open', 'close', 'high', 'low'):
+            df[col] = df[col].to_numpy(dtype=np.float64) * factor
+        return df
+
+    def get_stock_prices(self, ticker: str, start_date: str, end_date: str, adjust: str = "qfq") -> pd.DataFrame:
+        """获取指定日期范围的股价数据 (启用列式存储时优先走内存映射读取)。
+
+        Args:
+            adjust: 复权方式 "qfq" (前复权) / "hfq" (后复权) / "none" (不复权)。
+                旧版本写入、尚无复权因子的股票原样返回 (即前复权价)。
+        """
+        if adjust not in ADJUST_MODES:
+            raise ValueError(f"Unknown adjust mode: {adjust}")
+        df = None
+        if self.price_store:
+            try:
+                df = self.price_store.get_stock_prices(ticker, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"⚠️ Columnar price store read failed for {ticker}, falling back to SQLite: {e}")
+
+        if df is None:
+            df = self._query_stock_prices(ticker, start_date, end_date)
+            if self.price_store and not df.empty:
+                # 首次读取时回填列式存储
+                self._sync_price_store(ticker)
+        if df.empty or adjust == "none":
+            return df
+        return self._adjust_prices(df, self._get_adj_factors([ticker]).get(ticker), adjust)
+
+    def get_stock_prices_many(self, tickers: List[str], start_date: str, end_date: str,
+                              as_frame: bool = False, adjust: str = "qfq") -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """批量获取多只股票同一日期范围的股价数据 (一次查询)。
+
+        Args:
+            tickers: 股票代码列表
+            start_date / end_date: 日期范围 "YYYY-MM-DD"
+            as_frame: True 时返回带 ticker 列的长表
+            adjust: 复权方式 "qfq" / "hfq" / "none" (同 get_stock_prices)
+
+        Returns:
+            {ticker: DataFrame}，没有数据的股票对应空 DataFrame；或合并后的长表。
+        """
+        if adjust not in ADJUST_MODES:
+            raise ValueError(f"Unknown adjust mode: {adjust}")
+        tickers = list(dict.fromkeys(tickers))
+        frames: Dict[str, pd.DataFrame] = {}
+        remaining = tickers
+
+        if self.price_store:
+            remaining = []
+            for ticker in tickers:
+                try:
+                    df = self.price_store.get_stock_prices(ticker, start_date, end_date)
+                except Exception as e:
+                    logger.warning(f"⚠️ Columnar price store read failed for {ticker}, falling back to SQLite: {e}")
+                    df = None
+                if df is None:
+                    remaining.append(ticker)
+                else:
+                    frames[ticker] = df
+
+        if remaining:
+            columns = ['ticker', 'date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
+            rows = []
+            with self.pool.read() as conn:
+                # 单条语句的参数个数有上限，超长列表分块
+                for i in range(0, len(remaining), 500):
+                    chunk = remaining[i:i + 500]
+                    rows.extend(conn.execute(f"""
+                        SELECT {', '.join(columns)} FROM stock_prices
+                        WHERE ticker IN ({','.join('?' * len(chunk))}) AND date >= ? AND date <= ?
+                        ORDER BY ticker, date
+                    """, (*chunk, start_date, end_date)).fetchall())
+
+            if rows:
+                df_all = pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+                for ticker, group in df_all.groupby('ticker', sort=False):
+                    frames[ticker] = group.reset_index(drop=True)
+                    if self.price_store:
+                        self._sync_price_store(ticker)
+
+        if frames and adjust != "none":
+            factors = self._get_adj_factors(list(frames))
+            for ticker, df in frames.items():
+                frames[ticker] = self._adjust_prices(df, factors.get(ticker), adjust)
+
+        result = {ticker: frames.get(ticker, pd.DataFrame()) for ticker in tickers}
+        if as_frame:
+            return self.concat_price_frames(result)
+        return result
+
+    def get_price_sync_state(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量读取增量同步所需的状态：已同步区间 + 本地首/末根 K 线 (不复权收盘价) 及其复权因子。
+
+        没有同步记录的旧数据以本地首末日期作为已同步区间；本地既无记录也无行情的股票不出现在结果中。
+        有 K 线但 first_factor / last_factor 为 None 的是旧版本写入的前复权历史。
+
+        Returns:
+            {ticker: {covered_start, covered_end, first_date, first_close, first_factor,
+                      last_date, last_close, last_factor}}
+        """
+        tickers = list(dict.fromkeys(tickers))
+        state: Dict[str, Dict[str, Any]] = {}
+        with self.pool.read("stock_prices", "stock_adj_factors") as conn:
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                marks = ','.join('?' * len(chunk))
+                for ticker, start, end in conn.execute(f"""
+                    SELECT ticker, covered_start, covered_end FROM price_sync_state WHERE ticker IN ({marks})
+                """, chunk).fetchall():
+                    state[ticker] = {"covered_start": start, "covered_end": end}
+                # min()/max() 聚合时的裸列取自对应行 (SQLite 语义)，走 (ticker, date) 主键
+                for agg, prefix in (("min", "first"), ("max", "last")):
+                    for ticker, date, close in conn.execute(f"""
+                        SELECT ticker, {agg}(date), close FROM stock_prices
+                        WHERE ticker IN ({marks}) GROUP BY ticker
+                    """, chunk).fetchall():
+                        entry = state.setdefault(ticker, {"covered_start": None, "covered_end": None})
+                        entry[f"{prefix}_date"] = date
+                        entry[f"{prefix}_close"] = close
+                    # 最早 / 最新的因子变化点即首 / 末根 K 线适用的因子
+                    for ticker, _, factor in conn.execute(f"""
+                        SELECT ticker, {agg}(date), factor FROM stock_adj_factors
+                        WHERE ticker IN ({marks}) GROUP BY ticker
+                    """, chunk).fetchall():
+                        if ticker in state:
+                            state[ticker][f"{prefix}_factor"] = factor
+
+        for entry in state.values():
+            for prefix in ("first", "last"):
+                for field in ("date", "close", "factor"):
+                    entry.setdefault(f"{prefix}_{field}", None)
+            if entry["covered_start"] is None:
+                entry["covered_start"] = entry["first_date"]
+                entry["covered_end"] = entry["last_date"]
+        return state
+
+    @staticmethod
+    def _put_sync_state(conn: sqlite3.Connection, ticker: str, start_date: str, end_date: str, reset: bool, now: str):
+        if reset:
+            conn.execute("""
+                INSERT OR REPLACE INTO price_sync_state (ticker, covered_start, covered_end, synced_at)
+                VALUES (?, ?, ?, ?)
+            """, (ticker, start_date, end_date, now))
+        else:
+            conn.execute("""
+                INSERT INTO price_sync_state (ticker, covered_start, covered_end, synced_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    covered_start = min(covered_start, excluded.covered_start),
+                    covered_end = max(covered_end, excluded.covered_end),
+                    synced_at = excluded.synced_at
+            """, (ticker, start_date, end_date, now))
+
+    def update_price_sync_state(self, ticker: str, start_date: str, end_date: str, reset: bool = False):
+        """记录已从网络同步的区间。默认与已有区间合并 (调用方保证两者相连)，reset=True 时直接覆盖"""
+        with self.pool.write() as conn:
+            self._put_sync_state(conn, ticker, start_date, end_date, reset, datetime.now().isoformat())
+        self._notify_prices_saved([ticker])
+
+    def save_price_deltas(self, deltas: List[Dict[str, Any]]) -> int:
+        """批量写入增量同步结果 (StockTools._collect_delta 的返回值)。
+
+        行情、复权因子变化点 (delta["factors"]) 与已同步区间在同一事务中提交，中断后不会出现
+        "区间已记录但行情未落盘"；replace=True 的股票 (旧版前复权历史 / 数据源修正了历史)
+        先删除旧的行情与因子再写入。
+
+        Returns:
+            写入的行数，失败时返回 0。
+        """
+        if not deltas:
+            return 0
+        frames = []
+        for delta in deltas:
+            df = delta["df"]
+            if not df.empty:
+                missing = [col for col in self._PRICE_COLUMNS if col not in df.columns]
+                if missing:
+                    logger.warning(f"Missing columns {missing} in stock data for {delta['ticker']}")
+                    return 0
+                frames.append(df[self._PRICE_COLUMNS].assign(ticker=delta["ticker"]))
+        df_all = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        factor_rows = [(delta["ticker"], d, float(f)) for delta in deltas for d, f in delta.get("factors") or ()]
+        now = datetime.now().isoformat()
+        try:
+            rows = zip(df_all['ticker'].tolist(), *self._price_columns(df_all)) if not df_all.empty else []
+            with self.pool.write() as conn:
+                for delta in deltas:
+                    if delta["replace"]:
+                        conn.execute("DELETE FROM stock_prices WHERE ticker = ?", (delta["ticker"],))
+                        conn.execute("DELETE FROM stock_adj_factors WHERE ticker = ?", (delta["ticker"],))
+                conn.executemany("""
+                    INSERT OR REPLACE INTO stock_prices
+                    (ticker, date, open, close, high, low, volume, change_pct)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.executemany("""
+                    INSERT OR REPLACE INTO stock_adj_factors (ticker, date, factor) VALUES (?, ?, ?)
+                """, factor_rows)
+                for delta in deltas:
+                    self._put_sync_state(conn, delta["ticker"], delta["covered_start"], delta["covered_end"],
+                                         delta["reset"], now)
+        except sqlite3.Error as e:
+            logger.error(f"Database error saving price deltas: {e}")
+            return 0
+        except Exception as e:
+            logger.error(f"Unexpected error saving price deltas: {e}")
+            return 0
+
+        self._notify_prices_saved([delta["ticker"] for delta in deltas])
+        if self.price_store:
+            for delta in deltas:
+                if delta["replace"]:
+                    self.price_store.delete(delta["ticker"])
+                if not delta["df"].empty:
+                    self._sync_price_store(delta["ticker"], delta["df"])
+        return len(df_all)
+
+    _SYNC_JOB_FIELDS = ('status', 'total', 'done', 'failed', 'from_snapshot', 'rows', 'finished_at', 'error')
+
+    def create_price_sync_job(self, job_id: str, start_date: str, end_date: str, total: int):
+        now = datetime.now().isoformat()
+        with self.pool.write() as conn:
+            conn.execute("""
+                INSERT INTO price_sync_jobs (job_id, status, start_date, end_date, total, started_at, updated_at)
+                VALUES (?, 'running', ?, ?, ?, ?, ?)
+            """, (job_id, start_date, end_date, total, now, now))
+
+    def update_price_sync_job(self, job_id: str, **fields):
+        """更新同步任务进度 (status / total / done / failed / from_snapshot / rows / finished_at / error)"""
+        fields = {k: v for k, v in fields.items() if k in self._SYNC_JOB_FIELDS}
+        fields['updated_at'] = datetime.now().isoformat()
+        assignments = ', '.join(f"{k} = ?" for k in fields)
+        with self.pool.write() as conn:
+            conn.execute(f"UPDATE price_sync_jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def get_price_sync_job(self, job_id: Optional[str] = None,
+                           unfinished: bool = False) -> Optional[Dict[str, Any]]:
+        """按 ID 获取同步任务；不指定 ID 时返回最近一次 (unfinished=True 时只找未完成的)"""
+        with self.pool.read() as conn:
+            if job_id:
+                row = conn.execute("SELECT * FROM price_sync_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            else:
+                where = "WHERE status != 'completed'" if unfinished else ""
+                row = conn.execute(f"""
+                    SELECT * FROM price_sync_jobs {where} ORDER BY started_at DESC LIMIT 1
+                """).fetchone()
+        return dict(row) if row else None
+
+    def list_stock_codes(self) -> List[str]:
+        """stock_list 中的全部代码"""
+        with self.pool.read() as conn:
+            return [r[0] for r in conn.execute("SELECT code FROM stock_list ORDER BY code").fetchall()]
+
+    def list_stocks(self) -> List[Tuple[str, str]]:
+        """stock_list 全表 [(code, name)] (按写入顺序)"""
+        with self.pool.read() as conn:
+            return [(r[0], r[1] or "") for r in conn.execute("SELECT code, name FROM stock_list ORDER BY rowid").fetchall()]
+
+    def save_stock_aliases(self, aliases: Dict[str, str]):
+        """保存股票别名 {alias: 股票名称或代码} (已存在的别名覆盖)"""
+        if not aliases:
+            return
+        with self.pool.write() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO stock_aliases (alias, target) VALUES (?, ?)",
+                [(str(a).strip(), str(t).strip()) for a, t in aliases.items() if str(a).strip() and str(t).strip()]
+            )
+        self._bump_stock_list_version()
+
+    def get_stock_aliases(self) -> Dict[str, str]:
+        with self.pool.read() as conn:
+            return {r[0]: r[1] for r in conn.execute("SELECT alias, target FROM stock_aliases").fetchall()}
+
+    @staticmethod
+    def concat_price_frames(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """把 {ticker: DataFrame} 合并为带 ticker 列的长表"""
+        non_empty = [df for df in frames.values() if not df.empty]
+        if not non_empty:
+            return pd.DataFrame()
+        return pd.concat(non_empty, ignore_index=True)
 
     def execute_query(self, query: str, params: tuple = ()) -> List[Any]:
         """执行自定义 SQL 查询"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, params)
             if query.strip().upper().startswith("SELECT"):
-                return cursor.fetchall()
+                # 任意查询无法判断涉及的表，先等待写入队列清空
+                self.pool.flush()
+                with self.pool.read() as conn:
+                    return conn.execute(query, params).fetchall()
             else:
-                self.conn.commit()
+                with self.pool.write() as conn:
+                    conn.execute(query, params)
                 return []
         except sqlite3.Error as e:
             logger.error(f"SQL execution failed (Database error): {e}")
@@ -542,17 +1359,9 @@ class DatabaseManager:
     # --- 投资信号操作 (ISQ Framework) ---
 
     def save_signal(self, signal: Dict[str, Any]):
-        """保存投资信号"""
-        cursor = self.conn.cursor()
+        """保存投资信号（经写入队列异步提交）"""
         created_at = datetime.now().isoformat()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO signals 
-            (signal_id, title, summary, transmission_chain, sentiment_score, 
-             confidence, intensity, expected_horizon, price_in_status, 
-             impact_tickers, industry_tags, sources, user_id, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        row = (
             signal.get('signal_id'),
             signal.get('title'),
             signal.get('summary'),
@@ -567,95 +1376,229 @@ class DatabaseManager:
             json.dumps(signal.get('sources', [])),
             signal.get('user_id'),
             created_at
-        ))
-        self.conn.commit()
+        )
+
+        def _write(conn: sqlite3.Connection):
+            conn.execute("""
+                INSERT OR REPLACE INTO signals 
+                (signal_id, title, summary, transmission_chain, sentiment_score, 
+                 confidence, intensity, expected_horizon, price_in_status, 
+                 impact_tickers, industry_tags, sources, user_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row)
+            self._index_signal(conn, row[0], signal.get('impact_tickers') or [], signal.get('industry_tags') or [],
+                               row[12], created_at)
+
+        self.pool.submit(_write, tag="signals")
+
+    @staticmethod
+    def _index_signal(conn, signal_id: str, tickers: List[Any], industries: List[Any],
+                      user_id: Optional[str], created_at: str):
+        """重建一个信号在 signal_tickers / signal_industries 中的索引行"""
+        conn.execute("DELETE FROM signal_tickers WHERE signal_id = ?", (signal_id,))
+        conn.execute("DELETE FROM signal_industries WHERE signal_id = ?", (signal_id,))
+        ticker_rows = {}
+        for item in tickers:
+            if isinstance(item, dict):
+                ticker, name, weight = item.get('ticker'), item.get('name'), item.get('weight')
+            else:
+                ticker, name, weight = item, None, None
+            ticker = _normalize_ticker(ticker)
+            if ticker and ticker not in ticker_rows:
+                try:
+                    weight = float(weight) if weight is not None else None
+                except (TypeError, ValueError):
+                    weight = None
+                ticker_rows[ticker] = (signal_id, ticker, name, weight, user_id, created_at)
+        conn.executemany("""
+            INSERT INTO signal_tickers (signal_id, ticker, name, weight, user_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, list(ticker_rows.values()))
+        tags = {str(t).strip() for t in industries if t and str(t).strip()}
+        conn.executemany(
+            "INSERT INTO signal_industries (signal_id, industry, user_id, created_at) VALUES (?, ?, ?, ?)",
+            [(signal_id, tag, user_id, created_at) for tag in tags],
+        )
 
     def get_recent_signals(self, limit: int = 20, user_id: Optional[str] = None) -> List[Dict]:
         """获取最近的投资信号"""
-        cursor = self.conn.cursor()
-        if user_id:
-            cursor.execute("SELECT * FROM signals WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit))
-        else:
-            cursor.execute("SELECT * FROM signals ORDER BY created_at DESC LIMIT ?", (limit,))
-        rows = cursor.fetchall()
+        with self.pool.read("signals") as conn:
+            if user_id:
+                rows = conn.execute("SELECT * FROM signals WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM signals ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
         
-        signals = []
-        for row in rows:
-            d = dict(row)
-            # 解析 JSON 字段
-            for field in ['transmission_chain', 'impact_tickers', 'industry_tags', 'sources']:
-                if d.get(field):
-                    try:
-                        d[field] = json.loads(d[field])
-                    except:
-                        pass
-            signals.append(d)
-        return signals
+        return [self._decode_signal(row) for row in rows]
+
+    @staticmethod
+    def _decode_signal(row) -> Dict:
+        d = dict(row)
+        # 解析 JSON 字段
+        for field in ['transmission_chain', 'impact_tickers', 'industry_tags', 'sources']:
+            if d.get(field):
+                try:
+                    d[field] = json.loads(d[field])
+                except:
+                    pass
+        return d
+
+    def _query_indexed_signals(self, table: str, column: str, values: List[str], days: Optional[float],
+                               since: Optional[str], until: Optional[str], user_id: Optional[str],
+                               limit: int) -> List[Dict]:
+        values = list(dict.fromkeys(v for v in values if v))
+        if not values:
+            return []
+        if since is None and days:
+            since = (datetime.now() - timedelta(days=days)).isoformat()
+        where = [f"x.{column} IN ({','.join('?' * len(values))})"]
+        params: List[Any] = list(values)
+        if since:
+            where.append("x.created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("x.created_at < ?")
+            params.append(until)
+        if user_id:
+            where.append("x.user_id = ?")
+            params.append(user_id)
+        params.append(limit)
+        with self.pool.read("signals") as conn:
+            rows = conn.execute(f"""
+                SELECT s.* FROM signals s
+                WHERE s.signal_id IN (SELECT x.signal_id FROM {table} x WHERE {' AND '.join(where)})
+                ORDER BY s.created_at DESC
+                LIMIT ?
+            """, params).fetchall()
+        return [self._decode_signal(row) for row in rows]
+
+    def get_signals_by_tickers(self, tickers: List[str], days: Optional[float] = 30, since: Optional[str] = None,
+                               until: Optional[str] = None, user_id: Optional[str] = None,
+                               limit: int = 100) -> List[Dict]:
+        """获取涉及任一标的的信号 (按 created_at 倒序)
+
+        Args:
+            tickers: 股票代码，"600519" / "600519.SH" 等写法等价
+            days: 时间窗 (最近 N 天)，since 指定时忽略；None 表示不限
+            since / until: ISO 时间窗 [since, until)
+        """
+        return self._query_indexed_signals(
+            "signal_tickers", "ticker", [_normalize_ticker(t) for t in tickers], days, since, until, user_id, limit
+        )
+
+    def get_signals_by_ticker(self, ticker: str, **kwargs) -> List[Dict]:
+        """获取涉及某个标的的信号，参数同 get_signals_by_tickers"""
+        return self.get_signals_by_tickers([ticker], **kwargs)
+
+    def get_signals_by_industry(self, industry: str, days: Optional[float] = 30, since: Optional[str] = None,
+                                until: Optional[str] = None, user_id: Optional[str] = None,
+                                limit: int = 100) -> List[Dict]:
+        """获取带有某个行业标签的信号，时间窗参数同 get_signals_by_tickers"""
+        return self._query_indexed_signals(
+            "signal_industries", "industry", [(industry or "").strip()], days, since, until, user_id, limit
+        )
+
+    def get_signals_in_window(self, since: str, until: Optional[str] = None, user_id: Optional[str] = None,
+                              limit: int = 100) -> List[Dict]:
+        """获取时间窗 [since, until) 内的信号"""
+        query = "SELECT * FROM signals WHERE created_at >= ?"
+        params: List[Any] = [since]
+        if until:
+            query += " AND created_at < ?"
+            params.append(until)
+        if user_id:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self.pool.read("signals") as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._decode_signal(row) for row in rows]
 
     # --- 用户管理 ---
 
     def _ensure_invitation_code(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM invitation_codes WHERE is_used = 0")
-        code_count = cursor.fetchone()[0]
-        
-        if user_count == 0 and code_count == 0:
-            initial_code = "DEEP-EAR-ADMIN"
-            cursor.execute("INSERT OR IGNORE INTO invitation_codes (code, created_at) VALUES (?, ?)", 
-                          (initial_code, datetime.now().isoformat()))
-            self.conn.commit()
-            logger.info(f"🔑 Generate Initial Invitation Code: {initial_code}")
+        # 常见情况 (已有用户或可用邀请码) 只需一次只读检查
+        with self.pool.read() as conn:
+            if conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM users) OR EXISTS(SELECT 1 FROM invitation_codes WHERE is_used = 0)"
+            ).fetchone()[0]:
+                return
+
+        with self.pool.write() as conn:
+            user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            code_count = conn.execute("SELECT COUNT(*) FROM invitation_codes WHERE is_used = 0").fetchone()[0]
+            
+            if user_count == 0 and code_count == 0:
+                initial_code = "DEEP-EAR-ADMIN"
+                conn.execute("INSERT OR IGNORE INTO invitation_codes (code, created_at) VALUES (?, ?)", 
+                             (initial_code, datetime.now().isoformat()))
+                logger.info(f"🔑 Generate Initial Invitation Code: {initial_code}")
 
     def create_invitation_code(self, code: str) -> bool:
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO invitation_codes (code, created_at) VALUES (?, ?)", 
-                          (code, datetime.now().isoformat()))
-            self.conn.commit()
+            with self.pool.write() as conn:
+                conn.execute("INSERT INTO invitation_codes (code, created_at) VALUES (?, ?)", 
+                             (code, datetime.now().isoformat()))
             return True
         except sqlite3.IntegrityError:
             return False
 
     def verify_invitation_code(self, code: str) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT 1 FROM invitation_codes WHERE code = ? AND is_used = 0", (code,))
-        return cursor.fetchone() is not None
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT 1 FROM invitation_codes WHERE code = ? AND is_used = 0", (code,)).fetchone()
+        return row is not None
 
     def create_user(self, username: str, password_hash: str, invitation_code: str) -> bool:
-        cursor = self.conn.cursor()
-        
-        # Verify invitation code
-        cursor.execute("SELECT code FROM invitation_codes WHERE code = ? AND is_used = 0", (invitation_code,))
-        if not cursor.fetchone():
-            return False
-            
         try:
-            # Create user
-            cursor.execute("INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
-                          (username, password_hash, datetime.now().isoformat()))
-            user_id = cursor.lastrowid
-            
-            # Mark code as used
-            cursor.execute("UPDATE invitation_codes SET is_used = 1, used_by = ? WHERE code = ?",
-                          (user_id, invitation_code))
-            
-            self.conn.commit()
+            with self.pool.write() as conn:
+                # Verify invitation code
+                row = conn.execute("SELECT code FROM invitation_codes WHERE code = ? AND is_used = 0", (invitation_code,)).fetchone()
+                if not row:
+                    return False
+                
+                # Create user
+                cursor = conn.execute("INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                                      (username, password_hash, datetime.now().isoformat()))
+                user_id = cursor.lastrowid
+                
+                # Mark code as used
+                conn.execute("UPDATE invitation_codes SET is_used = 1, used_by = ? WHERE code = ?",
+                             (user_id, invitation_code))
             return True
         except sqlite3.IntegrityError:
-            self.conn.rollback()
             return False
 
     def get_user_by_username(self, username: str) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
         return dict(row) if row else None
 
-    def close(self):
-        if self.conn:
-            self.conn.close()
-            logger.info("Database connection closed.")
+    # --- 写入队列 ---
+
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """屏障：等待已入队的新闻/信号写入全部落盘（例如报告生成读取之前）"""
+        return self.pool.flush(timeout)
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        """写入队列指标：队列深度、批大小、提交耗时等"""
+        return self.pool.write_queue_stats()
+
+    # --- 数据保留 ---
 
+    def run_retention(self) -> Dict[str, Any]:
+        """立即执行一次保留策略 (TTL / LRU / 容量淘汰 + 增量回收)，返回清理报告"""
+        return self.retention.run_once()
+
+    def start_retention(self, interval_s: int = RETENTION_INTERVAL_S):
+        """按 interval_s 秒的间隔启动后台清理 (<=0 时不启动；同一连接池只启动一次)"""
+        self.retention.start(interval_s)
+
+    def retention_stats(self) -> Optional[Dict[str, Any]]:
+        """最近一次保留策略的清理报告 (尚未运行时为 None)"""
+        return self.retention.last_report
+
+    def close(self):
+        if self.pool:
+            release_pool(self.pool)
+            self.pool = None
+            logger.debug("Database connection closed.")
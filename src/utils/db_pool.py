@@ -0,0 +1,264 @@
+"""
+AlphaEar SQLite 连接池
+
+同一数据库文件在进程内共享一个池：
+- 每个线程一个只读连接（WAL 模式下读不阻塞写）
+- 全局唯一写连接，由锁串行化，每个写事务使用 BEGIN IMMEDIATE
+- 统一设置 journal_mode / busy_timeout / synchronous / cache_size 等 PRAGMA
+- 可选的异步批量写入队列 (write-behind)，高频小写入合并提交
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from loguru import logger
+
+from utils.write_behind import WriteBehindQueue
+
+# 可通过环境变量覆盖的默认参数
+DEFAULT_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "10000"))
+DEFAULT_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))  # 16 MB / connection
+DEFAULT_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DEFAULT_AUTO_VACUUM = os.getenv("DB_AUTO_VACUUM", "INCREMENTAL")  # 仅对新建的数据库文件生效
+WRITE_BEHIND_ENABLED = os.getenv("DB_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "200"))
+WRITE_FLUSH_MS = float(os.getenv("DB_WRITE_FLUSH_MS", "50"))
+
+
+class SQLitePool:
+    """单写多读的 SQLite 连接池"""
+
+    def __init__(
+        self,
+        db_path: str,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        write_behind: bool = WRITE_BEHIND_ENABLED,
+    ):
+        self.db_path = str(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.synchronous = synchronous
+
+        self._local = threading.local()
+        self._readers: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._functions: Dict[str, Tuple[int, Callable]] = {}
+        self._closed = False
+        # 各组件已确认的 schema 版本 (utils.migrations 使用)，避免重复检查
+        self.schema_versions: Dict[str, int] = {}
+
+        self._writer = self._connect()
+        # auto_vacuum 必须在建表之前设置；已有数据库需 VACUUM 一次才会切换
+        self._writer.execute(f"PRAGMA auto_vacuum={DEFAULT_AUTO_VACUUM}")
+        self._writer.execute("PRAGMA journal_mode=WAL")
+
+        self._write_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self._write_behind = WriteBehindQueue(self, max_batch=WRITE_BATCH_SIZE, max_delay_ms=WRITE_FLUSH_MS)
+
+    # --- 连接管理 ---
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: 自动提交模式，事务由 write() 显式控制
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=self.busy_timeout_ms / 1000,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        for name, (narg, func) in self._functions.items():
+            conn.create_function(name, narg, func, deterministic=True)
+        return conn
+
+    def create_function(self, name: str, narg: int, func: Callable):
+        """在池内所有连接（包括之后新建的）上注册 SQL 函数，供触发器/查询使用"""
+        if name in self._functions:
+            return
+        self._functions[name] = (narg, func)
+        with self._write_lock, self._readers_lock:
+            self._writer.create_function(name, narg, func, deterministic=True)
+            for _, conn in self._readers.values():
+                conn.create_function(name, narg, func, deterministic=True)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        conn = self._connect()
+        conn.execute("PRAGMA query_only=ON")
+        thread = threading.current_thread()
+        with self._readers_lock:
+            # 回收已结束线程遗留的连接（线程池 worker 退出后）
+            for ident, (t, c) in list(self._readers.items()):
+                if not t.is_alive():
+                    c.close()
+                    del self._readers[ident]
+            self._readers[thread.ident] = (thread, conn)
+        self._local.conn = conn
+        return conn
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        """写连接（仅供兼容旧代码直接使用 conn 的场景）"""
+        return self._writer
+
+    @contextmanager
+    def read(self, *tables: str) -> Iterator[sqlite3.Connection]:
+        """获取当前线程的只读连接。
+
+        在持有写锁的线程内（写事务中）返回写连接，以便读到未提交的修改。
+
+        Args:
+            tables: 本次读取涉及的表；若写入队列中还有这些表的待提交写操作，先等待其落盘
+        """
+        if tables:
+            self._barrier(*tables)
+        if getattr(self._local, "write_depth", 0):
+            yield self._writer
+            return
+        yield self._reader()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """获取写连接并开启事务，正常退出时提交，异常时回滚。
+
+        可重入：嵌套调用复用外层事务。外层写事务开始前会先等待写入队列清空，
+        保证同步写与已入队的异步写按调用顺序生效。
+        """
+        if not getattr(self._local, "write_depth", 0):
+            self._barrier()
+        with self._write_lock:
+            conn = self._writer
+            depth = getattr(self._local, "write_depth", 0)
+            self._local.write_depth = depth + 1
+            try:
+                if depth:
+                    yield conn
+                    return
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.rollback()
+                    raise
+                else:
+                    conn.commit()
+            finally:
+                self._local.write_depth = depth
+
+    @contextmanager
+    def exclusive(self) -> Iterator[sqlite3.Connection]:
+        """持有写锁但不开启事务 (用于 VACUUM 等不能在事务内执行的语句)"""
+        self._barrier()
+        with self._write_lock:
+            yield self._writer
+
+    # --- 异步写入 ---
+
+    def submit(self, fn: Callable[[sqlite3.Connection], None], tag: str = "default"):
+        """提交一个写操作 fn(conn)。
+
+        启用 write-behind 时入队后立即返回，由后台线程批量提交；否则在当前线程同步执行。
+        tag 一般为目标表名，供 read(*tables) 判断是否需要等待。
+        """
+        if self._write_behind is not None and not getattr(self._local, "write_depth", 0):
+            self._write_behind.submit(fn, tag)
+            return
+        with self.write() as conn:
+            fn(conn)
+
+    def _barrier(self, *tags: str):
+        wb = self._write_behind
+        if wb is None or wb.in_worker() or not wb.pending(*tags):
+            return
+        if getattr(self._local, "write_depth", 0):
+            # 已持有写锁时等待后台线程会死锁，只能读到已提交的数据
+            return
+        wb.flush()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """屏障：等待写入队列中已提交的写操作全部落盘"""
+        if self._write_behind is None:
+            return True
+        return self._write_behind.flush(timeout)
+
+    def write_queue_stats(self) -> Dict:
+        """写入队列指标 (未启用时 enabled=False)"""
+        if self._write_behind is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._write_behind.stats()}
+
+    def close(self):
+        if self._write_behind is not None:
+            self._write_behind.close()
+        with self._write_lock, self._readers_lock:
+            if self._closed:
+                return
+            for _, conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+            self._writer.close()
+            self._closed = True
+        logger.info(f"Database pool closed: {self.db_path}")
+
+
+# --- 进程级共享注册表 ---
+
+_pools: Dict[str, Tuple[SQLitePool, int]] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_path: str) -> str:
+    return str(Path(db_path).resolve())
+
+
+def acquire_pool(db_path: str) -> SQLitePool:
+    """获取（或创建）指定数据库文件的共享连接池，并增加引用计数"""
+    key = _pool_key(db_path)
+    with _pools_lock:
+        entry = _pools.get(key)
+        if entry is None:
+            pool = SQLitePool(key)
+            _pools[key] = (pool, 1)
+            return pool
+        pool, refs = entry
+        _pools[key] = (pool, refs + 1)
+        return pool
+
+
+def release_pool(pool: SQLitePool):
+    """释放一次引用；引用归零时关闭连接池"""
+    key = _pool_key(pool.db_path)
+    with _pools_lock:
+        entry = _pools.get(key)
+        if entry is None or entry[0] is not pool:
+            return
+        refs = entry[1] - 1
+        if refs > 0:
+            _pools[key] = (pool, refs)
+            return
+        del _pools[key]
+    pool.close()
+
+
+def get_pool(db_path: str) -> Optional[SQLitePool]:
+    """返回已存在的共享连接池（不增加引用计数）"""
+    with _pools_lock:
+        entry = _pools.get(_pool_key(db_path))
+        return entry[0] if entry else None
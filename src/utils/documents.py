@@ -0,0 +1,25 @@
+"""
+AlphaEar 正文内容寻址存储 (documents 表)
+
+daily_news / search_detail 只保存正文哈希 (content_hash)，正文本身按哈希去重存放在
+documents 中：同一篇文章被多个热榜来源、多次搜索命中时只存一份。documents.url 记录
+正文由 ContentExtractor 抓取时的原始 URL，供后续查询直接复用，避免重复抓取。
+"""
+import hashlib
+from typing import Optional
+
+
+def normalize_body(text: str) -> str:
+    """哈希前的正文规范化：统一换行、去掉首尾与行尾空白"""
+    lines = str(text).replace("\r\n", "\n").replace("\r", "\n").strip().split("\n")
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def content_hash(text) -> Optional[str]:
+    """正文哈希 (sha1 hex)，空正文返回 None；同时注册为 SQL 函数 doc_hash 供迁移回填使用"""
+    if not text:
+        return None
+    body = normalize_body(text)
+    if not body:
+        return None
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
@@ -0,0 +1,46 @@
+"""
+FTS5 全文检索辅助 - 基于 jieba 的预分词
+
+SQLite 自带的 unicode61 分词器会把连续的中文当作一个 token，无法检索子词。
+这里在写入时用 jieba 预先切词（空格分隔）存入 FTS5 的 tokens 列，
+查询时使用同样的分词生成 MATCH 表达式。
+"""
+import re
+from typing import List
+
+_WORD_RE = re.compile(r"\w", re.UNICODE)
+
+
+def _cut(text: str, for_search: bool) -> List[str]:
+    import jieba  # 使用 jieba 进行中文分词
+
+    words = jieba.cut_for_search(text) if for_search else jieba.cut(text)
+    return [w.strip() for w in words if _WORD_RE.search(w)]
+
+
+def fts_tokens(text) -> str:
+    """生成写入 FTS5 tokens 列的预分词文本（注册为 SQL 函数 fts_tokens 供触发器调用）"""
+    if not text:
+        return ""
+    return " ".join(_cut(str(text), for_search=True))
+
+
+def fts_match_query(query: str, operator: str = "AND") -> str:
+    """将用户查询转换为 FTS5 MATCH 表达式。
+
+    Args:
+        query: 原始查询文本
+        operator: 词项之间的连接方式，"AND"（全部命中）或 "OR"（任一命中）
+
+    Returns:
+        MATCH 表达式；查询中没有可检索词项时返回空字符串。
+    """
+    terms = []
+    seen = set()
+    for w in _cut(query or "", for_search=False):
+        key = w.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        terms.append('"' + w.replace('"', '""') + '"')
+    return f" {operator} ".join(terms)
@@ -0,0 +1,200 @@
+"""
+AlphaEar 多数据源对冲请求 (hedged requests)
+
+按优先级依次尝试多个数据源，但不必等前一个超时：主数据源在 "对冲延迟" 内没有返回时，
+并行启动下一个数据源，取最先返回的有效结果；某个数据源报错时立即启动下一个。
+对冲延迟默认取该数据源近期成功请求延迟的 p95 (样本不足时使用默认值)，
+因此慢的数据源会更早被对冲，快的数据源几乎不会产生额外请求。
+
+- HEDGE_ENABLED (KLINE_HEDGE): 关闭后退化为严格串行降级 (旧行为)
+- HEDGE_DELAY_S (KLINE_HEDGE_DELAY_S): 固定对冲延迟；为空时按 p95 自动调整
+- stats(): 各数据源的调用数、错误数、胜出次数与延迟分位数
+- 每个数据源经熔断器 "{name}:{source}" 调用 (utils.circuit_breaker)，熔断中的数据源直接跳过
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from utils.circuit_breaker import BreakerRegistry, CircuitOpenError, breakers as default_breakers
+
+HEDGE_ENABLED = os.getenv("KLINE_HEDGE", "true").lower() in ("1", "true", "yes")
+HEDGE_DELAY_S = os.getenv("KLINE_HEDGE_DELAY_S", "")
+HEDGE_DEFAULT_DELAY_S = float(os.getenv("KLINE_HEDGE_DEFAULT_DELAY_S", "2.0"))
+HEDGE_MIN_DELAY_S = float(os.getenv("KLINE_HEDGE_MIN_DELAY_S", "0.3"))
+HEDGE_MAX_DELAY_S = float(os.getenv("KLINE_HEDGE_MAX_DELAY_S", "8.0"))
+HEDGE_QUANTILE = float(os.getenv("KLINE_HEDGE_QUANTILE", "0.95"))
+_MIN_SAMPLES = 20
+
+
+class SourceStats:
+    """单个数据源的滚动延迟 / 错误统计 (线程安全)"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0
+
+    def record(self, latency_s: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self._latencies.append(latency_s)
+            else:
+                self.errors += 1
+
+    def record_win(self):
+        with self._lock:
+            self.wins += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """成功请求延迟的分位数，样本不足时返回 None"""
+        with self._lock:
+            if len(self._latencies) < _MIN_SAMPLES:
+                return None
+            samples = sorted(self._latencies)
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._latencies)
+            calls, errors, wins = self.calls, self.errors, self.wins
+        pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 1) if samples else None
+        return {
+            "calls": calls,
+            "errors": errors,
+            "wins": wins,
+            "error_rate": round(errors / calls, 3) if calls else 0.0,
+            "p50_ms": pick(0.5),
+            "p95_ms": pick(0.95),
+        }
+
+
+class HedgedFetcher:
+    """对冲请求执行器：sources 按优先级排列，返回第一个通过 valid 校验的结果"""
+
+    def __init__(self, name: str, max_workers: int = 32, breakers: Optional[BreakerRegistry] = default_breakers):
+        self.name = name
+        self.breakers = breakers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"hedge-{name}")
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, SourceStats] = {}
+
+    def _source_stats(self, source: str) -> SourceStats:
+        with self._stats_lock:
+            if source not in self._stats:
+                self._stats[source] = SourceStats()
+            return self._stats[source]
+
+    def hedge_delay(self, source: str) -> Optional[float]:
+        """启动下一个数据源前等待该数据源的时间；None 表示不对冲 (只在失败后降级)"""
+        if not HEDGE_ENABLED:
+            return None
+        if HEDGE_DELAY_S:
+            return float(HEDGE_DELAY_S)
+        delay = self._source_stats(source).quantile(HEDGE_QUANTILE)
+        if delay is None:
+            delay = HEDGE_DEFAULT_DELAY_S
+        return min(max(delay, HEDGE_MIN_DELAY_S), HEDGE_MAX_DELAY_S)
+
+    def set_probe(self, source: str, probe: Callable[[], Any]):
+        """注册数据源熔断后的后台探测函数"""
+        if self.breakers is not None:
+            self.breakers.get(f"{self.name}:{source}", probe)
+
+    def _allow(self, source: str) -> Any:
+        """熔断器放行结果 (真值放行；half_open 探测时为探测令牌，随调用传给 _timed)"""
+        return True if self.breakers is None else self.breakers.get(f"{self.name}:{source}").allow()
+
+    def _timed(self, source: str, fn: Callable[[], Any], token: Any = None) -> Any:
+        stats = self._source_stats(source)
+        breaker = self.breakers.get(f"{self.name}:{source}") if self.breakers is not None else None
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            stats.record(time.perf_counter() - t0, ok=False)
+            if breaker:
+                breaker.record(time.perf_counter() - t0, ok=False, token=token)
+            raise
+        stats.record(time.perf_counter() - t0, ok=True)
+        if breaker:
+            breaker.record(time.perf_counter() - t0, ok=True, token=token)
+        return result
+
+    def fetch(self, sources: Sequence[Tuple[str, Callable[[], Any]]],
+              valid: Callable[[Any], bool] = bool) -> Tuple[Optional[str], Any]:
+        """按优先级对冲请求多个数据源。
+
+        Returns:
+            (胜出的数据源名, 结果)。全部数据源都只返回无效 (如空) 结果时返回 (None, 最后一个无效结果)。
+
+        Raises:
+            全部数据源都报错时抛出优先级最高的数据源的异常；
+            全部数据源都处于熔断状态时抛出 CircuitOpenError。
+        """
+        pending: Dict[Any, str] = {}
+        errors: List[Tuple[str, Exception]] = []
+        fallback_result: Any = None
+        next_idx = 0
+        last_source: Optional[str] = None
+
+        def launch():
+            """启动下一个未熔断的数据源"""
+            nonlocal next_idx, last_source
+            while next_idx < len(sources):
+                source, fn = sources[next_idx]
+                next_idx += 1
+                token = self._allow(source)
+                if token:
+                    pending[self._executor.submit(self._timed, source, fn, token)] = source
+                    last_source = source
+                    return
+                logger.debug(f"⏭️ {self.name}: skipping {source} (circuit open)")
+
+        launch()
+        if not pending:
+            raise CircuitOpenError(f"{self.name}: all sources circuit-open ({', '.join(s for s, _ in sources)})")
+        while pending:
+            timeout = self.hedge_delay(last_source) if next_idx < len(sources) else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                slow = last_source
+                launch()
+                if last_source != slow:
+                    logger.info(f"⏱️ {self.name}: {slow} slower than {timeout:.2f}s, hedging with {last_source}")
+                continue
+
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ {self.name}: {source} failed: {e}")
+                    errors.append((source, e))
+                    continue
+                if valid(result):
+                    self._source_stats(source).record_win()
+                    # 未完成的请求无法中断，结果直接丢弃
+                    return source, result
+                fallback_result = result
+
+            # 已完成的数据源都失败或无数据：立即启动下一个
+            if next_idx < len(sources):
+                launch()
+
+        if errors and fallback_result is None:
+            errors.sort(key=lambda item: [s for s, _ in sources].index(item[0]))
+            raise errors[0][1]
+        return None, fallback_result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            items = list(self._stats.items())
+        return {source: s.snapshot() for source, s in items}
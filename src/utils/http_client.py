@@ -0,0 +1,341 @@
+"""
+AlphaEar 共享 HTTP 客户端 (连接池 + 重试 + 指标)
+
+各数据源 (东方财富 / 腾讯 K 线、NewsNow、Polymarket、Jina) 原先直接调用 requests.get，
+每次请求都新建 TCP+TLS 连接。这里提供进程内共享的 Session：
+
+- 按主机复用 keep-alive 连接池 (HTTP_POOL_MAXSIZE 为每个主机的最大空闲连接数)
+- 连接错误 (含连接超时) / 5xx 按指数退避 + 全抖动 (full jitter) 重试，默认只重试 GET
+  (429 不在默认重试状态码中，由调用方按各自的限流策略处理)；读超时只在调用方传入
+  retry_timeouts=True 时重试，避免 Jina / NewsNow 等长超时调用被放大数倍
+- deadline (time.monotonic() 截止时间) 限制包括重试在内的总耗时：每次尝试的超时不超过剩余时间，
+  剩余时间不够退避时不再重试
+- 每个主机的请求数、错误数、重试数与延迟分位数 (http.stats())
+
+async_http 为 asyncio 版本 (httpx.AsyncClient)，重试与指标相同，另按主机限制并发请求数；
+同步调用方通过 async_http.run_sync() 在后台事件循环线程上执行协程。未安装 httpx 时
+退化为在线程中调用同步客户端。
+
+- HTTP_POOL_MAXSIZE / HTTP_RETRIES / HTTP_BACKOFF_S / HTTP_BACKOFF_MAX_S / HTTP_RETRY_STATUSES
+- HTTP_TIMEOUT_S: 调用方未指定 timeout 时的默认超时
+- HTTP_HOST_CONCURRENCY: async_http 每个主机的最大并发请求数
+- HTTP_RECORD_DIR: 把响应录制为夹具文件，供本地回放压测 (utils.http_fixtures)
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+from loguru import logger
+
+from utils.hedged_fetch import SourceStats
+from utils.http_fixtures import recorder
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_S = float(os.getenv("HTTP_BACKOFF_S", "0.3"))
+HTTP_BACKOFF_MAX_S = float(os.getenv("HTTP_BACKOFF_MAX_S", "5.0"))
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "30"))
+HTTP_HOST_CONCURRENCY = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+HTTP_RETRY_STATUSES = frozenset(
+    int(s) for s in os.getenv("HTTP_RETRY_STATUSES", "500,502,503,504").split(",") if s.strip()
+)
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS"})
+# 同步 / 异步客户端可能抛出的网络异常 (供调用方统一捕获)
+NETWORK_ERRORS = (requests.RequestException, OSError) + ((httpx.HTTPError,) if httpx is not None else ())
+
+T = TypeVar("T")
+
+
+def _attempt_timeout(timeout: Any, deadline: Optional[float]) -> Any:
+    """本次尝试的超时：不超过 deadline 的剩余时间"""
+    if deadline is None:
+        return timeout
+    remaining = max(0.1, deadline - time.monotonic())
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+def _has_time(deadline: Optional[float], delay: float) -> bool:
+    """退避 delay 秒后是否仍在 deadline 之前"""
+    return deadline is None or time.monotonic() + delay < deadline
+
+
+class _HostStats(SourceStats):
+    def __init__(self):
+        super().__init__()
+        self.retries = 0
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = super().snapshot()
+        snap.pop("wins", None)
+        snap["retries"] = self.retries
+        return snap
+
+
+class HttpClient:
+    """进程内共享的 HTTP 客户端 (线程安全)"""
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, retries: int = HTTP_RETRIES,
+                 backoff_s: float = HTTP_BACKOFF_S, backoff_max_s: float = HTTP_BACKOFF_MAX_S,
+                 timeout_s: float = HTTP_TIMEOUT_S):
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.session = requests.Session()
+        # 重试由 request() 负责 (需要抖动退避与指标)，适配器本身不重试
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, _HostStats] = {}
+
+    def _host_stats(self, host: str) -> _HostStats:
+        with self._stats_lock:
+            if host not in self._stats:
+                self._stats[host] = _HostStats()
+            return self._stats[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_s * (2 ** attempt)))
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, retry_timeouts: bool = False,
+                deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        """发送请求；连接错误 / HTTP_RETRY_STATUSES 时退避重试。
+
+        Args:
+            retries: 覆盖默认重试次数；非幂等方法 (POST 等) 默认不重试
+            retry_timeouts: 读超时也重试 (默认不重试：每次重试都可能再等满 timeout)
+            deadline: time.monotonic() 截止时间，限制包括重试在内的总耗时
+            **kwargs: 透传给 requests (params / headers / json / timeout ...)
+
+        Returns:
+            最后一次的 Response (重试耗尽时可能是 5xx，由调用方判断状态码)
+
+        Raises:
+            重试耗尽后的 requests 异常
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in _IDEMPOTENT else 0
+        timeout = kwargs.pop("timeout", self.timeout_s)
+        host = urlparse(url).netloc
+        stats = self._host_stats(host)
+
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            delay = self._backoff(attempt)
+            try:
+                response = self.session.request(method, url, timeout=_attempt_timeout(timeout, deadline), **kwargs)
+            except (ConnectionError, Timeout) as e:
+                stats.record(time.perf_counter() - t0, ok=False)
+                # ConnectTimeout 同时是 ConnectionError (未建立连接，重试代价小)；ReadTimeout 只在 retry_timeouts 时重试
+                retryable = isinstance(e, ConnectionError) or retry_timeouts
+                if not retryable or attempt >= retries or not _has_time(deadline, delay):
+                    raise
+                error = type(e).__name__
+            else:
+                elapsed = time.perf_counter() - t0
+                stats.record(elapsed, ok=response.status_code < 500)
+                if (response.status_code not in HTTP_RETRY_STATUSES or attempt >= retries
+                        or not _has_time(deadline, delay)):
+                    if recorder is not None:
+                        recorder.record(method, response, elapsed)
+                    return response
+                error = f"HTTP {response.status_code}"
+                response.close()
+            attempt += 1
+            stats.record_retry()
+            logger.debug(f"🔁 {host}: {error}, retry {attempt}/{retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """每个主机的请求数 / 错误数 / 重试数 / 延迟分位数"""
+        with self._stats_lock:
+            items = list(self._stats.items())
+        return {host: s.snapshot() for host, s in items}
+
+
+class _LoopState:
+    """单个事件循环上的 httpx 客户端与每主机信号量"""
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class AsyncHttpClient:
+    """asyncio 版共享 HTTP 客户端：与 HttpClient 相同的重试与指标，另按主机限制并发 (线程安全)。
+
+    httpx.AsyncClient 与事件循环绑定，每个事件循环各建一个；同步代码调用 run_sync()，
+    协程在常驻的后台事件循环线程上执行，多次调用复用同一个连接池。
+    """
+
+    def __init__(self, host_concurrency: int = HTTP_HOST_CONCURRENCY, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 retries: int = HTTP_RETRIES, backoff_s: float = HTTP_BACKOFF_S,
+                 backoff_max_s: float = HTTP_BACKOFF_MAX_S, timeout_s: float = HTTP_TIMEOUT_S,
+                 sync_client: Optional[HttpClient] = None, verify: bool = True):
+        self.host_concurrency = max(1, host_concurrency)
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.verify = verify
+        # 未安装 httpx 时的退化路径
+        self._sync = sync_client
+        self._lock = threading.Lock()
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, _HostStats] = {}
+        self._runner: Optional[asyncio.AbstractEventLoop] = None
+        self._runner_thread: Optional[threading.Thread] = None
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                client = None
+                if httpx is not None:
+                    # 并发由每主机信号量限制，连接池只限制空闲连接数
+                    limits = httpx.Limits(max_connections=None, max_keepalive_connections=self.pool_maxsize * 4)
+                    # requests 默认跟随重定向，httpx 默认不跟随：保持迁移前的行为 (如腾讯 http:// 跳转 https://)
+                    client = httpx.AsyncClient(limits=limits, timeout=self.timeout_s, verify=self.verify,
+                                               follow_redirects=True)
+                state = self._loops[loop] = _LoopState(client)
+            return state
+
+    def _host_stats(self, host: str) -> _HostStats:
+        with self._lock:
+            if host not in self._stats:
+                self._stats[host] = _HostStats()
+            return self._stats[host]
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_s * (2 ** attempt)))
+
+    async def request(self, method: str, url: str, retries: Optional[int] = None, retry_timeouts: bool = False,
+                      deadline: Optional[float] = None, **kwargs) -> Any:
+        """发送请求 (同 HttpClient.request)；同一主机的并发请求数不超过 host_concurrency。
+
+        Returns:
+            httpx.Response (未安装 httpx 时为 requests.Response)，接口兼容 status_code / json() / text / raise_for_status()
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in _IDEMPOTENT else 0
+        host = urlparse(url).netloc
+        state = self._state()
+        semaphore = state.semaphores.get(host)
+        if semaphore is None:
+            semaphore = state.semaphores[host] = asyncio.Semaphore(self.host_concurrency)
+
+        if state.client is None:
+            sync_client = self._sync or http
+            async with semaphore:
+                return await asyncio.to_thread(sync_client.request, method, url, retries=retries,
+                                               retry_timeouts=retry_timeouts, deadline=deadline, **kwargs)
+
+        timeout = kwargs.pop("timeout", self.timeout_s)
+        stats = self._host_stats(host)
+        attempt = 0
+        while True:
+            delay = self._backoff(attempt)
+            try:
+                async with semaphore:
+                    # 延迟不含排队等待信号量的时间
+                    t0 = time.perf_counter()
+                    response = await state.client.request(
+                        method, url, timeout=_attempt_timeout(timeout, deadline), **kwargs)
+            except httpx.TransportError as e:
+                stats.record(time.perf_counter() - t0, ok=False)
+                # 与 HttpClient 一致：连接失败 / 连接被断开默认重试，其他超时只在 retry_timeouts 时重试
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)) \
+                    or (retry_timeouts and isinstance(e, httpx.TimeoutException))
+                if not retryable or attempt >= retries or not _has_time(deadline, delay):
+                    raise
+                error = type(e).__name__
+            else:
+                elapsed = time.perf_counter() - t0
+                stats.record(elapsed, ok=response.status_code < 500)
+                if (response.status_code not in HTTP_RETRY_STATUSES or attempt >= retries
+                        or not _has_time(deadline, delay)):
+                    if recorder is not None:
+                        recorder.record(method, response, elapsed)
+                    return response
+                error = f"HTTP {response.status_code}"
+            attempt += 1
+            stats.record_retry()
+            logger.debug(f"🔁 {host}: {error}, retry {attempt}/{retries} in {delay:.2f}s")
+            # 退避期间不占用该主机的并发名额
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> Any:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> Any:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        """关闭当前事件循环上的连接池"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(loop, None)
+        if state is not None and state.client is not None:
+            await state.client.aclose()
+
+    def _runner_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._runner is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-http", daemon=True)
+                thread.start()
+                self._runner, self._runner_thread = loop, thread
+            return self._runner
+
+    def run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        """在后台事件循环线程上执行协程并阻塞等待结果 (任意线程可调用，包括运行着其他事件循环的线程)"""
+        loop = self._runner_loop()
+        if threading.current_thread() is self._runner_thread:
+            coro.close()
+            raise RuntimeError("run_sync() called from the async-http loop itself; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """每个主机的请求数 / 错误数 / 重试数 / 延迟分位数 (未安装 httpx 时见 http.stats())"""
+        with self._lock:
+            items = list(self._stats.items())
+        return {host: s.snapshot() for host, s in items}
+
+
+# 进程内共享
+http = HttpClient()
+async_http = AsyncHttpClient()
@@ -0,0 +1,143 @@
+"""
+AlphaEar HTTP 录制 / 回放夹具 (fixtures)
+
+东方财富 / 腾讯 / NewsNow / Jina 都有限流，无法对 StockTools、NewsNowTools、SearchTools 做压测。
+这里把真实响应录制成夹具文件，再由本地回放服务器 (scripts/replay_server.py) 提供：
+
+- HTTP_RECORD_DIR: 设置后共享客户端 (http / async_http) 把每个最终响应写入该目录，
+  按主机分子目录，一个请求一个 JSON 文件 (方法、URL、状态码、Content-Type、正文、耗时)
+- 回放服务器以 /<原主机>/<原路径>?<原查询> 的形式提供夹具；各数据源的地址经环境变量
+  (EM_KLINE_URL、NEWSNOW_BASE_URL、JINA_BASE_URL ...) 指向回放服务器
+  (replay_server.py --print-env 输出全部变量)
+- 匹配顺序：方法 + 主机 + 路径 + 查询完全一致 -> 同主机同路径 (忽略查询，如换了股票代码)
+  -> 同主机路径前缀最长的夹具；VOLATILE_PARAMS 中的时间戳 / 回调参数不参与匹配
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from loguru import logger
+
+HTTP_RECORD_DIR = os.getenv("HTTP_RECORD_DIR", "")
+# 每次请求都会变化、不影响响应内容的查询参数
+VOLATILE_PARAMS = frozenset({"_", "cb", "callback", "timestamp"})
+
+
+def split_url(url: str) -> Tuple[str, str, str]:
+    """URL -> (主机, 解码后的路径, 规范化查询串)"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    return parts.netloc, unquote(parts.path) or "/", urlencode(query)
+
+
+def fixture_key(method: str, host: str, path: str, query: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {host}{path}?{query}".encode("utf-8")).hexdigest()[:20]
+
+
+def _host_dir(host: str) -> str:
+    return host.replace(":", "_") or "_"
+
+
+class FixtureRecorder:
+    """把共享客户端的响应写成夹具文件 (线程安全；同一请求重复录制时覆盖)"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        logger.info(f"📼 Recording HTTP responses to {self.root}")
+
+    def record(self, method: str, response: Any, elapsed_s: float):
+        """记录一个最终响应 (requests.Response 或 httpx.Response)；写入失败只记日志"""
+        # 发生重定向时按调用方请求的原始 URL 记录
+        history = getattr(response, "history", None) or []
+        url = str((history[0] if history else response).request.url)
+        host, path, query = split_url(url)
+        body = response.content
+        fixture = {
+            "method": method.upper(),
+            "url": url,
+            "host": host,
+            "path": path,
+            "query": query,
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "elapsed_ms": round(elapsed_s * 1000, 1),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        try:
+            fixture["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            fixture["body_b64"] = base64.b64encode(body).decode("ascii")
+
+        target = self.root / _host_dir(host) / f"{fixture_key(method, host, path, query)}.json"
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.debug(f"Failed to record fixture for {url}: {e}")
+            return
+        with self._lock:
+            self.recorded += 1
+
+
+class FixtureStore:
+    """从夹具目录加载全部响应，按请求匹配 (只读，线程安全)"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._by_path: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._by_host: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for file in sorted(self.root.glob("*/*.json")):
+            try:
+                fixture = json.loads(file.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Skipping unreadable fixture {file}: {e}")
+                continue
+            method, host, path = fixture["method"], fixture["host"], fixture["path"]
+            self._exact[fixture_key(method, host, path, fixture["query"])] = fixture
+            self._by_path[(method, host, path)].append(fixture)
+            self._by_host[(method, host)].append(fixture)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def hosts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for fixture in self._exact.values():
+            counts[fixture["host"]] += 1
+        return dict(sorted(counts.items()))
+
+    def match(self, method: str, host: str, path: str, query: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """返回 (夹具, 匹配方式 exact / path / prefix)，没有同主机的夹具时返回 (None, "miss")"""
+        method = method.upper()
+        fixture = self._exact.get(fixture_key(method, host, path, query))
+        if fixture is not None:
+            return fixture, "exact"
+        candidates = self._by_path.get((method, host, path))
+        if candidates:
+            return candidates[0], "path"
+        candidates = self._by_host.get((method, host))
+        if candidates:
+            return max(candidates, key=lambda f: len(os.path.commonprefix([f["path"], path]))), "prefix"
+        return None, "miss"
+
+    @staticmethod
+    def body(fixture: Dict[str, Any]) -> bytes:
+        if "body_b64" in fixture:
+            return base64.b64decode(fixture["body_b64"])
+        return fixture.get("body", "").encode("utf-8")
+
+
+# 进程内共享 (未设置 HTTP_RECORD_DIR 时为 None)
+recorder: Optional[FixtureRecorder] = FixtureRecorder(HTTP_RECORD_DIR) if HTTP_RECORD_DIR else None
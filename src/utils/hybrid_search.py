@@ -184,7 +184,7 @@ class LocalNewsSearch(HybridSearcher):
         """从数据库加载最近 N 天的新闻构建索引"""
         try:
             # 假设 db_manager 有 execute_query
-            query = f"SELECT title, content, publish_time, source FROM daily_news ORDER BY publish_time DESC LIMIT ?"
+            query = f"SELECT title, content, publish_time, source FROM daily_news_v ORDER BY publish_time DESC LIMIT ?"
             results = self.db.execute_query(query, (limit,))
             
             data = []
@@ -4,7 +4,6 @@ import numpy as np
 from datetime import datetime
 from typing import List, Optional
 from loguru import logger
-from pandas.tseries.offsets import BusinessDay
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,6 +21,7 @@ from sentence_transformers import SentenceTransformer
 
 from utils.predictor.model import Kronos, KronosTokenizer, KronosPredictor
 from schema.models import KLinePoint
+from utils.trading_calendar import get_calendar, market_of
 
 class KronosPredictorUtility:
     """
@@ -111,9 +111,13 @@ class KronosPredictorUtility:
             self._predictor = None
             self.has_news_model = False
 
-    def get_base_forecast(self, df: pd.DataFrame, lookback: int = 20, pred_len: int = 5, news_text: Optional[str] = None) -> List[KLinePoint]:
+    def get_base_forecast(self, df: pd.DataFrame, lookback: int = 20, pred_len: int = 5, news_text: Optional[str] = None,
+                          ticker: Optional[str] = None) -> List[KLinePoint]:
         """
         生成原始模型预测
+
+        未来时间戳按交易所交易日历生成 (跳过节假日)；市场由 ticker (默认取 df 的 ticker 列) 判断，
+        无法判断时按 A 股处理。
         """
         if self._predictor is None:
             logger.error("Predictor not initialized.")
@@ -128,9 +132,12 @@ class KronosPredictorUtility:
         x_timestamp = pd.to_datetime(x_df['date']) # Ensure datetime
         last_date = x_timestamp.iloc[-1]
         
-        # 生成未来时间戳
-        future_dates = pd.date_range(start=last_date + BusinessDay(1), periods=pred_len, freq='B')
-        y_timestamp = pd.Series(future_dates)
+        # 生成未来时间戳 (交易日)
+        if ticker is None and 'ticker' in df.columns and len(df):
+            ticker = df['ticker'].iloc[-1]
+        calendar = get_calendar(market_of(ticker) if ticker else "CN")
+        future_dates = calendar.sessions_after(last_date.date(), pred_len)
+        y_timestamp = pd.Series(pd.to_datetime(future_dates))
 
         # Embedding News if available
         news_emb = None
@@ -0,0 +1,84 @@
+"""
+AlphaEar 数据库版本迁移 (基于 PRAGMA user_version)
+
+每个组件维护一个有序的迁移列表，版本号从 1 开始递增。当前版本保存在数据库文件头的
+user_version 中；同一个库文件被多个组件共享 (DatabaseManager / DashboardDB)，
+因此 user_version 按 15 位分段，每个组件占一段 (slot)。
+
+常见情况 (已是最新版本) 只读一次 PRAGMA user_version，同一连接池内之后直接命中缓存。
+迁移本身应保持幂等 (CREATE ... IF NOT EXISTS / add_column)，以兼容版本化之前创建的旧库。
+"""
+import sqlite3
+from typing import Callable, NamedTuple, Sequence
+
+from loguru import logger
+
+_SLOT_BITS = 15
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+MAX_SLOTS = 2  # user_version 为 32 位有符号整数
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+def _slot_version(user_version: int, slot: int) -> int:
+    return (user_version >> (_SLOT_BITS * slot)) & _SLOT_MASK
+
+
+def _with_slot_version(user_version: int, slot: int, version: int) -> int:
+    shift = _SLOT_BITS * slot
+    return (user_version & ~(_SLOT_MASK << shift)) | (version << shift)
+
+
+def column_exists(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
+    return any(row[1] == column for row in cursor.execute(f"PRAGMA table_info({table})").fetchall())
+
+
+def add_column(cursor: sqlite3.Cursor, table: str, column: str, decl: str):
+    """列不存在时添加 (替代 ALTER TABLE + 吞异常的探测写法)"""
+    if not column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        logger.info(f"Migrated database: added {table}.{column}")
+
+
+def migrate(pool, component: str, slot: int, migrations: Sequence[Migration]) -> int:
+    """把 component 的 schema 升级到 migrations 中的最新版本，返回当前版本。
+
+    Args:
+        pool: SQLitePool
+        component: 组件名 (仅用于日志与缓存键)
+        slot: user_version 中的分段序号 (0 <= slot < MAX_SLOTS)
+        migrations: 按版本号升序排列的迁移列表
+    """
+    if not 0 <= slot < MAX_SLOTS:
+        raise ValueError(f"schema slot out of range: {slot}")
+    target = migrations[-1].version if migrations else 0
+
+    cached = pool.schema_versions.get(component)
+    if cached is not None and cached >= target:
+        return cached
+
+    with pool.read() as conn:
+        current = _slot_version(conn.execute("PRAGMA user_version").fetchone()[0], slot)
+    if current >= target:
+        pool.schema_versions[component] = current
+        return current
+
+    with pool.write() as conn:
+        cursor = conn.cursor()
+        # 拿到写锁后重新读取，其他进程可能已完成迁移
+        user_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        current = _slot_version(user_version, slot)
+        for m in migrations:
+            if m.version <= current:
+                continue
+            logger.info(f"🛠️ Migrating {component} schema to v{m.version}: {m.description}")
+            m.apply(cursor)
+            current = m.version
+        cursor.execute(f"PRAGMA user_version = {_with_slot_version(user_version, slot, current)}")
+
+    pool.schema_versions[component] = current
+    return current
@@ -1,17 +1,19 @@
-import requests
 from requests.exceptions import RequestException, Timeout
 import json
+import os
 import time
 from datetime import datetime
 from typing import List, Dict, Optional
 from loguru import logger
 from utils.database_manager import DatabaseManager
 from utils.content_extractor import ContentExtractor
+from utils.circuit_breaker import breakers
+from utils.http_client import http
 
 class NewsNowTools:
     """热点新闻获取工具 - 接入 NewsNow API 与 Jina 内容提取"""
     
-    BASE_URL = "https://newsnow.busiyi.world"
+    BASE_URL = os.getenv("NEWSNOW_BASE_URL", "https://newsnow.busiyi.world")
     SOURCES = {
         # 金融类
         "cls": "财联社",
@@ -56,9 +58,26 @@ class NewsNowTools:
             logger.info(f"⚡ Using cached news for {source_id} (Age: {int(now - cached['time'])}s)")
             return cached["data"]
 
+        url = f"{self.BASE_URL}/api/s?id={source_id}"
+        headers = {"User-Agent": self.user_agent}
+        # 按新闻源熔断：故障的源直接跳过 (有缓存时返回旧缓存)，后台探测恢复
+        breaker = breakers.get(
+            f"newsnow:{source_id}",
+            probe=lambda: http.get(url, headers=headers, timeout=10, retries=0).status_code == 200,
+        )
+        token = breaker.allow()
+        if not token:
+            logger.warning(f"⏭️ NewsNow source {source_id} circuit open, skipping")
+            return cached["data"] if cached else []
+
         try:
-            url = f"{self.BASE_URL}/api/s?id={source_id}"
-            response = requests.get(url, headers={"User-Agent": self.user_agent}, timeout=30)
+            t0 = time.perf_counter()
+            try:
+                response = http.get(url, headers=headers, timeout=30)
+            except RequestException:
+                breaker.record(time.perf_counter() - t0, ok=False, token=token)
+                raise
+            breaker.record(time.perf_counter() - t0, ok=response.status_code == 200, token=token)
             if response.status_code == 200:
                 data = response.json()
                 items = data.get("items", [])[:count]
@@ -67,7 +86,7 @@ class NewsNowTools:
                     item_url = item.get("url", "")
                     content = ""
                     if fetch_content and item_url:
-                        content = self.extractor.extract_with_jina(item_url) or ""
+                        content = self.extractor.extract_cached(item_url, self.db) or ""
                     
                     processed_items.append({
                         "id": item.get("id") or f"{source_id}_{int(time.time())}_{i}",
@@ -114,7 +133,7 @@ class NewsNowTools:
 
     def fetch_news_content(self, url: str) -> Optional[str]:
         """
-        使用 Jina Reader 抓取指定 URL 的网页正文内容。
+        使用 Jina Reader 抓取指定 URL 的网页正文内容（已抓取过的 URL 直接复用本地存储的正文）。
         
         Args:
             url: 需要抓取内容的完整网页 URL，必须以 http:// 或 https:// 开头。
@@ -122,7 +141,7 @@ class NewsNowTools:
         Returns:
             提取的网页正文内容 (Markdown 格式)，如果失败则返回 None。
         """
-        return self.extractor.extract_with_jina(url)
+        return self.extractor.extract_cached(url, self.db)
 
     def get_unified_trends(self, sources: Optional[List[str]] = None) -> str:
         """
@@ -162,7 +181,7 @@ class NewsNowTools:
 class PolymarketTools:
     """Polymarket 预测市场数据工具 - 获取热门预测市场反映公众情绪和预期"""
     
-    BASE_URL = "https://gamma-api.polymarket.com"
+    BASE_URL = os.getenv("POLYMARKET_BASE_URL", "https://gamma-api.polymarket.com")
     
     def __init__(self, db: DatabaseManager):
         self.db = db
@@ -187,13 +206,30 @@ class PolymarketTools:
             - outcomePrices: 各结果的概率价格
             - volume: 交易量
         """
+        url = f"{self.BASE_URL}/markets"
+        headers = {"User-Agent": self.user_agent, "Accept": "application/json"}
+        breaker = breakers.get(
+            "polymarket:markets",
+            probe=lambda: http.get(url, params={"limit": 1}, headers=headers, timeout=10, retries=0).status_code == 200,
+        )
+        token = breaker.allow()
+        if not token:
+            logger.warning("⏭️ Polymarket circuit open, skipping")
+            return []
+
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/markets",
-                params={"active": "true", "closed": "false", "limit": limit},
-                headers={"User-Agent": self.user_agent, "Accept": "application/json"},
-                timeout=30
-            )
+            t0 = time.perf_counter()
+            try:
+                response = http.get(
+                    url,
+                    params={"active": "true", "closed": "false", "limit": limit},
+                    headers=headers,
+                    timeout=30
+                )
+            except RequestException:
+                breaker.record(time.perf_counter() - t0, ok=False, token=token)
+                raise
+            breaker.record(time.perf_counter() - t0, ok=response.status_code == 200, token=token)
             
             if response.status_code == 200:
                 markets = response.json()
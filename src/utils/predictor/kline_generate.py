@@ -1,14 +1,23 @@
 # Ref: https://github.com/shiyu-coder/Kronos
 
+import os
+import sys
+from datetime import datetime
+
 from model import Kronos, KronosTokenizer, KronosPredictor
 import pandas as pd
-import sqlite3
 import torch
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 from pandas.tseries.offsets import BusinessDay
 import numpy as np
 
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils.database_manager import DatabaseManager
+
 def get_device():
     device = "cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu"
     print(f"Using device: {device}")
@@ -23,8 +32,12 @@ def load_predictor():
     return KronosPredictor(model, tokenizer, device=device, max_context=512)
 
 def load_data(ticker="002111", db_path="AlphaEar/data/signal_flux.db"):
-    with sqlite3.connect(db_path) as conn:
-        df = pd.read_sql_query(f"SELECT * FROM stock_prices WHERE ticker = '{ticker}'", conn)
+    # 复权换算 (不复权价 + 复权因子 -> 前复权) 统一由 DatabaseManager 完成
+    db = DatabaseManager(db_path)
+    try:
+        df = db.get_stock_prices(ticker, "1900-01-01", datetime.now().strftime("%Y-%m-%d"), adjust="qfq")
+    finally:
+        db.close()
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values('date').reset_index(drop=True)
     return df
@@ -0,0 +1,154 @@
+"""
+AlphaEar 进程内行情 DataFrame 缓存 (LRU)
+
+一次运行中同一只股票的历史会被 FinAgent 工具、ForecastAgent、ReportAgent 价格上下文、
+Dashboard 图表反复读取。每只股票缓存一个日期区间的 DataFrame：请求区间落在缓存区间内时
+直接切片返回，不查 SQLite、不重建 DataFrame；同时缓存增量同步状态 (price_sync_state)，
+命中时连新鲜度判断也不需要查库。
+
+行情写入 (save_stock_prices / save_stock_prices_many / save_price_deltas) 时由
+DatabaseManager 通知失效。仅对本进程的写入生效，其他进程写入同一数据库不会通知。
+
+- PRICE_CACHE_MAX_ENTRIES / PRICE_CACHE_MAX_MB: 容量上限 (任一为 0 时关闭缓存)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+PRICE_CACHE_MAX_ENTRIES = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "256"))
+PRICE_CACHE_MAX_MB = float(os.getenv("PRICE_CACHE_MAX_MB", "64"))
+
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("start", "end", "df", "nbytes", "state")
+
+    def __init__(self):
+        self.start: Optional[str] = None
+        self.end: Optional[str] = None
+        self.df: Optional[pd.DataFrame] = None
+        self.nbytes = 0
+        self.state: Any = MISSING
+
+
+class PriceFrameCache:
+    """按 (数据库, 股票) 缓存一个日期区间的行情，按条数与字节数双重上限做 LRU 淘汰 (线程安全)"""
+
+    def __init__(self, max_entries: int = PRICE_CACHE_MAX_ENTRIES, max_mb: float = PRICE_CACHE_MAX_MB):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # 每次失效递增；put 时与读库前取得的值比较，丢弃读库期间被新写入作废的结果
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, db_key: str, ticker: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """请求区间落在缓存区间内时返回切片 (新 DataFrame，可自由修改)，否则返回 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get((db_key, ticker))
+            if entry is None or entry.df is None or start_date < entry.start or end_date > entry.end:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((db_key, ticker))
+            self.hits += 1
+            df = entry.df
+        if df.empty:
+            return df.copy()
+        # 缓存的行情按日期升序，二分定位切片边界
+        dates = df['date']
+        lo, hi = dates.searchsorted(start_date, 'left'), dates.searchsorted(end_date, 'right')
+        return df.iloc[lo:hi].reset_index(drop=True)
+
+    def put(self, db_key: str, ticker: str, start_date: str, end_date: str, df: pd.DataFrame,
+            generation: Optional[int] = None):
+        """缓存 [start_date, end_date] 的完整行情；已有更大的区间时保留原区间。
+
+        generation: 读库前的 self.generation，期间发生过失效时不缓存
+        """
+        if not self.enabled:
+            return
+        nbytes = int(df.memory_usage(index=True, deep=True).sum()) if not df.empty else 0
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            entry = self._entries.get((db_key, ticker))
+            if entry is None:
+                entry = self._entries[(db_key, ticker)] = _Entry()
+            elif entry.df is not None and entry.start <= start_date and entry.end >= end_date:
+                self._entries.move_to_end((db_key, ticker))
+                return
+            self._bytes += nbytes - entry.nbytes
+            entry.start, entry.end, entry.df, entry.nbytes = start_date, end_date, df, nbytes
+            self._entries.move_to_end((db_key, ticker))
+            self._evict()
+
+    def get_state(self, db_key: str, ticker: str) -> Any:
+        """缓存的同步状态；未缓存时返回 MISSING (状态本身可能为 None，表示本地无数据)"""
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            entry = self._entries.get((db_key, ticker))
+            return entry.state if entry is not None else MISSING
+
+    def put_state(self, db_key: str, ticker: str, state: Optional[Dict], generation: Optional[int] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            entry = self._entries.get((db_key, ticker))
+            if entry is None:
+                entry = self._entries[(db_key, ticker)] = _Entry()
+            entry.state = state
+            self._evict()
+
+    def invalidate(self, db_key: str, tickers: Iterable[str]):
+        """行情写入后丢弃对应股票的缓存"""
+        with self._lock:
+            self.generation += 1
+            for ticker in tickers:
+                entry = self._entries.pop((db_key, ticker), None)
+                if entry is not None:
+                    self._bytes -= entry.nbytes
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,161 @@
+"""
+AlphaEar 列式行情存储 (可选后端)
+
+每只股票一个 .npy 文件，形状为 (7, n) 的 float64 数组，按行存放
+date(距 1970-01-01 的天数) / open / close / high / low / volume / change_pct，
+日期升序。C 顺序下每一行都是连续内存，np.load(mmap_mode='r') 后按列切片即为零拷贝视图。
+
+- 区间读取对日期行做二分查找 (np.searchsorted)
+- 写入为 "读旧 + 合并 + 整文件原子替换"，已映射的旧文件不受影响
+"""
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+PRICE_FIELDS = ['open', 'close', 'high', 'low', 'volume', 'change_pct']
+PRICE_COLUMNS = ['ticker', 'date'] + PRICE_FIELDS
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _to_days(dates) -> np.ndarray:
+    """日期 (str / datetime) -> 距 epoch 的天数 (float64)"""
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]").astype(np.int64).astype(np.float64)
+
+
+def _day_of(date_str: str) -> float:
+    return float(np.datetime64(pd.Timestamp(date_str).date(), "D").astype(np.int64))
+
+
+class ColumnarPriceStore:
+    """按股票分文件的内存映射列式行情存储"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # ticker -> ((mtime_ns, size), memmap)
+        self._maps: Dict[str, Tuple[Tuple[int, int], np.ndarray]] = {}
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{_UNSAFE_CHARS.sub('_', ticker)}.npy"
+
+    def has(self, ticker: str) -> bool:
+        return self._path(ticker).exists()
+
+    def _load(self, ticker: str) -> Optional[np.ndarray]:
+        path = self._path(ticker)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._maps.pop(ticker, None)
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+        cached = self._maps.get(ticker)
+        if cached and cached[0] == version:
+            return cached[1]
+        block = np.load(path, mmap_mode="r")
+        self._maps[ticker] = (version, block)
+        return block
+
+    # --- 读取 ---
+
+    def get_arrays(self, ticker: str, start_date: str, end_date: str) -> Optional[Dict[str, np.ndarray]]:
+        """返回 [start_date, end_date] 区间的列视图 (零拷贝)，date 为天数 (float64)。
+
+        股票不在存储中时返回 None。
+        """
+        block = self._load(ticker)
+        if block is None:
+            return None
+        days = block[0]
+        lo = int(np.searchsorted(days, _day_of(start_date), side="left"))
+        hi = int(np.searchsorted(days, _day_of(end_date), side="right"))
+        out = {"date": days[lo:hi]}
+        for i, field in enumerate(PRICE_FIELDS, start=1):
+            out[field] = block[i, lo:hi]
+        return out
+
+    def get_stock_prices(self, ticker: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """与 DatabaseManager.get_stock_prices 相同的返回格式；股票不在存储中时返回 None"""
+        arrays = self.get_arrays(ticker, start_date, end_date)
+        if arrays is None:
+            return None
+        if len(arrays["date"]) == 0:
+            return pd.DataFrame()
+        dates = np.datetime_as_string(arrays["date"].astype(np.int64).astype("datetime64[D]"))
+        data = {"ticker": ticker, "date": dates}
+        data.update({field: arrays[field] for field in PRICE_FIELDS})
+        return pd.DataFrame(data, columns=PRICE_COLUMNS, copy=False)
+
+    # --- 写入 ---
+
+    def write(self, ticker: str, df: pd.DataFrame):
+        """合并写入 (同日期以新数据为准)，整文件原子替换"""
+        if df.empty:
+            return
+        new_block = np.vstack([_to_days(df["date"])] + [
+            pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=np.float64) for field in PRICE_FIELDS
+        ])
+
+        with self._lock:
+            old = self._load(ticker)
+            if old is not None and old.shape[1]:
+                merged = np.hstack([np.asarray(old), new_block])
+            else:
+                merged = new_block
+            # 按日期稳定排序后去重，保留最后出现的一条 (即新数据)
+            order = np.argsort(merged[0], kind="stable")
+            merged = merged[:, order]
+            keep = np.ones(merged.shape[1], dtype=bool)
+            keep[:-1] = merged[0, 1:] != merged[0, :-1]
+            merged = np.ascontiguousarray(merged[:, keep])
+
+            path = self._path(ticker)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".npy", dir=str(self.root))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, merged)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._maps.pop(ticker, None)
+
+    def delete(self, ticker: str):
+        with self._lock:
+            self._maps.pop(ticker, None)
+            try:
+                self._path(ticker).unlink()
+            except FileNotFoundError:
+                pass
+
+    def tickers(self):
+        return sorted(p.stem for p in self.root.glob("*.npy") if not p.name.startswith(".tmp_"))
+
+    def __repr__(self) -> str:
+        return f"ColumnarPriceStore({self.root})"
+
+
+_stores: Dict[str, ColumnarPriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_price_store(root: Optional[str]) -> Optional[ColumnarPriceStore]:
+    """root 为空时返回 None (不启用列式后端)。同一目录在进程内共享一个实例 (复用内存映射)"""
+    if not root:
+        return None
+    key = str(Path(root).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ColumnarPriceStore(key)
+            logger.info(f"🗃️ Columnar price store enabled at {store.root}")
+    return store
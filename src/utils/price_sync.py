@@ -0,0 +1,217 @@
+"""
+AlphaEar 全市场日线同步任务
+
+把 stock_list 中全部 A 股 / 港股的 stock_prices 批量补齐到最新，避免在 Agent 分析时
+逐只股票同步行情：
+
+1. 按 price_sync_state 过滤出已是最新的股票 (中断后重跑自动跳过已完成部分)
+2. 东方财富列表接口一次返回全市场最新日线：本地最后 (不复权) 收盘价 == 昨收 的股票
+   (中间没有缺口也没有除权) 直接用快照补最后一根 K 线，不再逐只请求
+3. 其余股票用有界线程池 + 按主机限速并发增量同步 (StockTools._collect_delta)
+4. 结果按批合并写入 (行情与已同步区间同一事务)，进度记录在 price_sync_jobs
+
+- PRICE_SYNC_WORKERS / PRICE_SYNC_HOST_RATE / PRICE_SYNC_BATCH_SIZE / PRICE_SYNC_LOOKBACK_DAYS
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from loguru import logger
+
+from utils.database_manager import DatabaseManager
+from utils.http_client import async_http
+from utils.rate_limit import host_limits
+from utils.stock_tools import StockAPIDirect, StockTools, EM_KLINE_HOST, TENCENT_KLINE_HOST
+from utils.trading_calendar import get_calendar, market_of
+
+SYNC_WORKERS = int(os.getenv("PRICE_SYNC_WORKERS", "8"))
+SYNC_HOST_RATE = float(os.getenv("PRICE_SYNC_HOST_RATE", "5"))  # 每主机每秒请求数
+SYNC_BATCH_SIZE = int(os.getenv("PRICE_SYNC_BATCH_SIZE", "200"))
+SYNC_LOOKBACK_DAYS = int(os.getenv("PRICE_SYNC_LOOKBACK_DAYS", "90"))
+
+
+class PriceSyncJob:
+    """全市场日线同步任务"""
+
+    def __init__(self, db: DatabaseManager, tools: Optional[StockTools] = None,
+                 workers: int = SYNC_WORKERS, host_rate: float = SYNC_HOST_RATE,
+                 batch_size: int = SYNC_BATCH_SIZE, use_snapshot: bool = True):
+        self.db = db
+        self.tools = tools or StockTools(db, auto_update=False)
+        self.workers = max(1, workers)
+        self.host_rate = host_rate
+        self.batch_size = max(1, batch_size)
+        self.use_snapshot = use_snapshot
+
+    def run(self, tickers: Optional[List[str]] = None, start_date: Optional[str] = None,
+            end_date: Optional[str] = None, resume: bool = False, job_id: Optional[str] = None,
+            progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """执行一次同步。
+
+        Args:
+            tickers: 股票代码列表，默认 stock_list 中的全部股票
+            start_date / end_date: 日期范围，默认最近 PRICE_SYNC_LOOKBACK_DAYS 天至今天
+            resume: 续跑最近一次未完成的任务 (沿用其日期范围与 job_id)
+            progress_callback: 每批写入后回调当前进度
+
+        Returns:
+            同步报告 (数量统计 / 写入行数 / 耗时 / 吞吐 tickers_per_min)：fresh 已是最新、from_snapshot
+            快照补齐、synced 拉到新 K 线、empty 数据源区间内无 K 线 (停牌 / 退市，同样记入已同步区间)、
+            failed 拉取失败 (下次重试)
+        """
+        now = datetime.now()
+        job = self.db.get_price_sync_job(unfinished=True) if resume else None
+        if job:
+            job_id, start_date, end_date = job["job_id"], job["start_date"], job["end_date"]
+            logger.info(f"🔁 Resuming price sync job {job_id} ({start_date} ~ {end_date})")
+        else:
+            end_date = end_date or now.strftime('%Y-%m-%d')
+            start_date = start_date or (now - timedelta(days=SYNC_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
+            job_id = job_id or f"sync_{now.strftime('%Y%m%d_%H%M%S')}"
+
+        if tickers is None:
+            if self.db.count_stock_list() == 0:
+                self.tools._check_and_update_stock_list()
+            tickers = self.db.list_stock_codes()
+        tickers = list(dict.fromkeys(filter(None, (StockTools._clean_ticker(str(t), warn=False)[0] for t in tickers))))
+
+        if job:
+            self.db.update_price_sync_job(job_id, status="running", total=len(tickers), error=None)
+        else:
+            self.db.create_price_sync_job(job_id, start_date, end_date, len(tickers))
+
+        for host in (EM_KLINE_HOST, TENCENT_KLINE_HOST):
+            host_limits.set_rate(host, self.host_rate)
+
+        report = {"job_id": job_id, "start_date": start_date, "end_date": end_date, "total": len(tickers),
+                  "fresh": 0, "from_snapshot": 0, "synced": 0, "empty": 0, "failed": 0, "rows": 0}
+        t0 = time.perf_counter()
+        try:
+            self._run(tickers, start_date, end_date, report, t0, progress_callback)
+        except BaseException as e:
+            status = "interrupted" if isinstance(e, KeyboardInterrupt) else "failed"
+            self._save_progress(report, t0, status=status, error=str(e) or type(e).__name__)
+            logger.error(f"❌ Price sync job {job_id} {status}: {e}")
+            raise
+
+        self._save_progress(report, t0, status="completed", finished_at=datetime.now().isoformat())
+        logger.info(
+            f"✅ Price sync {job_id}: {report['total']} tickers ({report['fresh']} fresh, "
+            f"{report['from_snapshot']} from snapshot, {report['synced']} synced, {report['empty']} without bars, "
+            f"{report['failed']} failed), "
+            f"{report['rows']} rows in {report['elapsed_s']}s ({report['tickers_per_min']} tickers/min)"
+        )
+        return report
+
+    def _run(self, tickers: List[str], start_date: str, end_date: str, report: Dict[str, Any],
+             t0: float, progress_callback: Optional[Callable]):
+        states = self.db.get_price_sync_state(tickers)
+        todo = [t for t in tickers
+                if StockTools._plan_sync(states.get(t), start_date, end_date, market=market_of(t))[0]]
+        report["fresh"] = len(tickers) - len(todo)
+        logger.info(f"📡 Price sync: {len(todo)}/{len(tickers)} tickers need updates")
+
+        if self.use_snapshot and todo:
+            served, deltas = self._from_snapshot(todo, states, start_date, end_date)
+            for i in range(0, len(deltas), self.batch_size):
+                report["rows"] += self.db.save_price_deltas(deltas[i:i + self.batch_size])
+            report["from_snapshot"] = len(served)
+            todo = [t for t in todo if t not in served]
+            self._save_progress(report, t0, progress_callback=progress_callback)
+
+        pending: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(todo)))) as executor:
+            futures = {
+                executor.submit(self.tools._collect_delta, t, start_date, end_date, False, states.get(t)): t
+                for t in todo
+            }
+            for future in as_completed(futures):
+                try:
+                    delta = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Price sync failed for {futures[future]}: {e}")
+                    delta = None
+                if delta:
+                    pending.append(delta)
+                else:
+                    report["failed"] += 1
+                if len(pending) >= self.batch_size:
+                    self._flush(pending, report, t0, progress_callback)
+        self._flush(pending, report, t0, progress_callback)
+
+    def _flush(self, pending: List[Dict[str, Any]], report: Dict[str, Any], t0: float,
+               progress_callback: Optional[Callable]):
+        if pending:
+            report["rows"] += self.db.save_price_deltas(pending)
+            empty = sum(1 for delta in pending if delta["df"].empty)
+            report["empty"] += empty
+            report["synced"] += len(pending) - empty
+            pending.clear()
+        self._save_progress(report, t0, progress_callback=progress_callback)
+
+    def _save_progress(self, report: Dict[str, Any], t0: float, progress_callback: Optional[Callable] = None,
+                       **fields):
+        elapsed = time.perf_counter() - t0
+        done = report["fresh"] + report["from_snapshot"] + report["synced"] + report["empty"]
+        processed = done - report["fresh"] + report["failed"]
+        report["elapsed_s"] = round(elapsed, 1)
+        report["tickers_per_min"] = round(processed / elapsed * 60, 1) if elapsed > 0 else 0.0
+        self.db.update_price_sync_job(
+            report["job_id"], total=report["total"], done=done,
+            failed=report["failed"], from_snapshot=report["from_snapshot"], rows=report["rows"], **fields
+        )
+        if progress_callback:
+            progress_callback(dict(report))
+
+    def _from_snapshot(self, todo: List[str], states: Dict[str, Dict], start_date: str,
+                       end_date: str) -> Tuple[Set[str], List[Dict[str, Any]]]:
+        """用全市场快照补齐只缺最后一根 K 线的股票。
+
+        快照日期是本地最后一根 K 线的下一个交易日、且昨收 (除权参考价) 等于本地最后的不复权收盘价
+        (当日不是除权除息日)，快照当日的开高低收即为新的一根，复权因子沿用最新的变化点。
+        快照日期晚于交易日历的 "最近应有 K 线" (盘中) 时不使用。
+        """
+        async def fetch_quotes():
+            return await asyncio.gather(StockAPIDirect.afetch_quotes_em('a'), StockAPIDirect.afetch_quotes_em('hk'))
+
+        try:
+            quotes = pd.concat(async_http.run_sync(fetch_quotes()), ignore_index=True)
+        except Exception as e:
+            logger.warning(f"⚠️ EastMoney quote snapshot failed, syncing every ticker individually: {e}")
+            return set(), []
+        if quotes.empty:
+            return set(), []
+        quotes = quotes.dropna(subset=['open', 'close', 'high', 'low', 'prev_close', 'date'])
+        quotes = quotes.drop_duplicates('code').set_index('code')
+
+        served: Set[str] = set()
+        deltas: List[Dict[str, Any]] = []
+        for ticker in todo:
+            state = states.get(ticker)
+            if not state or not state.get("last_date") or ticker not in quotes.index:
+                continue
+            market = market_of(ticker)
+            spans, reset = StockTools._plan_sync(state, start_date, end_date, market=market)
+            if reset or len(spans) != 1 or spans[0][0] != state["last_date"] or spans[0][2][1] is None:
+                continue  # 只处理 "缺尾部" 的情况 (不含盘中未收盘的 K 线)
+            q = quotes.loc[ticker]
+            bar_date, last_date, last_close = q['date'], state["last_date"], state["last_close"]
+            cal = get_calendar(market)
+            expected = min(cal.last_expected_bar().isoformat(), end_date)
+            if bar_date > expected or bar_date != cal.next_session(date.fromisoformat(last_date)).isoformat():
+                continue
+            if abs(q['prev_close'] - last_close) > abs(last_close) * StockTools.FACTOR_TOLERANCE:
+                continue
+            df = pd.DataFrame([{
+                'date': bar_date, 'open': q['open'], 'close': q['close'], 'high': q['high'],
+                'low': q['low'], 'volume': q['volume'], 'change_pct': q['change_pct'],
+            }])
+            deltas.append({"ticker": ticker, "df": df, "covered_start": state["covered_start"],
+                           "covered_end": bar_date, "reset": False, "replace": False})
+            served.add(ticker)
+        logger.info(f"📸 Quote snapshot covered {len(served)}/{len(todo)} stale tickers")
+        return served, deltas
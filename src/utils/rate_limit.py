@@ -0,0 +1,76 @@
+"""
+AlphaEar 按主机的请求限速 (令牌桶)
+
+行情数据源 (EastMoney / Tencent / Yahoo) 对高频请求会限流甚至封 IP，批量同步时
+由 host_limits 控制每个主机的请求速率。未设置速率的主机不限速。
+
+- KLINE_HOST_RATE: 默认的每主机每秒请求数 (为空或 0 不限速)，可被 set_rate 覆盖
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+DEFAULT_HOST_RATE = float(os.getenv("KLINE_HOST_RATE", "0") or 0)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数 (令牌可以透支，等待时间按排队顺序累加)"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """每个主机一个令牌桶，acquire() 在超出速率时阻塞调用线程"""
+
+    def __init__(self, default_rate: float = DEFAULT_HOST_RATE):
+        self.default_rate = default_rate
+        self._lock = threading.Lock()
+        self._rates: Dict[str, Tuple[float, float]] = {}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self.waited_s: Dict[str, float] = {}
+
+    def set_rate(self, host: str, rate: Optional[float], burst: Optional[float] = None):
+        """设置主机的每秒请求数 (None / 0 表示不限速)，burst 默认等于 rate"""
+        with self._lock:
+            self._buckets.pop(host, None)
+            if rate:
+                self._rates[host] = (rate, burst or max(1.0, rate))
+            else:
+                self._rates[host] = (0.0, 0.0)
+
+    def _bucket(self, host: str) -> Optional[_TokenBucket]:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._rates.get(host, (self.default_rate, max(1.0, self.default_rate)))
+                if not rate:
+                    return None
+                bucket = self._buckets[host] = _TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, host: str):
+        bucket = self._bucket(host)
+        if bucket is None:
+            return
+        wait_s = bucket.reserve()
+        if wait_s > 0:
+            with self._lock:
+                self.waited_s[host] = self.waited_s.get(host, 0.0) + wait_s
+            time.sleep(wait_s)
+
+
+# 进程内共享
+host_limits = HostRateLimiter()
@@ -0,0 +1,312 @@
+"""
+AlphaEar 数据保留策略 (后台清理 + 增量回收)
+
+- search_cache / search_detail: 按 TTL (创建时间)、LRU 条数上限、字节预算淘汰，两表按 query_hash 同步删除
+- daily_news.content: 按 TTL 与字节预算清空正文 (保留标题/URL 等元数据，引用与信号不受影响)
+- documents: 回收不再被 daily_news / search_detail 引用的正文 (抓取缓存按正文 TTL 保留)
+- 删除后用 PRAGMA incremental_vacuum 分小步归还空闲页，每步一个短事务，不长时间占用写锁
+
+新建的数据库默认 auto_vacuum=INCREMENTAL (见 db_pool)；已有数据库需执行一次
+scripts/db_retention.py --convert-vacuum 才能真正缩小文件，否则空闲页只会被复用。
+
+清理会删除数据，默认不在后台运行 (RETENTION_INTERVAL_S=0)：设置后也只由长期运行的入口
+(main_flow / dashboard) 通过 DatabaseManager.start_retention() 启动，脚本与一次性进程不受影响。
+"""
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+RETENTION_INTERVAL_S = int(os.getenv("RETENTION_INTERVAL_S", "0"))  # 默认关闭后台清理；>0 为间隔秒数
+_FIRST_RUN_DELAY_S = 60
+_DELETE_CHUNK = 200
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+@dataclass
+class RetentionPolicy:
+    search_ttl_days: float = _env_float("SEARCH_CACHE_RETENTION_DAYS", "7")
+    search_max_entries: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+    search_max_mb: float = _env_float("SEARCH_CACHE_MAX_MB", "200")
+    news_content_ttl_days: float = _env_float("NEWS_CONTENT_RETENTION_DAYS", "30")
+    news_content_max_mb: float = _env_float("NEWS_CONTENT_MAX_MB", "200")
+    vacuum_step_pages: int = int(os.getenv("DB_VACUUM_STEP_PAGES", "256"))
+
+    @staticmethod
+    def _cutoff(days: float) -> Optional[str]:
+        if days <= 0:
+            return None
+        return (datetime.now() - timedelta(days=days)).isoformat()
+
+
+class RetentionManager:
+    """对一个连接池执行保留策略；可单次运行，也可作为后台线程周期运行"""
+
+    def __init__(self, pool, policy: Optional[RetentionPolicy] = None):
+        self.pool = pool
+        self.policy = policy or RetentionPolicy()
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warned_vacuum = False
+
+    # --- 后台运行 ---
+
+    def start(self, interval_s: int = RETENTION_INTERVAL_S):
+        if self._thread is not None or interval_s <= 0:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval_s,), name=f"retention:{self.pool.db_path}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, interval_s: int):
+        delay = min(_FIRST_RUN_DELAY_S, interval_s)
+        while not self._stop.wait(delay):
+            if self.pool.closed:
+                return
+            try:
+                self.run_once()
+            except Exception as e:
+                if self.pool.closed:
+                    return
+                logger.error(f"Retention run failed: {e}")
+            delay = interval_s
+
+    # --- 单次运行 ---
+
+    def run_once(self) -> Dict[str, Any]:
+        """执行一次完整的保留策略，返回清理报告"""
+        with self._run_lock:
+            t0 = time.perf_counter()
+            report: Dict[str, Any] = {"started_at": datetime.now().isoformat()}
+            report.update(self._evict_search_cache())
+            report.update(self._trim_news_content())
+            report.update(self._collect_documents())
+            report.update(self._incremental_vacuum())
+            report["logical_bytes_freed"] = report["search_bytes_freed"] + report["news_content_bytes_freed"]
+            report["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            self.last_report = report
+
+        evicted = sum(report["search_evicted"].values())
+        cleared = sum(report["news_content_cleared"].values())
+        if evicted or cleared or report["bytes_reclaimed"]:
+            logger.info(
+                f"🧹 Retention: evicted {evicted} search entries, cleared {cleared} news bodies, "
+                f"freed {report['logical_bytes_freed'] / 1e6:.1f} MB of data, "
+                f"reclaimed {report['bytes_reclaimed'] / 1e6:.1f} MB on disk"
+            )
+        return report
+
+    def _evict_search_cache(self) -> Dict[str, Any]:
+        p = self.policy
+        ttl_cutoff = p._cutoff(p.search_ttl_days)
+        budget = int(p.search_max_mb * 1024 * 1024) if p.search_max_mb > 0 else None
+        started_at = datetime.now().isoformat()
+
+        with self.pool.read() as conn:
+            # 按最近访问时间升序 (最久未用在前)，附带每个查询占用的字节数
+            rows = conn.execute("""
+                SELECT c.query_hash, c.timestamp,
+                       coalesce(length(CAST(c.results AS BLOB)), 0) + coalesce(d.bytes, 0) AS bytes
+                FROM search_cache c
+                LEFT JOIN (
+                    SELECT s.query_hash, sum(coalesce(doc.size, length(CAST(s.content AS BLOB)), 0)
+                                            + coalesce(length(CAST(s.title AS BLOB)), 0)) AS bytes
+                    FROM search_detail s LEFT JOIN documents doc ON doc.doc_hash = s.content_hash
+                    GROUP BY s.query_hash
+                ) d ON d.query_hash = c.query_hash
+                ORDER BY coalesce(c.last_accessed, c.timestamp) ASC
+            """).fetchall()
+            orphans = [r[0] for r in conn.execute("""
+                SELECT DISTINCT query_hash FROM search_detail
+                WHERE query_hash NOT IN (SELECT query_hash FROM search_cache)
+            """).fetchall()]
+
+        reasons = {"ttl": 0, "lru": 0, "size": 0, "orphan": len(orphans)}
+        victims: List[str] = list(orphans)
+        freed = 0
+        survivors = []
+        for r in rows:
+            if ttl_cutoff and (r["timestamp"] or "") < ttl_cutoff:
+                victims.append(r["query_hash"])
+                reasons["ttl"] += 1
+                freed += r["bytes"]
+            else:
+                survivors.append(r)
+
+        total = sum(r["bytes"] for r in survivors)
+        over_count = len(survivors) - p.search_max_entries if p.search_max_entries > 0 else 0
+        for r in survivors:
+            if over_count > 0:
+                reasons["lru"] += 1
+                over_count -= 1
+            elif budget is not None and total > budget:
+                reasons["size"] += 1
+            else:
+                break
+            victims.append(r["query_hash"])
+            total -= r["bytes"]
+            freed += r["bytes"]
+
+        detail_rows = 0
+        for i in range(0, len(victims), _DELETE_CHUNK):
+            chunk = victims[i:i + _DELETE_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            with self.pool.write() as conn:
+                detail_rows += conn.execute(f"DELETE FROM search_detail WHERE query_hash IN ({marks})", chunk).rowcount
+                # 扫描之后被重新写入的缓存保留
+                conn.execute(f"DELETE FROM search_cache WHERE query_hash IN ({marks}) AND timestamp < ?", chunk + [started_at])
+
+        return {
+            "search_evicted": reasons,
+            "search_detail_rows_deleted": detail_rows,
+            "search_bytes_remaining": total,
+            "search_bytes_freed": freed,
+        }
+
+    def _trim_news_content(self) -> Dict[str, Any]:
+        p = self.policy
+        ttl_cutoff = p._cutoff(p.news_content_ttl_days)
+        budget = int(p.news_content_max_mb * 1024 * 1024) if p.news_content_max_mb > 0 else None
+
+        with self.pool.read() as conn:
+            # 有正文的新闻按抓取时间升序 (正文可能与其他新闻/搜索结果共享，按引用计入)
+            rows = conn.execute("""
+                SELECT n.rowid, n.crawl_time, coalesce(doc.size, length(CAST(n.content AS BLOB)), 0) AS bytes
+                FROM daily_news n
+                LEFT JOIN documents doc ON doc.doc_hash = n.content_hash
+                WHERE n.content_hash IS NOT NULL OR (n.content IS NOT NULL AND n.content != '')
+                ORDER BY n.crawl_time ASC
+            """).fetchall()
+
+        reasons = {"ttl": 0, "size": 0}
+        victims: List[int] = []
+        freed = 0
+        total = sum(r["bytes"] for r in rows)
+        for r in rows:
+            if ttl_cutoff and (r["crawl_time"] or "") < ttl_cutoff:
+                reasons["ttl"] += 1
+            elif budget is not None and total > budget:
+                reasons["size"] += 1
+            else:
+                break
+            victims.append(r["rowid"])
+            total -= r["bytes"]
+            freed += r["bytes"]
+
+        for i in range(0, len(victims), _DELETE_CHUNK):
+            chunk = victims[i:i + _DELETE_CHUNK]
+            with self.pool.write() as conn:
+                conn.execute(
+                    f"UPDATE daily_news SET content = '', content_hash = NULL WHERE rowid IN ({','.join('?' * len(chunk))})", chunk
+                )
+
+        return {
+            "news_content_cleared": reasons,
+            "news_content_bytes_remaining": total,
+            "news_content_bytes_freed": freed,
+        }
+
+    def _collect_documents(self) -> Dict[str, Any]:
+        """删除无引用的正文；带来源 URL 的抓取结果在正文 TTL 内保留，供后续查询复用"""
+        ttl_cutoff = self.policy._cutoff(self.policy.news_content_ttl_days) or ""
+        deleted = freed = 0
+        while True:
+            with self.pool.write() as conn:
+                rows = conn.execute("""
+                    SELECT doc_hash, coalesce(size, 0) FROM documents doc
+                    WHERE (url IS NULL OR created_at < ?)
+                      AND NOT EXISTS (SELECT 1 FROM daily_news WHERE content_hash = doc.doc_hash)
+                      AND NOT EXISTS (SELECT 1 FROM search_detail WHERE content_hash = doc.doc_hash)
+                    LIMIT ?
+                """, (ttl_cutoff, _DELETE_CHUNK)).fetchall()
+                if rows:
+                    conn.executemany("DELETE FROM documents WHERE doc_hash = ?", [(r[0],) for r in rows])
+            deleted += len(rows)
+            freed += sum(r[1] for r in rows)
+            if len(rows) < _DELETE_CHUNK:
+                break
+
+        return {"documents_deleted": deleted, "documents_bytes_freed": freed}
+
+    def _incremental_vacuum(self) -> Dict[str, Any]:
+        with self.pool.read() as conn:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+        def page_counts():
+            with self.pool.read() as conn:
+                return (conn.execute("PRAGMA page_count").fetchone()[0],
+                        conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+        pages_before, free = page_counts()
+        if mode == 2 and free > 0:
+            step = max(1, self.policy.vacuum_step_pages)
+            while free > 0:
+                with self.pool.write() as conn:
+                    conn.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+                _, remaining = page_counts()
+                if remaining >= free:
+                    break
+                free = remaining
+                time.sleep(0)  # 让出写锁给排队中的写入
+        elif mode != 2 and free > 0 and not self._warned_vacuum:
+            self._warned_vacuum = True
+            logger.warning(
+                f"⚠️ {self.pool.db_path} is not in auto_vacuum=INCREMENTAL mode; "
+                f"{free * page_size / 1e6:.1f} MB of free pages will be reused but not returned to the OS. "
+                "Run scripts/db_retention.py --convert-vacuum once to enable reclamation."
+            )
+        pages_after, free_after = page_counts()
+
+        return {
+            "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(mode, str(mode)),
+            "bytes_reclaimed": max(0, pages_before - pages_after) * page_size,
+            "freelist_bytes": free_after * page_size,
+            "db_bytes": pages_after * page_size,
+        }
+
+
+def convert_to_incremental_vacuum(pool) -> int:
+    """把已有数据库切换为 auto_vacuum=INCREMENTAL (需要一次完整 VACUUM，期间阻塞写入)。
+
+    Returns:
+        VACUUM 回收的字节数
+    """
+    with pool.exclusive() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        before = conn.execute("PRAGMA page_count").fetchone()[0]
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        after = conn.execute("PRAGMA page_count").fetchone()[0]
+    logger.info(f"🧹 {pool.db_path} converted to auto_vacuum=INCREMENTAL ({(before - after) * page_size / 1e6:.1f} MB reclaimed)")
+    return max(0, before - after) * page_size
+
+
+# --- 每个连接池一个后台清理器 ---
+
+_managers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_managers_lock = threading.Lock()
+
+
+def get_retention(pool, policy: Optional[RetentionPolicy] = None) -> RetentionManager:
+    """获取连接池对应的 RetentionManager (不启动后台清理，由调用方决定是否 start)"""
+    with _managers_lock:
+        manager = _managers.get(pool)
+        if manager is None:
+            manager = RetentionManager(pool, policy)
+            _managers[pool] = manager
+        return manager
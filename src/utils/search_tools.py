@@ -5,6 +5,7 @@ import re
 import requests
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Optional, Any
 from agno.tools.duckduckgo import DuckDuckGoTools
 from agno.tools.baidusearch import BaiduSearchTools
@@ -13,17 +14,23 @@ from loguru import logger
 from datetime import datetime
 from utils.database_manager import DatabaseManager
 from utils.content_extractor import ContentExtractor
+from utils.http_client import http
 from utils.llm.factory import get_model
 from utils.hybrid_search import LocalNewsSearch
 
 # 默认搜索缓存 TTL（秒），可通过环境变量覆盖
 DEFAULT_SEARCH_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))  # 默认 1 小时
+# search_list 正文抓取并发数与整体期限（秒），到期未完成的结果保留搜索摘要
+SEARCH_ENRICH_WORKERS = int(os.getenv("SEARCH_ENRICH_WORKERS", "5"))
+SEARCH_ENRICH_DEADLINE_S = float(os.getenv("SEARCH_ENRICH_DEADLINE_S", "30"))
+# 整体期限中留给情绪计算的时间 (最多占一半)，正文抓取在此之前结束
+SEARCH_SENTIMENT_RESERVE_S = float(os.getenv("SEARCH_SENTIMENT_RESERVE_S", "5"))
 
 
 class JinaSearchEngine:
     """Jina Search API 封装 - 使用 s.jina.ai 进行网络搜索"""
     
-    JINA_SEARCH_URL = "https://s.jina.ai/"
+    JINA_SEARCH_URL = os.getenv("JINA_SEARCH_URL", "https://s.jina.ai/")
     
     # 速率限制配置
     _rate_limit_no_key = 10  # 无 key 时每分钟最大请求数
@@ -99,7 +106,7 @@ class JinaSearchEngine:
             encoded_query = urllib.parse.quote(query)
             url = f"{self.JINA_SEARCH_URL}{encoded_query}"
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = http.get(url, headers=headers, timeout=30)
             
             if response.status_code == 429:
                 logger.warning("⚠️ Jina Search rate limited (429), waiting 30s...")
@@ -176,6 +183,10 @@ class SearchTools:
         
         # 确定默认搜索引擎
         self._default_engine = "jina" if self._jina_enabled else "ddg"
+        
+        # 情绪分析工具按需加载 (BERT 加载较慢，多个线程并发搜索时只加载一次)
+        self.sentiment_tool = None
+        self._sentiment_lock = threading.Lock()
 
     def _generate_hash(self, query: str, engine: str, max_results: int) -> str:
         return hashlib.md5(f"{engine}:{query}:{max_results}".encode()).hexdigest()
@@ -271,7 +282,8 @@ class SearchTools:
             logger.error(f"❌ Search failed for {query}: {e}")
             return f"Error occurred during search: {str(e)}"
 
-    def search_list(self, query: str, engine: str = None, max_results: int = 5, ttl: Optional[int] = None, enrich: bool = True) -> List[Dict]:
+    def search_list(self, query: str, engine: str = None, max_results: int = 5, ttl: Optional[int] = None, enrich: bool = True,
+                    deadline_s: Optional[float] = None) -> List[Dict]:
         """
         执行搜索并返回结构化列表 (List[Dict])。
         Dict 包含: title, href (or url), body (or snippet)
@@ -279,6 +291,7 @@ class SearchTools:
         Args:
             engine: 搜索引擎，默认使用配置的默认引擎（Jina 优先）
             enrich: 是否抓取正文内容 (默认 True)
+            deadline_s: 正文抓取 + 情绪计算的整体期限，默认 SEARCH_ENRICH_DEADLINE_S
         """
         # 使用默认引擎
         if engine is None:
@@ -447,54 +460,15 @@ class SearchTools:
             # 注意：如果使用 Jina Search，内容已经是 LLM 友好格式，可选择跳过 enrichment
             skip_content_enrichment = (engine == "jina")
             
+            complete = True
             if enrich and normalized_results:
-                logger.info(f"🕸️ Enriching {len(normalized_results)} search results with Jina & Sentiment...")
-                extractor = ContentExtractor()
-                
-                # Lazy load sentiment tool
-                if not hasattr(self, 'sentiment_tool') or self.sentiment_tool is None:
-                    from utils.sentiment_tools import SentimentTools
-                    self.sentiment_tool = SentimentTools(self.db)
-                
-                for item in normalized_results:
-                    if item.get("url"):
-                        try:
-                            # 如果是 Jina Search，内容已经足够好，跳过额外抓取
-                            if skip_content_enrichment and item.get("content") and len(item.get("content", "")) > 100:
-                                full_content = item["content"]
-                            else:
-                                # Use Jina Reader to get full content
-                                full_content = extractor.extract_with_jina(item["url"], timeout=60)
-                            
-                            if full_content and len(full_content) > 100:
-                                item["content"] = full_content
-                                
-                                # Calculate sentiment
-                                # Use title + snippet of content for efficiency
-                                text_to_analyze = f"{item['title']} {full_content[:500]}"
-                                sent_result = self.sentiment_tool.analyze_sentiment(text_to_analyze)  # Using self.sentiment_tool
-                                score = sent_result.get('score', 0.0)
-                                item["sentiment_score"] = float(score)
-                                
-                                logger.info(f"  ✅ Enriched: {item['title'][:20]}... (Sentiment: {score:.2f})")
-                            else:
-                                # Fallback: Use snippet for sentiment
-                                logger.info(f"  ⚠️ Content short/failed for {item['url']}, using snippet for sentiment.")
-                                text_to_analyze = f"{item['title']} {item['content']}" # content is snippet here
-                                sent_result = self.sentiment_tool.analyze_sentiment(text_to_analyze)
-                                score = sent_result.get('score', 0.0)
-                                item["sentiment_score"] = float(score)
-
-                        except Exception as e:
-                             # Fallback: Use snippet for sentiment on error
-                            logger.warning(f"Failed to enrich {item['url']}: {e}. Using snippet.")
-                            text_to_analyze = f"{item['title']} {item['content']}"
-                            sent_result = self.sentiment_tool.analyze_sentiment(text_to_analyze)
-                            score = sent_result.get('score', 0.0)
-                            item["sentiment_score"] = float(score)
+                complete = self._enrich_results(
+                    normalized_results, skip_content_enrichment,
+                    deadline_s if deadline_s is not None else SEARCH_ENRICH_DEADLINE_S,
+                )
             
-            # 缓存结果 list
-            if normalized_results:
+            # 缓存结果 list (到期的部分结果不缓存，下次查询重新抓取；已抓到的正文在文档库中复用)
+            if normalized_results and complete:
                 # Pass list directly, DB manager will handle JSON dump for main cache and populate search_details
                 # Only cache if NOT from local news reuse (though this logic path is for fresh search)
                 self.db.save_search_cache(query_hash, query, engine, normalized_results)
@@ -506,19 +480,113 @@ class SearchTools:
             if engine == "jina":
                 logger.warning(f"⚠️ Jina search_list failed, falling back to ddg: {query} ({e})")
                 try:
-                    return self.search_list(query, engine="ddg", max_results=max_results, ttl=ttl, enrich=enrich)
+                    return self.search_list(query, engine="ddg", max_results=max_results, ttl=ttl, enrich=enrich, deadline_s=deadline_s)
                 except Exception as e2:
                     logger.error(f"❌ DDG fallback (search_list) also failed for {query}: {e2}")
             elif engine == "ddg":
                 logger.warning(f"⚠️ DDG search_list failed, falling back to baidu: {query} ({e})")
                 try:
-                    return self.search_list(query, engine="baidu", max_results=max_results, ttl=ttl, enrich=enrich)
+                    return self.search_list(query, engine="baidu", max_results=max_results, ttl=ttl, enrich=enrich, deadline_s=deadline_s)
                 except Exception as e2:
                     logger.error(f"❌ Baidu fallback (search_list) also failed for {query}: {e2}")
 
             logger.error(f"❌ Structured search failed for {query}: {e}")
             return []
 
+    def _get_sentiment_tool(self):
+        with self._sentiment_lock:
+            if self.sentiment_tool is None:
+                from utils.sentiment_tools import SentimentTools
+                self.sentiment_tool = SentimentTools(self.db)
+            return self.sentiment_tool
+
+    def _enrich_results(self, items: List[Dict], use_search_content: bool, deadline_s: float) -> bool:
+        """
+        并发抓取正文 + 批量计算情绪 (原地更新 items)。
+        
+        正文抓取并发进行 (最多 SEARCH_ENRICH_WORKERS 个)，发起时间由 ContentExtractor 的限速预约；
+        抓取与情绪计算合计不超过 deadline_s 秒：抓取在期限前 SEARCH_SENTIMENT_RESERVE_S 秒结束，
+        未抓完的条目保留搜索摘要，情绪按摘要计算；情绪计算在剩余期限内完成，未完成的条目记为中性 (0.0)。
+        每条结果的 meta_data["enrich"] 记录状态与耗时 (毫秒)：
+        queue_ms 排队时间、extract_ms 抓取时间 (含限速等待)、ready_ms 从阶段开始到正文就绪，
+        sentiment 为情绪计算状态 (ok / deadline)。
+        
+        Returns:
+            全部条目的抓取与情绪计算都在期限内完成时为 True
+        """
+        logger.info(f"🕸️ Enriching {len(items)} search results with Jina & Sentiment (deadline {deadline_s:g}s)...")
+        t0 = time.monotonic()
+        deadline = t0 + deadline_s
+        extract_deadline = deadline - min(SEARCH_SENTIMENT_RESERVE_S, deadline_s / 2)
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        def extract(url: str):
+            started = time.monotonic()
+            content = ContentExtractor.extract_cached(url, self.db, timeout=60, deadline=extract_deadline)
+            return content, started, time.monotonic()
+
+        targets = [item for item in items if item.get("url")]
+        futures = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, SEARCH_ENRICH_WORKERS), thread_name_prefix="search-enrich")
+        for item in targets:
+            # 如果是 Jina Search，内容已经足够好，跳过额外抓取
+            if use_search_content and len(item.get("content") or "") > 100:
+                item.setdefault("meta_data", {})["enrich"] = {"status": "search_content"}
+            else:
+                futures[executor.submit(extract, item["url"])] = item
+        # 抓取期间加载情绪模型 (首次调用时 BERT 加载较慢)
+        sentiment_tool = self._get_sentiment_tool()
+        done, pending = wait(futures, timeout=max(0.0, extract_deadline - time.monotonic()))
+        # 不等待未完成的抓取：其请求超时不超过剩余期限，很快自行结束
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future, item in futures.items():
+            info = {"status": "deadline"}
+            if future in done:
+                try:
+                    content, started, finished = future.result()
+                except Exception as e:
+                    logger.warning(f"Failed to enrich {item['url']}: {e}. Using snippet.")
+                    info = {"status": "failed"}
+                else:
+                    info = {
+                        "status": "ok" if content and len(content) > 100 else "no_content",
+                        "queue_ms": ms(started - t0),
+                        "extract_ms": ms(finished - started),
+                        "ready_ms": ms(finished - t0),
+                    }
+                    if info["status"] == "ok":
+                        item["content"] = content
+                    else:
+                        logger.info(f"  ⚠️ Content short/failed for {item['url']}, using snippet for sentiment.")
+            item.setdefault("meta_data", {})["enrich"] = info
+        if pending:
+            logger.warning(f"⏱️ Enrichment deadline ({deadline_s:g}s) hit: {len(pending)}/{len(items)} results keep their snippets")
+
+        # Use title + snippet of content for efficiency
+        t_sentiment = time.monotonic()
+        texts = [f"{item['title']} {(item.get('content') or '')[:500]}" for item in targets]
+        results = sentiment_tool.analyze_sentiment_many(texts, timeout=max(0.0, deadline - time.monotonic()))
+        missed = 0
+        for item, result in zip(targets, results):
+            info = item.setdefault("meta_data", {}).setdefault("enrich", {})
+            if result is None:
+                missed += 1
+                item["sentiment_score"] = 0.0
+                info["sentiment"] = "deadline"
+            else:
+                item["sentiment_score"] = float(result.get("score", 0.0))
+                info["sentiment"] = "ok"
+            logger.info(f"  ✅ Enriched: {item['title'][:20]}... (Sentiment: {item['sentiment_score']:.2f}, "
+                        f"{info.get('status')}/{info['sentiment']})")
+        if missed:
+            logger.warning(f"⏱️ Enrichment deadline ({deadline_s:g}s) hit: {missed}/{len(targets)} results scored neutral")
+        logger.info(f"🕸️ Enrichment done in {time.monotonic() - t0:.1f}s "
+                    f"(sentiment {time.monotonic() - t_sentiment:.1f}s)")
+        return not pending and not missed
+
     def _evaluate_cache_relevance(self, current_query: str, candidates: List[Dict]) -> Dict:
         """
         使用 LLM 评估缓存候选是否足以回答当前问题。
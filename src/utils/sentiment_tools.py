@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, List, Union, Optional
 import json
 from loguru import logger
@@ -112,6 +113,40 @@ class SentimentTools:
             results = self.analyze_sentiment_bert([text])
             return results[0] if results else {"score": 0.0, "label": "error"}
 
+    def analyze_sentiment_many(self, texts: List[str], max_workers: int = 4,
+                               timeout: Optional[float] = None) -> List[Optional[Dict]]:
+        """
+        批量版 analyze_sentiment：BERT 一次批量推理，LLM 模式并发调用。
+        
+        Args:
+            texts: 需要分析的文本列表。
+            max_workers: LLM 模式的最大并发数。
+            timeout: 整体期限 (秒)，None 为不限；到期未完成的条目返回 None，
+                已发起的调用在后台自行结束，未开始的直接取消。
+        
+        Returns:
+            与输入列表等长、顺序一致的分析结果列表 (超时的条目为 None)。
+        """
+        if not texts:
+            return []
+        if self.mode == "llm" or (self.mode == "auto" and not self.bert_pipeline):
+            executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(texts))),
+                                          thread_name_prefix="sentiment")
+            futures = [executor.submit(self.analyze_sentiment_llm, text) for text in texts]
+        elif timeout is None:
+            return self.analyze_sentiment_bert(texts)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment")
+            futures = [executor.submit(self.analyze_sentiment_bert, texts)]
+
+        wait(futures, timeout=None if timeout is None else max(0.0, timeout))
+        executor.shutdown(wait=False, cancel_futures=True)
+        results = [f.result() if f.done() and not f.cancelled() else None for f in futures]
+        if len(futures) == len(texts):
+            return results
+        # BERT 批量推理：整批完成或整批超时
+        return results[0] if results[0] is not None else [None] * len(texts)
+
     def analyze_sentiment_llm(self, text: str) -> Dict[str, Union[float, str]]:
         """
         使用 LLM 进行深度情绪分析，可获得详细的分析理由。
@@ -201,8 +236,7 @@ class SentimentTools:
         # 决定使用哪种方法
         should_use_bert = use_bert if use_bert is not None else (self.bert_pipeline is not None and self.mode != "llm")
 
-        updated_count = 0
-        cursor = self.db.conn.cursor()
+        updates = []
         
         if should_use_bert and self.bert_pipeline:
             logger.info(f"🚀 Using BERT for batch analysis of {len(to_analyze)} items...")
@@ -210,22 +244,11 @@ class SentimentTools:
             results = self.analyze_sentiment_bert(titles)
             
             for item, analysis in zip(to_analyze, results):
-                cursor.execute("""
-                    UPDATE daily_news 
-                    SET sentiment_score = ?, meta_data = json_set(COALESCE(meta_data, '{}'), '$.sentiment_reason', ?)
-                    WHERE id = ?
-                """, (analysis['score'], analysis['reason'], item['id']))
-                updated_count += 1
+                updates.append({"id": item['id'], "score": analysis['score'], "reason": analysis['reason']})
         else:
             logger.info(f"🚶 Using LLM for analysis of {len(to_analyze)} items...")
             for item in to_analyze:
                 analysis = self.analyze_sentiment_llm(item['title'])
-                cursor.execute("""
-                    UPDATE daily_news 
-                    SET sentiment_score = ?, meta_data = json_set(COALESCE(meta_data, '{}'), '$.sentiment_reason', ?)
-                    WHERE id = ?
-                """, (analysis.get('score', 0.0), analysis.get('reason', ''), item['id']))
-                updated_count += 1
-        
-        self.db.conn.commit()
-        return updated_count
+                updates.append({"id": item['id'], "score": analysis.get('score', 0.0), "reason": analysis.get('reason', '')})
+        
+        return self.db.update_news_sentiment(updates)
@@ -1,15 +1,30 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, List, Dict, Optional, Tuple, Union
 import akshare as ak
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import re
 import sqlite3
 import json
-import requests as _requests
-from requests.exceptions import RequestException
+from urllib.parse import urlparse
 from loguru import logger
 from utils.database_manager import DatabaseManager
+from utils.circuit_breaker import CircuitOpenError
+from utils.hedged_fetch import HedgedFetcher
+from utils.http_client import NETWORK_ERRORS, async_http
+from utils.price_cache import MISSING, PriceFrameCache
+from utils.rate_limit import host_limits
+from utils.ticker_resolver import get_resolver
+from utils.trading_calendar import get_calendar, market_of
+
+# K 线多数据源对冲请求 (进程内共享，延迟统计驱动对冲时机)
+_KLINE_FETCHER = HedgedFetcher("kline")
+# 进程内行情缓存 (所有 StockTools 实例共享，行情写入时由 DatabaseManager 通知失效)
+_PRICE_CACHE = PriceFrameCache()
 
 
 class StockAPIDirect:
@@ -19,14 +34,18 @@ class StockAPIDirect:
     1. EastMoney (东方财富)
     2. Tencent (腾讯财经)
     
-    均使用 requests 直连，无需 API Key，增加浏览器 Headers 以应对 GitHub Actions 等环境的屏蔽。
+    均通过共享 HTTP 客户端 (utils.http_client) 直连，无需 API Key，增加浏览器 Headers 以应对 GitHub Actions 等环境的屏蔽。
+    afetch_* 为 asyncio 原生实现 (每主机并发受限)，同名的同步方法在后台事件循环上执行它们，供线程池中的调用方使用。
     """
     
-    EM_KLINE_URL = "https://push2his.eastmoney.com/api/qt/stock/kline/get"
-    EM_LIST_URL = "https://push2.eastmoney.com/api/qt/clist/get"
+    # 接口地址可经同名环境变量覆盖 (如指向 scripts/replay_server.py 做离线压测)
+    EM_KLINE_URL = os.getenv("EM_KLINE_URL", "https://push2his.eastmoney.com/api/qt/stock/kline/get")
+    EM_LIST_URL = os.getenv("EM_LIST_URL", "https://push2.eastmoney.com/api/qt/clist/get")
     EM_UT = "fa5fd1943c7b386f172d6893dbfba10b"
     
-    TENCENT_KLINE_URL = "http://web.ifzq.gtimg.cn/appstock/app/fqkline/get"
+    TENCENT_KLINE_URL = os.getenv("TENCENT_KLINE_URL", "http://web.ifzq.gtimg.cn/appstock/app/fqkline/get")
+    # 复权方式 -> 东方财富 fqt 参数
+    EM_FQT = {"": "0", "qfq": "1", "hfq": "2"}
     
     DEFAULT_HEADERS = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -52,18 +71,22 @@ class StockAPIDirect:
         return f"sz{ticker}"
 
     @classmethod
-    def fetch_kline_eastmoney(cls, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """从东方财富获取 K 线数据 (YYYYMMDD)"""
+    async def afetch_kline_eastmoney(cls, ticker: str, start_date: str, end_date: str, adjust: str = "qfq") -> pd.DataFrame:
+        """从东方财富获取 K 线数据 (YYYYMMDD)。adjust: "qfq" / "hfq" / "" (不复权)"""
         params = {
             'secid': cls._get_em_secid(ticker),
             'fields1': 'f1,f2,f3,f4,f5,f6',
             'fields2': 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61',
-            'klt': '101', 'fqt': '1', 'beg': start_date, 'end': end_date,
+            'klt': '101', 'fqt': cls.EM_FQT[adjust], 'beg': start_date, 'end': end_date,
             'lmt': '1000', 'ut': cls.EM_UT,
         }
-        resp = _requests.get(cls.EM_KLINE_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=12)
+        resp = await async_http.get(cls.EM_KLINE_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=12)
         resp.raise_for_status()
-        data = resp.json().get('data')
+        return cls._parse_em_klines(resp.json())
+
+    @staticmethod
+    def _parse_em_klines(payload: Dict) -> pd.DataFrame:
+        data = payload.get('data')
         if not data or not data.get('klines'):
             return pd.DataFrame()
         
@@ -74,21 +97,25 @@ class StockAPIDirect:
         return df
 
     @classmethod
-    def fetch_kline_tencent(cls, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """从腾讯财经获取 K 线数据 (YYYY-MM-DD)"""
+    def fetch_kline_eastmoney(cls, ticker: str, start_date: str, end_date: str, adjust: str = "qfq") -> pd.DataFrame:
+        """afetch_kline_eastmoney 的同步版本"""
+        return async_http.run_sync(cls.afetch_kline_eastmoney(ticker, start_date, end_date, adjust))
+
+    @classmethod
+    async def _afetch_tencent_day(cls, ticker: str, start_date: str, end_date: str, adjust: str) -> pd.DataFrame:
         symbol = cls._get_tencent_symbol(ticker)
         params = {
             '_var': 'kline_day',
-            'param': f"{symbol},day,{start_date},{end_date},640,qfq"
+            'param': ",".join([symbol, "day", start_date, end_date, "640"] + ([adjust] if adjust else []))
         }
-        resp = _requests.get(cls.TENCENT_KLINE_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=12)
+        resp = await async_http.get(cls.TENCENT_KLINE_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=12)
         resp.raise_for_status()
         
         content = resp.text.replace('kline_day=', '')
         data = json.loads(content)
         
         symbol_data = data.get('data', {}).get(symbol, {})
-        klines = symbol_data.get('qfqday', symbol_data.get('day', []))
+        klines = symbol_data.get(f'{adjust}day', symbol_data.get('day', []))
         
         if not klines:
             return pd.DataFrame()
@@ -97,40 +124,138 @@ class StockAPIDirect:
         df = pd.DataFrame(klines)
         df = df.iloc[:, :6]
         df.columns = ['日期', '开盘', '收盘', '最高', '最低', '成交量']
+        df['收盘'] = pd.to_numeric(df['收盘'])
+        return df
+
+    @classmethod
+    async def afetch_kline_tencent(cls, ticker: str, start_date: str, end_date: str, adjust: str = "qfq") -> pd.DataFrame:
+        """从腾讯财经获取 K 线数据 (YYYY-MM-DD)。adjust: "qfq" / "hfq" / "" (不复权)"""
+        if adjust:
+            df, hfq = await cls._afetch_tencent_day(ticker, start_date, end_date, adjust), None
+        else:
+            # 不复权价的 pct_change 在除权日失真：同时取后复权 K 线，用于还原除权日的涨跌幅
+            df, hfq = await asyncio.gather(cls._afetch_tencent_day(ticker, start_date, end_date, ""),
+                                           cls._afetch_tencent_day(ticker, start_date, end_date, "hfq"))
+        if df.empty:
+            return df
         
         # 补全 change_pct (腾讯不直接提供历史涨跌幅)
-        df['收盘'] = pd.to_numeric(df['收盘'])
-        df['涨跌幅'] = df['收盘'].pct_change() * 100
-        df['涨跌幅'] = df['涨跌幅'].fillna(0)
+        close = df['收盘']
+        pct = close.pct_change()
+        if hfq is not None and not hfq.empty:
+            # 后复权价与不复权价之比的跳变即除权日，按东方财富的口径 (相对除权参考价) 改写当日涨跌幅，
+            # 供增量同步推算复权因子
+            hfq_close = df[['日期']].merge(hfq[['日期', '收盘']], on='日期', how='left')['收盘']
+            ratio = hfq_close / close
+            jump = ratio / ratio.shift()
+            # 两边价格都只保留到分，比值本身有 ~0.01/价格 的舍入误差
+            event = (jump - 1).abs() > 0.011 / close + 0.011 / close.shift()
+            pct[event] = close[event] * jump[event] / close.shift()[event] - 1
+        df['涨跌幅'] = (pct * 100).fillna(0)
         
         return df
 
     @classmethod
-    def fetch_stock_list_em(cls, market: str = 'a') -> pd.DataFrame:
-        """从东方财富获取股票列表"""
+    def fetch_kline_tencent(cls, ticker: str, start_date: str, end_date: str, adjust: str = "qfq") -> pd.DataFrame:
+        """afetch_kline_tencent 的同步版本"""
+        return async_http.run_sync(cls.afetch_kline_tencent(ticker, start_date, end_date, adjust))
+
+    # 东方财富列表接口字段 -> 列名 (f124 为行情更新时间戳)
+    EM_QUOTE_FIELDS = {
+        'f12': 'code', 'f14': 'name', 'f17': 'open', 'f2': 'close', 'f15': 'high', 'f16': 'low',
+        'f5': 'volume', 'f3': 'change_pct', 'f18': 'prev_close', 'f124': 'timestamp',
+    }
+    EM_PAGE_SIZE = 5000
+
+    @classmethod
+    async def _afetch_clist_em(cls, market: str, fields: List[str]) -> List[Dict]:
+        """分页拉取列表接口：第一页得到 total 后，其余页并发请求 (并发数受 async_http 每主机上限约束)"""
         fs = 'm:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23' if market == 'a' else 'm:128+t:3,m:128+t:4,m:128+t:1,m:128+t:2'
-        all_items = []
-        page = 1
-        while True:
+
+        async def fetch_page(page: int) -> Dict:
             params = {
-                'pn': str(page), 'pz': '5000', 'po': '1', 'np': '1',
+                'pn': str(page), 'pz': str(cls.EM_PAGE_SIZE), 'po': '1', 'np': '1',
                 'fltt': '2', 'invt': '2', 'fid': 'f12',
-                'fs': fs, 'fields': 'f12,f14', 'ut': cls.EM_UT,
+                'fs': fs, 'fields': ','.join(fields), 'ut': cls.EM_UT,
             }
-            resp = _requests.get(cls.EM_LIST_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=15)
+            resp = await async_http.get(cls.EM_LIST_URL, params=params, headers=cls.DEFAULT_HEADERS, timeout=15)
             resp.raise_for_status()
-            data = resp.json().get('data', {})
-            diff = data.get('diff', [])
-            if not diff: break
-            for item in diff:
-                all_items.append({'code': item.get('f12', ''), 'name': item.get('f14', '')})
-            if page * 5000 >= data.get('total', 0): break
-            page += 1
-        return pd.DataFrame(all_items)
+            return resp.json().get('data') or {}
+
+        first = await fetch_page(1)
+        all_items = list(first.get('diff') or [])
+        total = first.get('total', 0)
+        if not all_items or len(all_items) >= total:
+            return all_items
+        # 服务端可能把 pz 截断为更小的页，按第一页的实际条数计算页数
+        pages = -(-total // len(all_items))
+        for data in await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1))):
+            all_items.extend(data.get('diff') or [])
+        return all_items
+
+    @classmethod
+    async def afetch_stock_list_em(cls, market: str = 'a') -> pd.DataFrame:
+        """从东方财富获取股票列表"""
+        items = await cls._afetch_clist_em(market, ['f12', 'f14'])
+        return pd.DataFrame([{'code': item.get('f12', ''), 'name': item.get('f14', '')} for item in items])
+
+    @classmethod
+    def fetch_stock_list_em(cls, market: str = 'a') -> pd.DataFrame:
+        """afetch_stock_list_em 的同步版本"""
+        return async_http.run_sync(cls.afetch_stock_list_em(market))
+
+    @classmethod
+    async def afetch_quotes_em(cls, market: str = 'a') -> pd.DataFrame:
+        """从东方财富列表接口一次性获取全市场最新日线 (开高低收/成交量/昨收)。
+
+        停牌或无成交的股票价格字段为 NaN；date 由行情更新时间戳换算。
+        """
+        items = await cls._afetch_clist_em(market, list(cls.EM_QUOTE_FIELDS))
+        if not items:
+            return pd.DataFrame()
+        df = pd.DataFrame(items).rename(columns=cls.EM_QUOTE_FIELDS)
+        for col in ['open', 'close', 'high', 'low', 'volume', 'change_pct', 'prev_close', 'timestamp']:
+            df[col] = pd.to_numeric(df.get(col), errors='coerce')
+        df['date'] = pd.to_datetime(df['timestamp'], unit='s', utc=True, errors='coerce') \
+            .dt.tz_convert('Asia/Shanghai').dt.strftime('%Y-%m-%d')
+        return df
+
+    @classmethod
+    def fetch_quotes_em(cls, market: str = 'a') -> pd.DataFrame:
+        """afetch_quotes_em 的同步版本"""
+        return async_http.run_sync(cls.afetch_quotes_em(market))
+
+
+EM_KLINE_HOST = urlparse(StockAPIDirect.EM_KLINE_URL).netloc
+TENCENT_KLINE_HOST = urlparse(StockAPIDirect.TENCENT_KLINE_URL).netloc
+
+
+def _kline_probe(source: str):
+    """熔断后的后台探测：拉取一只高流动性股票最近 10 天的 K 线"""
+    def probe():
+        end = datetime.now()
+        start = end - timedelta(days=10)
+        s_fmt, e_fmt = start.strftime('%Y%m%d'), end.strftime('%Y%m%d')
+        if source == "akshare":
+            return ak.stock_zh_a_hist(symbol="600519", period="daily", start_date=s_fmt, end_date=e_fmt, adjust="qfq")
+        if source == "eastmoney":
+            return StockAPIDirect.fetch_kline_eastmoney("600519", s_fmt, e_fmt)
+        if source == "tencent":
+            return StockAPIDirect.fetch_kline_tencent("600519", start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+        return yf.Ticker("AAPL").history(period="5d")
+    return probe
+
+
+for _source in ("akshare", "eastmoney", "tencent", "yfinance"):
+    _KLINE_FETCHER.set_probe(_source, _kline_probe(_source))
 
 
 class StockTools:
     """金融分析股票工具 - 结合高性能数据库缓存与增量更新"""
+
+    # 增量同步参数
+    FACTOR_TOLERANCE = 2e-4        # 前收盘价与除权参考价的相对偏差超过该值视为除权除息 (涨跌幅只保留两位小数)
+    PRICE_COLUMNS = ['date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']
     
     def __init__(self, db: DatabaseManager, auto_update: bool = True):
         """
@@ -141,15 +266,15 @@ class StockTools:
             auto_update: 是否在列表为空时自动更新，默认 True
         """
         self.db = db
+        self.resolver = get_resolver(db)
+        db.add_price_listener(_PRICE_CACHE.invalidate)
         if auto_update:
             self._check_and_update_stock_list()
 
     def _check_and_update_stock_list(self, force: bool = False):
         """检查并更新股票列表。仅在列表为空或 force=True 时从网络拉取。"""
         # 直接查询表中记录数
-        cursor = self.db.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM stock_list")
-        count = cursor.fetchone()[0]
+        count = self.db.count_stock_list()
         
         if count > 0 and not force:
             logger.info(f"ℹ️ Stock list already cached ({count} stocks)")
@@ -191,51 +316,36 @@ class StockTools:
 
     def search_ticker(self, query: str, limit: int = 5) -> List[Dict]:
         """
-        模糊搜索 A 股股票代码或名称，支持常见缩写。
+        模糊搜索 A 股 / 港股股票代码或名称，支持常见英文名、别名与拼音首字母 (内存索引，微秒级)。
         """
-        # 清洗后缀 (如 CATL.SZ -> CATL, 000001.SZ -> 000001)
-        clean_query = re.sub(r'\.(SZ|SH|HK|US)$', '', query, flags=re.IGNORECASE)
-        
-        # 常见缩写映射
-        aliases = {
-            "CATL": "宁德时代",
-            "BYD": "比亚迪",
-            "TSLA": "特斯拉",
-            "Moutai": "贵州茅台",
-            "Tencent": "腾讯",
-            "Alibaba": "阿里巴巴",
-            "Meituan": "美团",
-        }
-        
-        search_query = aliases.get(clean_query.upper(), clean_query)
-        
-        # Robustness: if regex-like ticker code is embedded in query (e.g. "300364 中文在线"), try to extract it
-        if not search_query.isdigit():
-             # Extract explicit 5-6 digit codes
-             match = re.search(r'\b(\d{5,6})\b', clean_query)
-             if match:
-                 search_query = match.group(1)
-
-        res = self.db.search_stock(search_query, limit)
-        if not res and search_query.isalpha():
+        res = self.resolver.resolve(query, limit)
+        clean_query = re.sub(r'\.(SZ|SH|HK|US)$', '', query.strip(), flags=re.IGNORECASE)
+        if not res and clean_query.isalpha() and clean_query.isascii():
             # Robustness: mock search hit for alphabetic US tickers
-            return [{"code": search_query.upper(), "name": search_query.upper()}]
+            return [{"code": clean_query.upper(), "name": clean_query.upper()}]
         return res
 
+    def search_tickers(self, queries: List[str], limit: int = 1) -> Dict[str, List[Dict]]:
+        """批量解析多个股票名称 / 代码，返回 {query: [{"code", "name"}]}"""
+        return self.resolver.resolve_many(queries, limit)
+
     def get_stock_price(
         self,
         ticker: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         force_sync: bool = False,
+        adjust: str = "qfq",
     ) -> pd.DataFrame:
         """
-        获取指定股票的历史价格数据。优先从本地缓存读取，缺失时自动从网络补齐。
+        获取指定股票的历史价格数据。优先从本地缓存读取，缺失时只从网络补齐缺失的日期区间。
         
         Args:
             ticker: 股票代码，如 "600519"（贵州茅台）或 "000001"（平安银行）。
             start_date: 开始日期，格式 "YYYY-MM-DD"。默认为 90 天前。
             end_date: 结束日期，格式 "YYYY-MM-DD"。默认为今天。
+            force_sync: 是否强制刷新最新行情 (从本地最后一根 K 线开始重新拉取)
+            adjust: 复权方式 "qfq" (前复权，默认) / "hfq" (后复权) / "none" (不复权)
         
         Returns:
             包含 date, open, close, high, low, volume, change_pct 列的 DataFrame。
@@ -246,142 +356,453 @@ class StockTools:
         if not start_date:
             start_date = (now - timedelta(days=90)).strftime('%Y-%m-%d')
 
-        df_db = self.db.get_stock_prices(ticker, start_date, end_date)
+        clean_ticker, _ = self._clean_ticker(ticker)
+        if not clean_ticker:
+            return self.db.get_stock_prices(ticker, start_date, end_date, adjust=adjust)
+
+        state = self._sync_states([clean_ticker])[clean_ticker]
+        spans, _ = self._plan_sync(state, start_date, end_date, force_sync, market_of(clean_ticker))
+
+        if spans:
+            logger.info(f"📡 Data stale or missing for {ticker}, syncing {len(spans)} missing span(s) from network...")
+            self._sync_incremental(ticker, start_date, end_date, force_sync, state)
+        
+        return self._load_prices([clean_ticker], start_date, end_date, adjust)[clean_ticker]
+
+    def get_stock_prices_many(
+        self,
+        tickers: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        force_sync: bool = False,
+        max_workers: int = 8,
+        as_frame: bool = False,
+        adjust: str = "qfq",
+    ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """
+        批量获取多只股票的历史价格：一次数据库查询，缺失区间的股票并发从网络增量补齐。
         
-        need_update = False
-        if df_db.empty:
-            need_update = True
+        Args:
+            tickers: 股票代码列表
+            start_date: 开始日期，格式 "YYYY-MM-DD"。默认为 90 天前。
+            end_date: 结束日期，格式 "YYYY-MM-DD"。默认为今天。
+            force_sync: 是否强制刷新全部股票的最新行情
+            max_workers: 网络同步的最大并发数
+            as_frame: True 时返回带 ticker 列的长表，否则返回 {ticker: DataFrame}
+            adjust: 复权方式 "qfq" (前复权，默认) / "hfq" (后复权) / "none" (不复权)
+        
+        Returns:
+            {ticker: DataFrame}（无数据的股票对应空 DataFrame），或合并后的长表。
+        """
+        now = datetime.now()
+        if not end_date:
+            end_date = now.strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = (now - timedelta(days=90)).strftime('%Y-%m-%d')
+
+        tickers = list(dict.fromkeys(str(t) for t in tickers if t))
+        keys = {t: self._clean_ticker(t, warn=False)[0] or t for t in tickers}
+        unique_keys = list(dict.fromkeys(keys.values()))
+
+        states = self._sync_states(unique_keys)
+        stale = [t for t in tickers
+                 if self._plan_sync(states[keys[t]], start_date, end_date, force_sync, market_of(keys[t]))[0]]
+
+        if stale:
+            logger.info(f"📡 {len(stale)}/{len(tickers)} tickers stale or missing, syncing missing spans from network...")
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stale)))) as executor:
+                futures = [
+                    executor.submit(self._sync_incremental, t, start_date, end_date, force_sync, states[keys[t]])
+                    for t in stale
+                ]
+                for future in as_completed(futures):
+                    future.result()
+
+        # 同步完成后统一读取 (缓存未命中的股票一次查询)
+        by_key = self._load_prices(unique_keys, start_date, end_date, adjust)
+        frames = {t: by_key[keys[t]] for t in tickers}
+
+        if as_frame:
+            return DatabaseManager.concat_price_frames(frames)
+        return frames
+
+    def _sync_states(self, keys: List[str]) -> Dict[str, Optional[Dict]]:
+        """增量同步状态 (优先取进程内缓存，未命中的一次查询)"""
+        db_key = self.db.cache_key
+        states: Dict[str, Optional[Dict]] = {}
+        missing = []
+        for key in keys:
+            state = _PRICE_CACHE.get_state(db_key, key)
+            if state is MISSING:
+                missing.append(key)
+            else:
+                states[key] = state
+        if missing:
+            generation = _PRICE_CACHE.generation
+            loaded = self.db.get_price_sync_state(missing)
+            for key in missing:
+                states[key] = loaded.get(key)
+                _PRICE_CACHE.put_state(db_key, key, states[key], generation)
+        return states
+
+    def _load_prices(self, keys: List[str], start_date: str, end_date: str,
+                     adjust: str = "qfq") -> Dict[str, pd.DataFrame]:
+        """读取行情 (请求区间落在缓存区间内时直接切片，未命中的一次查询后写入缓存)。
+
+        只缓存默认的前复权行情；其他复权方式直接由数据库按复权因子现算。
+        """
+        if adjust != "qfq":
+            return self.db.get_stock_prices_many(keys, start_date, end_date, adjust=adjust)
+        db_key = self.db.cache_key
+        frames: Dict[str, pd.DataFrame] = {}
+        missing = []
+        for key in keys:
+            df = _PRICE_CACHE.get(db_key, key, start_date, end_date)
+            if df is None:
+                missing.append(key)
+            else:
+                frames[key] = df
+        if missing:
+            generation = _PRICE_CACHE.generation
+            if len(missing) == 1:
+                loaded = {missing[0]: self.db.get_stock_prices(missing[0], start_date, end_date)}
+            else:
+                loaded = self.db.get_stock_prices_many(missing, start_date, end_date)
+            for key in missing:
+                df = loaded.get(key, pd.DataFrame())
+                _PRICE_CACHE.put(db_key, key, start_date, end_date, df, generation)
+                frames[key] = df.copy()
+        return frames
+
+    @staticmethod
+    def price_cache_stats() -> Dict[str, Any]:
+        """进程内行情缓存的条目数 / 字节数 / 命中率"""
+        return _PRICE_CACHE.stats()
+
+    @staticmethod
+    def kline_source_stats() -> Dict[str, Dict]:
+        """各 K 线数据源的调用数 / 错误率 / 胜出次数 / 延迟分位数"""
+        return _KLINE_FETCHER.stats()
+
+    @staticmethod
+    def _clean_ticker(ticker: str, warn: bool = True) -> Tuple[Optional[str], bool]:
+        """清洗代码：美股转大写，A 股/港股只保留数字 (akshare 接口只需要数字代码)。
+
+        Returns:
+            (数据库中使用的代码, 是否美股)；格式不支持时代码为 None。
+        """
+        is_us_stock = bool(re.search(r'[a-zA-Z]', ticker)) and not bool(re.search(r'\d{5,6}', ticker))
+        if is_us_stock:
+            return ticker.upper(), True
+        clean_ticker = "".join(filter(str.isdigit, ticker))
+        if not clean_ticker:
+            if warn:
+                logger.warning(f"⚠️ Unsupported ticker format: {ticker}")
+            return None, False
+        return clean_ticker, False
+
+    @classmethod
+    def _plan_sync(cls, state: Optional[Dict], start_date: str, end_date: str,
+                   force: bool = False, market: str = "CN") -> Tuple[List[Tuple[str, str, Optional[Tuple]]], bool]:
+        """对比已同步区间与交易日历，计算需要从网络拉取的日期区间。
+
+        只有已同步区间之外还存在 "应当已有 K 线" 的交易日时才拉取：周末、节假日、
+        盘中 (当日尚未收盘) 都不会触发网络请求。
+        头部/尾部区间都从本地首/末根 K 线开始拉取 (锚点)：新拉取的复权因子从锚点的本地因子接续，
+        所以请求区间与已同步区间之间的空档也一并补齐 (只追加，不重写已有历史)。
+
+        Returns:
+            ([(fetch_start, fetch_end, (anchor_date, anchor_close, anchor_factor) 或 None)], reset)
+            anchor_close 为 None 表示锚点是盘中的未收盘 K 线，需要重新拉取覆盖；
+            reset=True 表示按返回的区间重新记录 (本地无数据，或本地是旧版的前复权历史需要整体重拉)。
+        """
+        if not state or not state.get("covered_start"):
+            return [(start_date, end_date, None)], True
+
+        def day(s: str) -> date:
+            return date.fromisoformat(s[:10])
+
+        covered_start, covered_end = state["covered_start"], state["covered_end"]
+        if state.get("last_date") and state.get("last_factor") is None:
+            # 旧版本存的是前复权价 (没有复权因子)：按已同步区间与请求区间的并集整体重拉一次不复权行情
+            return [(min(start_date, covered_start), max(end_date, covered_end), None)], True
+
+        cal = get_calendar(market)
+        expected = min(day(end_date), cal.last_expected_bar())
+        need_head = cal.next_session(day(start_date), inclusive=True) < day(covered_start)
+        need_tail = force or cal.next_session(day(covered_end)) <= expected
+        if not state.get("last_date"):
+            # 有同步记录但本地没有 K 线，无法接续复权因子：按请求区间整体拉取
+            return ([(start_date, end_date, None)], True) if need_head or need_tail else ([], False)
+
+        spans = []
+        if need_head:
+            first_date = state["first_date"]
+            spans.append((start_date, first_date,
+                          (first_date, state["first_close"], state["first_factor"])))
+        if need_tail:
+            last_date = state["last_date"]
+            # 最后一根 K 线晚于已同步区间 (盘中拉取的未收盘 K 线)：重新拉取覆盖，只沿用其复权因子
+            anchor_close = None if last_date > covered_end else state["last_close"]
+            spans.append((last_date, max(end_date, last_date), (last_date, anchor_close, state["last_factor"])))
+        return spans, False
+
+    @classmethod
+    def _span_factors(cls, df: pd.DataFrame, anchor: Optional[Tuple]) -> Optional[List[Tuple[str, float]]]:
+        """由不复权收盘价与涨跌幅推算区间内的后复权因子变化点 (向量化)。
+
+        数据源的涨跌幅相对除权参考价计算：close[d-1] * (1 + pct[d]) / close[d] 偏离 1 的交易日即为
+        除权除息日，该比值就是当日复权因子的跳变，不需要额外请求复权行情。
+        因子从锚点 K 线的本地因子接续 (只有比值有意义)；没有锚点时以区间首根 K 线为 1。
+
+        Returns:
+            [(date, factor)]；锚点 K 线缺失或其不复权收盘价与本地不一致
+            (数据源回溯修正了历史，如 yfinance 的拆股调整) 时返回 None。
+        """
+        dates = df['date'].to_numpy(dtype=str)
+        close = pd.to_numeric(df['close'], errors='coerce').to_numpy(dtype=np.float64)
+        pct = pd.to_numeric(df['change_pct'], errors='coerce').to_numpy(dtype=np.float64)
+        jump = np.ones(len(close))
+        if len(close) > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = close[:-1] * (1 + pct[1:] / 100) / close[1:]
+            event = np.isfinite(ratio) & (ratio > 0) & (np.abs(ratio - 1) > cls.FACTOR_TOLERANCE)
+            jump[1:] = np.where(event, ratio, 1.0)
+        factors = np.cumprod(jump)
+
+        points = np.flatnonzero(jump != 1.0)
+        if anchor:
+            anchor_date, anchor_close, anchor_factor = anchor
+            pos = np.flatnonzero(dates == anchor_date)
+            if not len(pos):
+                return None
+            i = int(pos[0])
+            if anchor_close is not None and not abs(close[i] - anchor_close) <= abs(anchor_close) * cls.FACTOR_TOLERANCE:
+                return None
+            factors *= anchor_factor / factors[i]
+        if not anchor or anchor[0] != dates[0]:
+            # 区间首根 K 线之前没有本地因子 (头部区间 / 首次同步)
+            points = np.union1d([0], points)
+        return [(str(dates[i]), float(factors[i])) for i in points]
+
+    def _sync_incremental(self, ticker: str, start_date: str, end_date: str,
+                          force: bool = False, state: Optional[Dict] = None) -> Optional[str]:
+        """只拉取本地缺失的日期区间并追加入库 (不复权行情 + 复权因子变化点)。
+
+        Args:
+            state: get_price_sync_state 中该股票的状态 (本地无数据时为 None)
+
+        Returns:
+            写入数据库时使用的清洗后代码；拉取失败或无需同步时返回 None。
+        """
+        delta = self._collect_delta(ticker, start_date, end_date, force, state)
+        if not delta:
+            return None
+        self.db.save_price_deltas([delta])
+        return delta["ticker"]
+
+    def _collect_delta(self, ticker: str, start_date: str, end_date: str,
+                       force: bool = False, state: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        """从网络拉取本地缺失的日期区间，不写库 (批量同步时由调用方合并写入)。
+
+        Returns:
+            {"ticker", "df", "factors", "covered_start", "covered_end", "reset", "replace"}；拉取失败或无需同步时返回 None。
+            factors 为复权因子变化点 [(date, factor)]；replace=True 表示 df 为需要整体替换的完整历史。
+            数据源对区间没有任何 K 线 (停牌 / 退市 / 尚未上市) 时 df 为空，区间照常记入已同步 (最多到
+            最近应有的 K 线)，避免每次同步都重新请求。
+        """
+        clean_ticker, is_us_stock = self._clean_ticker(ticker)
+        if not clean_ticker:
+            return None
+
+        market = market_of(clean_ticker)
+        spans, reset = self._plan_sync(state, start_date, end_date, force, market)
+        if not spans:
+            return None
+        # 本地已有 K 线却要整体重拉 (旧版前复权历史)：写入前删除旧数据
+        replace = bool(reset and state and state.get("last_date"))
+
+        # 已同步区间最多记到最近一根应有的 K 线：盘中拉到的当日 K 线收盘后还会重新拉取
+        expected = get_calendar(market).last_expected_bar().isoformat()
+        fetched, frames, factors = [], [], []
+        for fetch_start, fetch_end, anchor in spans:
+            df_remote = self._fetch_safely(clean_ticker, is_us_stock, fetch_start, fetch_end)
+            if df_remote is None:
+                continue
+            fetch_end = min(fetch_end, expected)
+            if df_remote.empty:
+                # 数据源确认区间内没有 K 线：不写行情，只推进已同步区间
+                fetched.append((min(fetch_start, fetch_end), fetch_end))
+                continue
+            span_factors = self._span_factors(df_remote, anchor)
+            if span_factors is None:
+                logger.info(f"🔁 Raw history of {clean_ticker} changed at source, refetching full history...")
+                full_start = min(start_date, state["covered_start"], state["first_date"])
+                full_end = min(max(end_date, state["covered_end"]), expected)
+                df_full = self._fetch_safely(clean_ticker, is_us_stock, full_start, full_end)
+                if df_full is None or df_full.empty:
+                    return None
+                logger.info(f"✅ {clean_ticker}: refetched {len(df_full)} bar(s)")
+                return {"ticker": clean_ticker, "df": df_full, "factors": self._span_factors(df_full, None),
+                        "covered_start": full_start, "covered_end": full_end, "reset": True, "replace": True}
+            if anchor and anchor[1] is not None:
+                # 锚点 K 线本地已有 (且其涨跌幅在本次拉取中缺少前一日收盘价)，不覆盖
+                df_remote = df_remote[df_remote['date'] != anchor[0]]
+            frames.append(df_remote)
+            factors.extend(span_factors)
+            fetched.append((min(fetch_start, fetch_end), fetch_end))
+
+        if not fetched:
+            return None
+
+        new_start = min(s for s, _ in fetched)
+        new_end = max(e for _, e in fetched)
+        if not reset:
+            new_start = min(new_start, state["covered_start"])
+            new_end = max(new_end, state["covered_end"])
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=self.PRICE_COLUMNS)
+        if df.empty:
+            logger.info(f"📭 {clean_ticker}: no bars at source for {new_start} ~ {new_end}, marking the span as synced")
         else:
-            db_latest = pd.to_datetime(df_db['date'].max())
-            req_latest = pd.to_datetime(end_date)
-            if (req_latest - db_latest).days > 2:
-                need_update = True
+            logger.info(f"✅ {clean_ticker}: fetched {len(df)} new bar(s) over {len(fetched)} span(s)")
+        return {"ticker": clean_ticker, "df": df, "factors": factors, "covered_start": new_start,
+                "covered_end": new_end, "reset": reset, "replace": replace}
 
-        if force_sync:
-            need_update = True
+    def _fetch_safely(self, clean_ticker: str, is_us_stock: bool, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """_fetch_remote 的异常处理包装。
 
-        if need_update:
-            logger.info(f"📡 Data stale or missing for {ticker}, syncing from network...")
+        Returns:
+            行情 DataFrame；数据源正常返回但区间内没有 K 线时为空 DataFrame；
+            拉取失败 (网络错误 / 熔断 / 解析异常) 时为 None (不记入已同步区间，下次重试)。
+        """
+        try:
+            df_remote = self._fetch_remote(clean_ticker, is_us_stock, start_date, end_date)
+            if df_remote is not None and not df_remote.empty:
+                return df_remote
+            logger.info(f"📭 No bars at source for {clean_ticker} ({start_date} ~ {end_date})")
+            return pd.DataFrame(columns=self.PRICE_COLUMNS)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️ Skipping sync for {clean_ticker}: {e}")
+        except KeyError as e:
+            # Akshare 有时在某些股票无数据时会抛出 KeyError
+            logger.warning(f"⚠️ Akshare data missing for {clean_ticker}: {e}")
+        except NETWORK_ERRORS as e:
+            logger.error(f"❌ Network error during Akshare sync for {clean_ticker}: {e}")
+        except sqlite3.Error as e:
+            logger.error(f"❌ Database error during Akshare sync for {clean_ticker}: {e}")
+        except Exception as e:
+            logger.error(f"❌ Unexpected error during Akshare sync for {clean_ticker}: {e}")
+        return None
+
+    def _fetch_remote(self, clean_ticker: str, is_us_stock: bool, start_date: str, end_date: str) -> pd.DataFrame:
+        """从网络拉取指定区间的不复权行情 (akshare -> EastMoney -> Tencent 对冲请求)，返回统一列名的 DataFrame。
+
+        change_pct 为相对除权参考价的涨跌幅 (与交易所口径一致)，增量同步据此推算复权因子。
+
+        所有数据源均失败时抛出 akshare 的原始异常。
+        """
+        s_fmt = start_date.replace("-", "")
+        e_fmt = end_date.replace("-", "")
+        
+        def fetch_data_akshare():
+            """主路径: akshare (行情来自东方财富 K 线接口)"""
+            host_limits.acquire(EM_KLINE_HOST)
+            try:
+                if len(clean_ticker) == 5:
+                    return ak.stock_hk_hist(
+                        symbol=clean_ticker, period="daily",
+                        start_date=s_fmt, end_date=e_fmt,
+                        adjust=""
+                    )
+                else:
+                    return ak.stock_zh_a_hist(
+                        symbol=clean_ticker, period="daily",
+                        start_date=s_fmt, end_date=e_fmt,
+                        adjust=""
+                    )
+            except KeyError:
+                # Akshare 在股票无数据时会抛出 KeyError：按空结果处理 (不计入数据源故障，不触发熔断)
+                return pd.DataFrame()
+
+        def _fetch_data_yfinance():
+            """美股路径: yfinance"""
+            host_limits.acquire("finance.yahoo.com")
+            yf_ticker = yf.Ticker(clean_ticker)
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            df_us = yf_ticker.history(start=start_date, end=end_dt.strftime("%Y-%m-%d"), auto_adjust=False)
+            if df_us.empty:
+                return pd.DataFrame()
             
-            is_us_stock = bool(re.search(r'[a-zA-Z]', ticker)) and not bool(re.search(r'\d{5,6}', ticker))
+            df_us = df_us.reset_index()
+            date_col = 'Date' if 'Date' in df_us.columns else df_us.columns[0]
+            df_us = df_us.rename(columns={
+                'Open': 'open', 'Close': 'close',
+                'High': 'high', 'Low': 'low', 'Volume': 'volume'
+            })
             
-            if is_us_stock:
-                clean_ticker = ticker.upper()
+            if pd.api.types.is_datetime64_any_dtype(df_us[date_col]):
+                df_us['date'] = df_us[date_col].dt.strftime('%Y-%m-%d')
             else:
-                # 清洗 ticker，确保只包含数字（Akshare A 股接口通常只需要数字代码）
-                clean_ticker = "".join(filter(str.isdigit, ticker))
-                if not clean_ticker:
-                    logger.warning(f"⚠️ Unsupported ticker format: {ticker}")
-                    return df_db
-
-            try:
-                s_fmt = start_date.replace("-", "")
-                e_fmt = end_date.replace("-", "")
-                
-                df_remote = None
-                
-                def fetch_data_akshare():
-                    """主路径: akshare"""
-                    if is_us_stock:
-                        return _fetch_data_yfinance()
-                    if len(clean_ticker) == 5:
-                        return ak.stock_hk_hist(
-                            symbol=clean_ticker, period="daily",
-                            start_date=s_fmt, end_date=e_fmt,
-                            adjust="qfq"
-                        )
-                    else:
-                        return ak.stock_zh_a_hist(
-                            symbol=clean_ticker, period="daily",
-                            start_date=s_fmt, end_date=e_fmt,
-                            adjust="qfq"
-                        )
-
-                def _fetch_data_yfinance():
-                    """美股路径: yfinance"""
-                    yf_ticker = yf.Ticker(clean_ticker)
-                    end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-                    df_us = yf_ticker.history(start=start_date, end=end_dt.strftime("%Y-%m-%d"))
-                    if df_us.empty:
-                        return pd.DataFrame()
-                    
-                    df_us = df_us.reset_index()
-                    date_col = 'Date' if 'Date' in df_us.columns else df_us.columns[0]
-                    df_us = df_us.rename(columns={
-                        'Open': 'open', 'Close': 'close',
-                        'High': 'high', 'Low': 'low', 'Volume': 'volume'
-                    })
-                    
-                    if pd.api.types.is_datetime64_any_dtype(df_us[date_col]):
-                        df_us['date'] = df_us[date_col].dt.strftime('%Y-%m-%d')
-                    else:
-                        df_us['date'] = pd.to_datetime(df_us[date_col]).dt.strftime('%Y-%m-%d')
-                        
-                    df_us['change_pct'] = df_us['close'].pct_change() * 100
-                    df_us['change_pct'] = df_us['change_pct'].fillna(0)
-                    
-                    return df_us[['date', 'open', 'close', 'high', 'low', 'volume', 'change_pct']]
-
-                def fetch_data_eastmoney():
-                    """降级路径 1: 东方财富直接 HTTP"""
-                    logger.info(f"📡 Trying EastMoney direct for {clean_ticker}...")
-                    return StockAPIDirect.fetch_kline_eastmoney(clean_ticker, s_fmt, e_fmt)
-                
-                def fetch_data_tencent():
-                    """降级路径 2: 腾讯财经直接 HTTP"""
-                    logger.info(f"📡 Trying Tencent direct for {clean_ticker}...")
-                    # 腾讯日期格式支持 YYYY-MM-DD
-                    return StockAPIDirect.fetch_kline_tencent(clean_ticker, start_date, end_date)
-
-                # === 多源尝试策略 ( akshare -> EastMoney -> Tencent ) ===
-                try:
-                    df_remote = fetch_data_akshare()
-                except Exception as e:
-                    logger.warning(f"⚠️ akshare failed for {clean_ticker}: {e}")
-                    if is_us_stock: raise e
-                    
-                    # 尝试东方财富
-                    try:
-                        df_remote = fetch_data_eastmoney()
-                    except Exception as e_em:
-                        logger.warning(f"⚠️ EastMoney direct also failed for {clean_ticker}: {e_em}")
-                        
-                        # 尝试腾讯财经 (最后一道防线)
-                        try:
-                            df_remote = fetch_data_tencent()
-                        except Exception as e_tx:
-                            logger.error(f"❌ All sources (akshare/EM/Tencent) failed for {clean_ticker}")
-                            raise e  # 抛出最初的错误
+                df_us['date'] = pd.to_datetime(df_us[date_col]).dt.strftime('%Y-%m-%d')
                 
-                if df_remote is not None and not df_remote.empty:
-                    if not is_us_stock:
-                        df_remote = df_remote.rename(columns={
-                            '日期': 'date', '开盘': 'open', '收盘': 'close',
-                            '最高': 'high', '最低': 'low', '成交量': 'volume',
-                            '涨跌幅': 'change_pct'
-                        })
-                    # 确保日期格式正确
-                    df_remote['date'] = pd.to_datetime(df_remote['date']).dt.strftime('%Y-%m-%d')
-                    
-                    # 只有在获取到有意义的数据时才保存
-                    self.db.save_stock_prices(clean_ticker, df_remote) # 保存时使用清洗后的 clean_ticker
-                    
-                    # 重新查询数据库返回结果，保证一致性
-                    return self.db.get_stock_prices(clean_ticker, start_date, end_date)
-                else:
-                    logger.warning(f"⚠️ Akshare returned empty data for {clean_ticker}")
-                    
-            except KeyError as e:
-                # Akshare 有时在某些股票无数据时会抛出 KeyError
-                logger.warning(f"⚠️ Akshare data missing for {clean_ticker}: {e}")
-            except (RequestException, ConnectionError) as e:
-                logger.error(f"❌ Network error during Akshare sync for {clean_ticker}: {e}")
-            except sqlite3.Error as e:
-                logger.error(f"❌ Database error during Akshare sync for {clean_ticker}: {e}")
-            except Exception as e:
-                logger.error(f"❌ Unexpected error during Akshare sync for {clean_ticker}: {e}")
+            # Close 只做了拆股调整 (不含分红)；涨跌幅按含分红的 Adj Close 计算，除息日两者的差异即复权因子跳变
+            adj_close = df_us['Adj Close'] if 'Adj Close' in df_us.columns else df_us['close']
+            df_us['change_pct'] = adj_close.pct_change() * 100
+            df_us['change_pct'] = df_us['change_pct'].fillna(0)
+            
+            return df_us[StockTools.PRICE_COLUMNS]
+
+        def fetch_data_eastmoney():
+            """降级路径 1: 东方财富直接 HTTP"""
+            logger.info(f"📡 Trying EastMoney direct for {clean_ticker}...")
+            host_limits.acquire(EM_KLINE_HOST)
+            return StockAPIDirect.fetch_kline_eastmoney(clean_ticker, s_fmt, e_fmt, adjust="")
         
-        return df_db
+        def fetch_data_tencent():
+            """降级路径 2: 腾讯财经直接 HTTP"""
+            logger.info(f"📡 Trying Tencent direct for {clean_ticker}...")
+            # 腾讯日期格式支持 YYYY-MM-DD
+            # 不复权 + 后复权两次请求
+            host_limits.acquire(TENCENT_KLINE_HOST)
+            host_limits.acquire(TENCENT_KLINE_HOST)
+            return StockAPIDirect.fetch_kline_tencent(clean_ticker, start_date, end_date, adjust="")
+
+        def normalized(fetch):
+            def run():
+                df = fetch()
+                if df is None or df.empty:
+                    return pd.DataFrame()
+                if not is_us_stock:
+                    df = df.rename(columns={
+                        '日期': 'date', '开盘': 'open', '收盘': 'close',
+                        '最高': 'high', '最低': 'low', '成交量': 'volume',
+                        '涨跌幅': 'change_pct'
+                    })
+                # 确保日期格式正确
+                df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+                return df
+            return run
+
+        # === 多源对冲策略 ( akshare -> EastMoney -> Tencent ) ===
+        # 主数据源超过对冲延迟未返回时并行启动下一个，取最先返回的有效结果
+        if is_us_stock:
+            sources = [("yfinance", normalized(_fetch_data_yfinance))]
+        else:
+            sources = [
+                ("akshare", normalized(fetch_data_akshare)),
+                ("eastmoney", normalized(fetch_data_eastmoney)),
+                ("tencent", normalized(fetch_data_tencent)),
+            ]
+        try:
+            source, df_remote = _KLINE_FETCHER.fetch(
+                sources, valid=lambda df: not df.empty and {'date', 'close'}.issubset(df.columns)
+            )
+        except Exception:
+            logger.error(f"❌ All sources (akshare/EM/Tencent) failed for {clean_ticker}")
+            raise  # 抛出优先级最高的数据源的错误
+        if source and source != sources[0][0]:
+            logger.info(f"📡 {clean_ticker}: served by {source}")
+        return df_remote if df_remote is not None else pd.DataFrame()
 
 
 def get_stock_analysis(ticker: str, db: DatabaseManager) -> str:
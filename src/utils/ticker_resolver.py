@@ -0,0 +1,208 @@
+"""
+AlphaEar 股票代码解析 (进程内索引)
+
+FinAgent / ReportAgent 会对每个候选标的调用 search_ticker，原实现每次都对 stock_list
+做一次 LIKE '%q%' 全表扫描。这里从 stock_list 一次性加载全部股票并建立内存索引：
+
+- 代码精确匹配 / 名称精确匹配 (dict)
+- 别名表：内置常用英文名 + stock_aliases 表 (DatabaseManager.save_stock_aliases 扩展)
+- 代码 / 名称前缀 (有序数组 + 二分，等价于前缀树)
+- 拼音首字母前缀 (需安装 pypinyin，如 "gzmt" -> 贵州茅台)
+- 子串匹配兜底 (与原 LIKE '%q%' 语义一致)
+
+stock_list / stock_aliases 在本进程写入后自动重建索引。
+"""
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.database_manager import DatabaseManager
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# 常用英文名 / 简称 -> 股票名称或代码 (stock_aliases 表中的同名别名优先)
+DEFAULT_ALIASES: Dict[str, str] = {
+    "CATL": "宁德时代",
+    "BYD": "比亚迪",
+    "TSLA": "特斯拉",
+    "Moutai": "贵州茅台",
+    "Kweichow Moutai": "贵州茅台",
+    "Tencent": "腾讯",
+    "Alibaba": "阿里巴巴",
+    "Meituan": "美团",
+    "Xiaomi": "小米集团",
+    "JD": "京东集团",
+    "Baidu": "百度集团",
+    "NetEase": "网易",
+    "Ping An": "中国平安",
+    "SMIC": "中芯国际",
+    "Kuaishou": "快手",
+}
+
+_SUFFIX_RE = re.compile(r'\.(SZ|SH|HK|US)$', re.IGNORECASE)
+_CODE_RE = re.compile(r'\b(\d{5,6})\b')
+
+
+def _norm(text: str) -> str:
+    """匹配用的规范化：去空白、转大写 (英文名 / 拼音首字母不区分大小写)"""
+    return "".join(str(text).split()).upper()
+
+
+def _initials(name: str) -> str:
+    """拼音首字母 (保留名称中的英文字母与数字，如 "*ST平安" -> "STPA")"""
+    letters = lazy_pinyin(name, style=Style.FIRST_LETTER, errors=lambda s: list(s))
+    return "".join(c for c in "".join(letters) if c.isalnum()).upper()
+
+
+class _Index:
+    """一次加载的不可变索引 (重建时整体替换，读取无需加锁)"""
+
+    def __init__(self, stocks: List[Tuple[str, str]], aliases: Dict[str, str]):
+        self.stocks = stocks
+        self.by_code: Dict[str, int] = {}
+        self.by_name: Dict[str, int] = {}
+        for i, (code, name) in enumerate(stocks):
+            self.by_code.setdefault(code, i)
+            self.by_name.setdefault(_norm(name), i)
+        self.aliases = {_norm(a): t for a, t in aliases.items()}
+        self.codes = sorted((code, i) for i, (code, _) in enumerate(stocks))
+        self.names = sorted((_norm(name), i) for i, (_, name) in enumerate(stocks))
+        self.pinyin = sorted((_initials(name), i) for i, (_, name) in enumerate(stocks)) if lazy_pinyin else []
+        # 子串兜底：全部代码 / 名称拼成一个字符串，用 str.find 在 C 层扫描
+        self._hay_offsets: List[int] = []
+        parts, pos = [], 0
+        for code, name in stocks:
+            text = f"{code}\x00{_norm(name)}\n"
+            self._hay_offsets.append(pos)
+            parts.append(text)
+            pos += len(text)
+        self._haystack = "".join(parts)
+
+    @staticmethod
+    def _prefix(keys: List[Tuple[str, int]], prefix: str) -> Iterable[int]:
+        i = bisect_left(keys, (prefix, -1))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def _substring(self, q: str) -> Iterable[int]:
+        start = 0
+        while True:
+            pos = self._haystack.find(q, start)
+            if pos < 0:
+                return
+            i = bisect_left(self._hay_offsets, pos + 1) - 1
+            yield i
+            # 跳到下一只股票，避免同一只股票重复命中
+            start = self._hay_offsets[i + 1] if i + 1 < len(self._hay_offsets) else len(self._haystack)
+
+    def lookup(self, query: str, limit: int) -> List[int]:
+        q = _norm(query)
+        if not q:
+            return []
+        found: Dict[int, None] = {}
+
+        def add(indices: Iterable[Optional[int]]) -> bool:
+            for i in indices:
+                if i is not None:
+                    found.setdefault(i)
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        # 代码 / 名称精确命中即为答案，不再用前缀、子串补足
+        if add((self.by_code.get(q), self.by_name.get(q))) or found:
+            return list(found)
+        if q.isdigit() and add(self._prefix(self.codes, q)):
+            return list(found)
+        if add(self._prefix(self.names, q)):
+            return list(found)
+        if self.pinyin and q.isascii() and q.isalpha() and add(self._prefix(self.pinyin, q)):
+            return list(found)
+        if "\x00" not in q and "\n" not in q:
+            add(self._substring(q))
+        return list(found)
+
+
+class TickerResolver:
+    """stock_list 的内存索引，按数据库共享 (见 get_resolver)"""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._lock = threading.Lock()
+        self._index: Optional[_Index] = None
+        self._version = -1
+
+    def _current(self) -> _Index:
+        version = self.db.stock_list_version
+        index = self._index
+        if index is not None and self._version == version:
+            return index
+        with self._lock:
+            if self._index is None or self._version != version:
+                stocks = self.db.list_stocks()
+                aliases = {**DEFAULT_ALIASES, **self.db.get_stock_aliases()}
+                self._index = _Index(stocks, aliases)
+                self._version = version
+                logger.debug(f"🔎 Ticker index built: {len(stocks)} stocks, {len(aliases)} aliases"
+                             f"{'' if lazy_pinyin else ' (pypinyin not installed, no pinyin index)'}")
+            return self._index
+
+    def reload(self):
+        """强制重建索引 (其他进程更新了 stock_list 时使用)"""
+        with self._lock:
+            self._index = None
+
+    def add_aliases(self, aliases: Dict[str, str]):
+        """新增别名 {alias: 股票名称或代码}，持久化到 stock_aliases"""
+        self.db.save_stock_aliases(aliases)
+
+    def resolve(self, query: str, limit: int = 5) -> List[Dict[str, str]]:
+        """解析股票代码 / 名称 / 别名 / 拼音首字母，返回 [{"code", "name"}] (按匹配程度排序)"""
+        return self._resolve(self._current(), query, limit)
+
+    def resolve_many(self, queries: Iterable[str], limit: int = 1) -> Dict[str, List[Dict[str, str]]]:
+        """批量解析 {query: [{"code", "name"}]}，共享同一份索引快照"""
+        index = self._current()
+        return {q: self._resolve(index, q, limit) for q in dict.fromkeys(queries)}
+
+    @staticmethod
+    def _resolve(index: _Index, query: str, limit: int) -> List[Dict[str, str]]:
+        # 清洗后缀 (如 CATL.SZ -> CATL, 000001.SZ -> 000001)
+        clean = _SUFFIX_RE.sub('', str(query).strip())
+        target = index.aliases.get(_norm(clean))
+        if target is None and not clean.isdigit():
+            # 查询中夹带 5-6 位代码 (如 "300364 中文在线") 时按代码解析
+            match = _CODE_RE.search(clean)
+            if match:
+                clean = match.group(1)
+        hits = index.lookup(target, limit) if target else []
+        if not hits:
+            hits += [i for i in index.lookup(clean, limit) if i not in hits]
+        return [{"code": index.stocks[i][0], "name": index.stocks[i][1]} for i in hits[:limit]]
+
+    def stats(self) -> Dict[str, int]:
+        index = self._current()
+        return {"stocks": len(index.stocks), "aliases": len(index.aliases), "pinyin": len(index.pinyin)}
+
+
+_resolvers: Dict[str, TickerResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(db: DatabaseManager) -> TickerResolver:
+    """按数据库共享的解析器 (同一数据库的多个 StockTools 实例只建一次索引)"""
+    with _resolvers_lock:
+        resolver = _resolvers.get(db.cache_key)
+        if resolver is None:
+            resolver = _resolvers[db.cache_key] = TickerResolver(db)
+        else:
+            # 旧的 DatabaseManager 可能已关闭连接池，改用最新的实例读库
+            resolver.db = db
+        return resolver
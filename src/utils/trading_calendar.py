@@ -0,0 +1,238 @@
+"""
+AlphaEar 交易日历 (SSE/SZSE、HKEX、NYSE)
+
+预先把交易日展开为按自然日索引的数组，"某日是否交易 / 某日及之前最近的交易日 /
+之后的下一个交易日" 都是 O(1) 查表。用于：
+
+- 行情新鲜度判断：本地数据是否已包含 "最近一根应有的 K 线" (last_expected_bar)，
+  周末、节假日不再触发网络同步，收盘后能及时拉取当日数据
+- 预测时间戳：按真实交易日生成未来日期 (不再用忽略中港节假日的 BusinessDay)
+
+日历来源 (依次尝试): exchange_calendars (可选依赖) -> akshare 新浪交易日 (仅 A 股)
+-> 规则推算 (工作日；美股额外扣除 NYSE 固定假日)。联网获取的日历缓存在
+TRADING_CALENDAR_CACHE (默认 data/trading_calendar.json)，过期后每天最多刷新一次。
+"""
+import json
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday,
+)
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+try:
+    import exchange_calendars as _xcals
+except ImportError:
+    _xcals = None
+
+CALENDAR_CACHE = os.getenv("TRADING_CALENDAR_CACHE", "data/trading_calendar.json")
+
+# 市场 -> (时区, 视为已收盘且数据源已更新的时间, exchange_calendars 代码)
+MARKETS: Dict[str, Tuple[str, time, str]] = {
+    "CN": ("Asia/Shanghai", time(15, 30), "XSHG"),
+    "HK": ("Asia/Hong_Kong", time(16, 30), "XHKG"),
+    "US": ("America/New_York", time(16, 30), "XNYS"),
+}
+_RANGE_START = date(2005, 1, 1)
+
+
+def market_of(ticker: str) -> str:
+    """按代码判断市场：含字母为美股，5 位数字为港股，其余为 A 股"""
+    t = str(ticker).split(".")[0]
+    if any(c.isalpha() for c in t):
+        return "US"
+    return "HK" if len("".join(filter(str.isdigit, t))) == 5 else "CN"
+
+
+class _NYSEHolidays(AbstractHolidayCalendar):
+    rules = [
+        Holiday("NewYearsDay", month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("USIndependenceDay", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+def _rule_sessions(market: str, start: date, end: date) -> List[date]:
+    days = pd.bdate_range(start, end)
+    if market == "US":
+        days = days.difference(_NYSEHolidays().holidays(start, end))
+    return [d.date() for d in days]
+
+
+class TradingCalendar:
+    """单个市场的交易日历 (范围外的日期按工作日规则推算)"""
+
+    def __init__(self, market: str, sessions: Iterable[date], source: str):
+        self.market = market
+        self.source = source
+        sessions = sorted(set(sessions))
+        self.start = sessions[0] if sessions else _RANGE_START
+        self.end = sessions[-1] if sessions else _RANGE_START
+        n = (self.end - self.start).days + 1
+        offsets = np.array([(d - self.start).days for d in sessions], dtype=np.int64)
+        self._is_session = np.zeros(n, dtype=bool)
+        self._is_session[offsets] = True
+        idx = np.arange(n)
+        # 每个自然日 -> 当日及之前最近的交易日 / 当日及之后最近的交易日 (偏移量)
+        self._prev = np.maximum.accumulate(np.where(self._is_session, idx, -1))
+        self._next = np.minimum.accumulate(np.where(self._is_session, idx, n)[::-1])[::-1]
+        tz, self.close_time, _ = MARKETS[market]
+        self._tz = ZoneInfo(tz) if ZoneInfo else None
+
+    def _offset(self, d: date) -> Optional[int]:
+        off = (d - self.start).days
+        return off if 0 <= off < len(self._is_session) else None
+
+    def is_session(self, d: date) -> bool:
+        off = self._offset(d)
+        if off is None:
+            return d.weekday() < 5
+        return bool(self._is_session[off])
+
+    def previous_session(self, d: date, inclusive: bool = True) -> date:
+        """d 及之前 (inclusive=False 时严格之前) 最近的交易日"""
+        if not inclusive:
+            d -= timedelta(days=1)
+        off = self._offset(d)
+        if off is not None and self._prev[off] >= 0:
+            return self.start + timedelta(days=int(self._prev[off]))
+        if off is None and d > self.end:
+            while not self.is_session(d):
+                d -= timedelta(days=1)
+            return d
+        d = min(d, self.start - timedelta(days=1))
+        while d.weekday() >= 5:
+            d -= timedelta(days=1)
+        return d
+
+    def next_session(self, d: date, inclusive: bool = False) -> date:
+        """d 之后 (inclusive=True 时含当日) 最近的交易日"""
+        if not inclusive:
+            d += timedelta(days=1)
+        off = self._offset(d)
+        if off is not None and self._next[off] < len(self._is_session):
+            return self.start + timedelta(days=int(self._next[off]))
+        d = max(d, self.end + timedelta(days=1))
+        while not self.is_session(d):
+            d += timedelta(days=1)
+        return d
+
+    def sessions_after(self, d: date, count: int) -> List[date]:
+        """d 之后的 count 个交易日 (用于生成预测时间戳)"""
+        result = []
+        for _ in range(count):
+            d = self.next_session(d)
+            result.append(d)
+        return result
+
+    def last_expected_bar(self, now: Optional[datetime] = None) -> date:
+        """截至 now 应当已经有日线数据的最近交易日 (当日收盘并更新后才算当日)"""
+        if now is None:
+            now = datetime.now(self._tz) if self._tz else datetime.now()
+        elif self._tz and now.tzinfo is not None:
+            now = now.astimezone(self._tz)
+        today = now.date()
+        if self.is_session(today) and now.time() >= self.close_time:
+            return today
+        return self.previous_session(today, inclusive=False)
+
+
+_lock = threading.Lock()
+_calendars: Dict[str, TradingCalendar] = {}
+
+
+def _read_cache() -> Dict:
+    try:
+        with open(CALENDAR_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(market: str, sessions: List[date], source: str):
+    data = _read_cache()
+    data[market] = {
+        "source": source,
+        "fetched_at": date.today().isoformat(),
+        "sessions": [d.isoformat() for d in sessions],
+    }
+    try:
+        Path(CALENDAR_CACHE).parent.mkdir(parents=True, exist_ok=True)
+        with open(CALENDAR_CACHE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        logger.warning(f"⚠️ Cannot write trading calendar cache {CALENDAR_CACHE}: {e}")
+
+
+def _fetch_sessions(market: str) -> Tuple[Optional[List[date]], str]:
+    end = date(date.today().year + 1, 12, 31)
+    if _xcals is not None:
+        try:
+            cal = _xcals.get_calendar(MARKETS[market][2], start=_RANGE_START.isoformat())
+            return [d.date() for d in cal.sessions_in_range(_RANGE_START.isoformat(), end.isoformat())], "exchange_calendars"
+        except Exception as e:
+            logger.warning(f"⚠️ exchange_calendars failed for {market}: {e}")
+    if market == "CN":
+        try:
+            import akshare as ak
+            df = ak.tool_trade_date_hist_sina()
+            return [d.date() for d in pd.to_datetime(df["trade_date"])], "akshare"
+        except Exception as e:
+            logger.warning(f"⚠️ akshare trade calendar failed: {e}")
+    return None, "rules"
+
+
+def _build(market: str) -> TradingCalendar:
+    today = date.today()
+    cached = _read_cache().get(market)
+    if cached and cached.get("sessions"):
+        sessions = [date.fromisoformat(d) for d in cached["sessions"]]
+        if sessions[-1] >= today or cached.get("fetched_at") == today.isoformat():
+            return TradingCalendar(market, sessions, cached.get("source", "cache"))
+
+    sessions, source = _fetch_sessions(market)
+    if sessions:
+        _write_cache(market, sessions, source)
+        logger.info(f"📅 Loaded {market} trading calendar from {source} ({sessions[0]} ~ {sessions[-1]})")
+        return TradingCalendar(market, sessions, source)
+    if cached and cached.get("sessions"):
+        # 联网失败时继续使用过期缓存，范围外按工作日推算
+        return TradingCalendar(market, [date.fromisoformat(d) for d in cached["sessions"]], cached.get("source", "cache"))
+    if market == "US":
+        logger.info("📅 Using rule-based US trading calendar (weekdays minus NYSE holidays)")
+    else:
+        logger.warning(f"⚠️ No {market} trading calendar source, assuming every weekday is a session")
+    return TradingCalendar(market, _rule_sessions(market, _RANGE_START, date(today.year + 1, 12, 31)), "rules")
+
+
+def get_calendar(market: str) -> TradingCalendar:
+    """获取市场交易日历 (进程内只构建一次)"""
+    market = market.upper()
+    if market not in MARKETS:
+        raise ValueError(f"Unknown market: {market}")
+    calendar = _calendars.get(market)
+    if calendar is None:
+        with _lock:
+            calendar = _calendars.get(market)
+            if calendar is None:
+                calendar = _calendars[market] = _build(market)
+    return calendar
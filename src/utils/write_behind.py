@@ -0,0 +1,217 @@
+"""
+AlphaEar 异步批量写入队列 (write-behind)
+
+调用线程只负责把写操作 (接收写连接的函数) 放入队列并立即返回；
+后台线程按 "条数 / 时间" 阈值把多个写操作合并进同一个事务提交，
+一次 fsync 摊到一批写入上。
+
+- flush(): 屏障，阻塞到此前入队的写操作全部落盘
+- close(): 写完剩余数据后停止后台线程 (进程退出时自动调用)
+- stats(): 队列深度、批大小、提交耗时等指标
+"""
+import atexit
+import queue
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class _Op:
+    __slots__ = ("fn", "tag", "enqueued_at")
+
+    def __init__(self, fn: Callable, tag: str):
+        self.fn = fn
+        self.tag = tag
+        self.enqueued_at = time.perf_counter()
+
+
+class _Barrier:
+    __slots__ = ("event",)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+# 进程退出时把所有仍在运行的队列写完
+_live_queues: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+
+
+@atexit.register
+def _drain_all():
+    for q in list(_live_queues):
+        q.close()
+
+
+class WriteBehindQueue:
+    """单后台线程的批量写入队列，写操作在 pool.write() 事务中执行"""
+
+    def __init__(self, pool, max_batch: int = 200, max_delay_ms: float = 50):
+        self.pool = pool
+        self.max_batch = max(1, int(max_batch))
+        self.max_delay = max(0.0, max_delay_ms / 1000)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # 指标
+        self._enqueued = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._flush_total = 0.0
+        self._flush_last = 0.0
+        self._flush_max = 0.0
+        self._lag_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"write-behind:{pool.db_path}", daemon=True)
+        self._thread.start()
+        _live_queues.add(self)
+
+    # --- 生产者接口 ---
+
+    def submit(self, fn: Callable, tag: str = "default"):
+        """入队一个写操作 fn(conn)。队列已关闭时在调用线程同步执行。"""
+        with self._lock:
+            if not self._closed:
+                self._pending[tag] += 1
+                self._enqueued += 1
+                self._queue.put(_Op(fn, tag))
+                return
+        with self.pool.write() as conn:
+            fn(conn)
+
+    def pending(self, *tags: str) -> int:
+        """尚未提交的写操作数；不传 tag 时返回总数"""
+        with self._lock:
+            if not tags:
+                return sum(self._pending.values())
+            return sum(self._pending[t] for t in tags)
+
+    def in_worker(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """屏障：等待此前入队的写操作全部提交。超时返回 False。"""
+        if self.in_worker() or not self._thread.is_alive():
+            return True
+        barrier = _Barrier()
+        self._queue.put(barrier)
+        return barrier.event.wait(timeout)
+
+    def close(self):
+        """写完剩余数据并停止后台线程 (幂等)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread.is_alive() and not self.in_worker():
+            self._queue.put(_STOP)
+            self._thread.join()
+        _live_queues.discard(self)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            batches = self._batches
+            return {
+                "depth": sum(self._pending.values()),
+                "pending_by_tag": {k: v for k, v in self._pending.items() if v},
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": batches,
+                "avg_batch_size": round(self._written / batches, 2) if batches else 0.0,
+                "last_flush_ms": round(self._flush_last * 1000, 3),
+                "avg_flush_ms": round(self._flush_total * 1000 / batches, 3) if batches else 0.0,
+                "max_flush_ms": round(self._flush_max * 1000, 3),
+                "max_lag_ms": round(self._lag_max * 1000, 3),
+            }
+
+    # --- 后台线程 ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch: List = [item]
+            stop = item is _STOP
+            if isinstance(item, _Op):
+                # 在时间窗口内继续收集，遇到屏障/停止信号立即提交
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        nxt = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    batch.append(nxt)
+                    if nxt is _STOP:
+                        stop = True
+                        break
+                    if isinstance(nxt, _Barrier):
+                        break
+
+            self._commit([b for b in batch if isinstance(b, _Op)])
+            for b in batch:
+                if isinstance(b, _Barrier):
+                    b.event.set()
+            if stop:
+                self._drain_after_stop()
+                return
+
+    def _drain_after_stop(self):
+        # close() 之后 submit 会走同步路径，这里只需处理已入队的剩余屏障
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, _Op):
+                self._commit([item])
+            elif isinstance(item, _Barrier):
+                item.event.set()
+
+    def _commit(self, ops: List[_Op]):
+        if not ops:
+            return
+        failed = 0
+        t0 = time.perf_counter()
+        try:
+            with self.pool.write() as conn:
+                for op in ops:
+                    # 每个操作一个保存点：失败时撤销它已执行的语句，不影响同批其他操作
+                    conn.execute("SAVEPOINT wb_op")
+                    try:
+                        op.fn(conn)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO wb_op")
+                        failed += 1
+                        logger.error(f"Write-behind op failed ({op.tag}): {e}")
+                    finally:
+                        conn.execute("RELEASE wb_op")
+        except Exception as e:
+            # 整批事务失败 (例如磁盘错误)，本批全部计为失败
+            failed = len(ops)
+            logger.error(f"Write-behind batch of {len(ops)} failed: {e}")
+        done = time.perf_counter()
+        elapsed = done - t0
+        lag = done - min(op.enqueued_at for op in ops)
+
+        with self._lock:
+            for op in ops:
+                self._pending[op.tag] -= 1
+            self._written += len(ops) - failed
+            self._failed += failed
+            self._batches += 1
+            self._flush_total += elapsed
+            self._flush_last = elapsed
+            self._flush_max = max(self._flush_max, elapsed)
+            self._lag_max = max(self._lag_max, lag)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 与 scripts/ 相同：以 src 为根导入 utils.*
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,119 @@
+"""
+复权因子推算 (StockTools._span_factors) 与读取时复权 (DatabaseManager._adjust_prices)
+
+用合成的不复权日线验证：数据源的涨跌幅相对除权参考价计算，且只保留两位小数。
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.database_manager import DatabaseManager
+from utils.stock_tools import StockTools
+
+
+def make_bars(closes, events=None, start="2024-01-02"):
+    """不复权日线；events = {下标: (每股派息, 送转后股数倍数)}，当日为除权除息日"""
+    events = events or {}
+    dates = pd.bdate_range(start, periods=len(closes)).strftime("%Y-%m-%d")
+    pct = [0.0]
+    for i in range(1, len(closes)):
+        ref = closes[i - 1]
+        if i in events:
+            dividend, split = events[i]
+            ref = (closes[i - 1] - dividend) / split
+        pct.append(round((closes[i] / ref - 1) * 100, 2))
+    return pd.DataFrame({
+        "date": dates, "open": closes, "close": closes, "high": closes, "low": closes,
+        "volume": 1000.0, "change_pct": pct,
+    })
+
+
+def source_adjusted(closes, events, adjust):
+    """数据源口径的等比复权价 (与被测实现无关的独立计算)"""
+    closes = np.asarray(closes, dtype=np.float64)
+    ratio = np.ones(len(closes))  # 除权日的 前收盘价 / 除权参考价
+    for i, (dividend, split) in events.items():
+        ratio[i] = closes[i - 1] / ((closes[i - 1] - dividend) / split)
+    hfq = np.cumprod(ratio)
+    return closes * (hfq / hfq[-1] if adjust == "qfq" else hfq)
+
+
+def as_factors(points):
+    return np.array([d for d, _ in points], dtype=str), np.array([f for _, f in points], dtype=np.float64)
+
+
+def test_no_event_single_point():
+    df = make_bars([10.0, 10.1, 10.05, 10.3, 10.2])
+    assert StockTools._span_factors(df, None) == [(df["date"][0], 1.0)]
+
+
+def test_cash_dividend():
+    closes = [10.0, 10.2, 9.8, 9.9, 10.0]
+    df = make_bars(closes, {2: (0.5, 1.0)})
+    points = StockTools._span_factors(df, None)
+    assert [d for d, _ in points] == [df["date"][0], df["date"][2]]
+    assert points[1][1] == pytest.approx(10.2 / 9.7, rel=1e-4)
+
+
+def test_split():
+    closes = [20.0, 20.4, 10.3, 10.1]
+    df = make_bars(closes, {2: (0.0, 2.0)})  # 10 送 10
+    points = StockTools._span_factors(df, None)
+    assert [d for d, _ in points] == [df["date"][0], df["date"][2]]
+    assert points[1][1] == pytest.approx(20.4 / 10.2, rel=1e-4)
+
+
+def test_anchor_continues_local_factor():
+    closes = [20.0, 20.4, 10.3, 10.1]
+    df = make_bars(closes, {2: (0.0, 2.0)})
+    points = StockTools._span_factors(df, (df["date"][0], 20.0, 1.5))
+    # 锚点当日已有本地因子，只返回之后的变化点
+    assert [d for d, _ in points] == [df["date"][2]]
+    assert points[0][1] == pytest.approx(1.5 * 2.0, rel=1e-4)
+
+
+def test_anchor_mismatch_requires_full_refetch():
+    df = make_bars([20.0, 20.4, 20.5])
+    # 数据源回溯修正了历史：锚点的不复权收盘价与本地不一致
+    assert StockTools._span_factors(df, (df["date"][0], 10.0, 2.0)) is None
+    # 锚点 K 线不在拉取结果中
+    assert StockTools._span_factors(df, ("2023-12-29", 20.0, 1.0)) is None
+    # 盘中锚点 (收盘价未知) 只校验日期
+    assert StockTools._span_factors(df, (df["date"][0], None, 1.0)) == []
+
+
+def test_low_priced_rounding_noise_is_not_an_event():
+    rng = np.random.default_rng(7)
+    closes = [1.50]
+    for _ in range(249):
+        closes.append(round(max(0.5, closes[-1] * (1 + rng.normal(0, 0.02))), 2))
+    df = make_bars(closes)
+    # 两位小数涨跌幅的舍入误差 (<= 5e-5) 必须低于阈值，不能产生伪变化点
+    ratio = np.array(closes[:-1]) * (1 + df["change_pct"].to_numpy()[1:] / 100) / np.array(closes[1:])
+    assert np.abs(ratio - 1).max() < StockTools.FACTOR_TOLERANCE
+    assert StockTools._span_factors(df, None) == [(df["date"][0], 1.0)]
+
+
+def test_low_priced_small_dividend_is_detected():
+    closes = [1.50, 1.51, 1.50, 1.49]
+    df = make_bars(closes, {2: (0.01, 1.0)})  # 派息约 0.66%，远高于阈值
+    points = StockTools._span_factors(df, None)
+    assert [d for d, _ in points] == [df["date"][0], df["date"][2]]
+    assert points[1][1] == pytest.approx(1.51 / 1.50, rel=1e-4)
+
+
+@pytest.mark.parametrize("adjust", ["qfq", "hfq"])
+def test_adjust_prices_matches_source_adjusted(adjust):
+    closes = [20.0, 20.5, 21.0, 10.6, 10.8, 10.7, 10.9, 10.5, 10.6, 10.8]
+    events = {3: (0.2, 2.0), 7: (0.3, 1.0)}  # 先派息+送转，再派息
+    df = make_bars(closes, events)
+    factors = as_factors(StockTools._span_factors(df, None))
+    adjusted = DatabaseManager._adjust_prices(df.copy(), factors, adjust)
+    np.testing.assert_allclose(adjusted["close"].to_numpy(), source_adjusted(closes, events, adjust), rtol=2e-4)
+
+
+def test_adjust_prices_none_and_missing_factors_return_raw():
+    df = make_bars([10.0, 10.2, 9.8], {2: (0.5, 1.0)})
+    factors = as_factors(StockTools._span_factors(df, None))
+    np.testing.assert_array_equal(DatabaseManager._adjust_prices(df.copy(), factors, "none")["close"], df["close"])
+    np.testing.assert_array_equal(DatabaseManager._adjust_prices(df.copy(), None, "qfq")["close"], df["close"])